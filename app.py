@@ -1,11 +1,27 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
 from datetime import datetime, timedelta
-from src.fetch_articles import fetch_meduza_articles
 from src.translate import MeduzaTranslator
-from src.summarize import summarize_article
+from src.ingest_service import ingest_articles
+from src.database import (
+    get_db_generation, list_translated_articles, get_article_contents,
+    get_untranslated_content, save_translated_content
+)
+from src.export import (
+    EXPORT_DIR, EXPORT_FORMATS, export_articles, export_filename, iter_dict_batches, prune_exports, write_export
+)
+from src.jobs import (
+    enqueue_job, get_job, get_service_status, JOB_QUEUED, JOB_RUNNING, JOB_DONE,
+    INGEST_MODES, INGEST_MODE_FULL
+)
+from src.metrics import (
+    REGISTRY, ARTICLES, CACHE_HITS, CACHE_MISSES, HTTP_ERRORS, STAGES, TRANSLATED_CHARACTERS,
+    counter_totals, fetch_metrics_snapshot, stage_summary
+)
+from src.repository import get_connection
+from src import repository
+from src.utils import parse_published_timestamp
 import os
+import socket
 
 # Streamlit Cloud対応のデータベースパス設定
 if os.path.exists("/mount"):  # Streamlit Cloud環境
@@ -13,7 +29,7 @@ if os.path.exists("/mount"):  # Streamlit Cloud環境
     DB_PATH = ":memory:"
     USE_MEMORY_DB = True
 else:  # ローカル環境
-    DB_PATH = "data/articles.db"
+    DB_PATH = repository.DB_PATH
     USE_MEMORY_DB = False
 
 def init_session_state():
@@ -52,103 +68,135 @@ def save_article_to_session(article):
     if 'articles' not in st.session_state:
         st.session_state.articles = []
     
-    # 既存記事の重複チェック
-    existing_titles = [a.get('translated_title', '') for a in st.session_state.articles]
-    if article.get('translated_title', '') not in existing_titles:
-        st.session_state.articles.append(article)
+    # 既存記事の重複チェック（記事キーがあればキーで、なければタイトルで判定）
+    if article.get('article_key'):
+        if get_session_article_keys([article['article_key']]):
+            return
+    else:
+        existing_titles = [a.get('translated_title', '') for a in st.session_state.articles]
+        if article.get('translated_title', '') in existing_titles:
+            return
+    st.session_state.articles.append(article)
+
+def get_session_article_keys(keys):
+    """指定した記事キーのうち、セッション状態に保存済みのものを取得"""
+    articles = st.session_state.get('articles', [])
+    saved_keys = {a.get('article_key') for a in articles if a.get('article_key')}
+    return saved_keys & set(keys)
 
-def get_translated_articles(search_query="", date_filter="all", limit=20):
-    """翻訳済みの記事一覧を取得"""
+def get_date_filter_start(date_filter):
+    """期間フィルターの開始時刻（UNIX時刻）を取得（全期間ならNone）"""
+    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if date_filter == "today":
+        return int(today_start.timestamp())
+    elif date_filter == "week":
+        return int((today_start - timedelta(days=7)).timestamp())
+    elif date_filter == "month":
+        return int((today_start - timedelta(days=30)).timestamp())
+    return None
+
+def get_translated_articles(search_query="", date_filter="all", limit=20, cursor=None):
+    """
+    翻訳済みの記事一覧を1ページ分取得（本文は含まない）
+    
+    Returns:
+        tuple: (id, 翻訳タイトル, 要約, 公開日, 原題, スニペット, 公開日時) の行のリストと、
+               次ページの開始位置（最後のページならNone）
+    """
     if USE_MEMORY_DB:
         # セッション状態から記事を取得
         articles = st.session_state.get('articles', [])
+        since = get_date_filter_start(date_filter)
         
         # フィルタリング
         filtered_articles = []
-        for article in articles:
+        for index, article in enumerate(articles):
             # 翻訳済みチェック
             if not article.get('translated_title'):
                 continue
                 
-            # 検索クエリ
+            # 検索クエリ（日本語訳とロシア語原文）
             if search_query:
-                search_text = f"{article.get('translated_title', '')} {article.get('summary', '')} {article.get('translated_content', '')}".lower()
+                search_text = " ".join(
+                    article.get(field, '') or '' for field in ('translated_title', 'summary', 'translated_content', 'title', 'content')
+                ).lower()
                 if search_query.lower() not in search_text:
                     continue
             
             # 日付フィルター
-            if date_filter != "all":
-                published = article.get('published', '')
-                if published:
-                    try:
-                        # 日付解析（様々な形式に対応）
-                        from dateutil import parser
-                        pub_date = parser.parse(published).date()
-                        today = datetime.now().date()
-                        
-                        if date_filter == "today" and pub_date != today:
-                            continue
-                        elif date_filter == "week" and pub_date < (today - timedelta(days=7)):
-                            continue
-                        elif date_filter == "month" and pub_date < (today - timedelta(days=30)):
-                            continue
-                    except:
-                        continue
+            published_at = parse_published_timestamp(article.get('published'))
+            if since is not None and (published_at is None or published_at < since):
+                continue
             
+            # IDにはセッション内の位置を使う
             filtered_articles.append((
+                index,
                 article.get('translated_title', ''),
                 article.get('summary', ''),
-                article.get('translated_content', ''),
                 article.get('published', ''),
-                article.get('title', '')
+                article.get('title', ''),
+                '',
+                published_at
             ))
         
-        # 日付でソート（新しい順）
-        filtered_articles.sort(key=lambda x: x[3], reverse=True)
-        return filtered_articles[:limit]
+        # 日付でソート（新しい順）し、件数オフセットでページング
+        filtered_articles.sort(key=lambda row: row[6] or 0, reverse=True)
+        offset = cursor or 0
+        next_cursor = offset + limit if len(filtered_articles) > offset + limit else None
+        return filtered_articles[offset:offset + limit], next_cursor
     
     else:
-        # ローカル環境：SQLiteを使用
-        if not os.path.exists(DB_PATH):
-            return []
-            
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT translated_title, summary, translated_content, published, title
-            FROM articles 
-            WHERE translated_title IS NOT NULL
-        """
-        params = []
-        
-        # 検索クエリ
-        if search_query:
-            query += " AND (translated_title LIKE ? OR summary LIKE ? OR translated_content LIKE ?)"
-            search_param = f"%{search_query}%"
-            params.extend([search_param, search_param, search_param])
-        
-        # 日付フィルター
-        if date_filter == "today":
-            today = datetime.now().strftime('%Y-%m-%d')
-            query += " AND date(published) = ?"
-            params.append(today)
-        elif date_filter == "week":
-            week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-            query += " AND date(published) >= ?"
-            params.append(week_ago)
-        elif date_filter == "month":
-            month_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-            query += " AND date(published) >= ?"
-            params.append(month_ago)
-        
-        query += " ORDER BY published DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        articles = cursor.fetchall()
-        conn.close()
-        return articles
+        # ローカル環境：SQLiteを使用（DBの世代番号をキーにキャッシュ）
+        return query_translated_articles(
+            DB_PATH, search_query, get_date_filter_start(date_filter), limit, cursor, get_db_generation(DB_PATH)
+        )
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def query_translated_articles(db_path, search_query, since, limit, cursor, generation):
+    """
+    SQLiteから翻訳済みの記事一覧を1ページ分取得（結果はキャッシュされる）
+    
+    generationは記事の保存時に進むため、新着記事が入るとキャッシュが切り替わる。
+    """
+    return list_translated_articles(search_query, since, limit, cursor, db_path)
+
+def get_contents(article_ids):
+    """記事の翻訳本文を取得（表示する記事の分だけ）"""
+    if USE_MEMORY_DB:
+        articles = st.session_state.get('articles', [])
+        return {i: articles[i].get('translated_content', '') or '' for i in article_ids if i < len(articles)}
+    return query_article_contents(DB_PATH, tuple(sorted(article_ids)), get_db_generation(DB_PATH))
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def query_article_contents(db_path, article_ids, generation):
+    """SQLiteから記事の翻訳本文を取得（結果はキャッシュされる）"""
+    return get_article_contents(article_ids, db_path)
+
+def translate_content(article_id):
+    """
+    本文が未翻訳の記事（ダイジェストモードで取り込んだ記事）の本文を翻訳して保存
+    
+    Returns:
+        str: 翻訳本文（原文がない・翻訳に失敗した場合は空文字）
+    """
+    if USE_MEMORY_DB:
+        articles = st.session_state.get('articles', [])
+        article = articles[article_id] if article_id < len(articles) else {}
+        source = article.get('content') if not article.get('translated_content') else None
+    else:
+        source = get_untranslated_content(article_id, DB_PATH)
+    if not source:
+        return ""
+    
+    translated = get_translator().translate_long_text(source)
+    if not translated:
+        return ""
+    if USE_MEMORY_DB:
+        article['translated_content'] = translated
+    else:
+        # 世代番号が進むので、一覧と本文のキャッシュも切り替わる
+        save_translated_content(article_id, translated, DB_PATH)
+    return translated
 
 def get_article_stats():
     """記事統計を取得"""
@@ -159,92 +207,100 @@ def get_article_stats():
         translated_count = len([a for a in articles if a.get('translated_title')])
         
         # 今日の記事数
-        today = datetime.now().date()
-        today_count = 0
-        for article in articles:
-            try:
-                from dateutil import parser
-                pub_date = parser.parse(article.get('published', '')).date()
-                if pub_date == today:
-                    today_count += 1
-            except:
-                continue
+        today_start = get_date_filter_start("today")
+        today_count = len([
+            a for a in articles
+            if (parse_published_timestamp(a.get('published')) or 0) >= today_start
+        ])
                 
         return total_count, translated_count, today_count
     
     else:
-        # ローカル環境：SQLiteを使用
-        if not os.path.exists(DB_PATH):
-            return 0, 0, 0
-            
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 総記事数
-        cursor.execute("SELECT COUNT(*) FROM articles")
-        total_count = cursor.fetchone()[0]
-        
-        # 翻訳済み記事数
-        cursor.execute("SELECT COUNT(*) FROM articles WHERE translated_title IS NOT NULL")
-        translated_count = cursor.fetchone()[0]
-        
-        # 今日の記事数
-        today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute("SELECT COUNT(*) FROM articles WHERE date(published) = ?", (today,))
-        today_count = cursor.fetchone()[0]
+        # ローカル環境：SQLiteを使用（DBの世代番号をキーにキャッシュ）
+        return query_article_stats(DB_PATH, get_date_filter_start("today"), get_db_generation(DB_PATH))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def query_article_stats(db_path, today_start, generation):
+    """SQLiteから記事統計（総記事数・翻訳済み記事数・今日の記事数）を取得（結果はキャッシュされる）"""
+    if not os.path.exists(db_path):
+        return 0, 0, 0
         
-        conn.close()
-        return total_count, translated_count, today_count
+    cursor = get_connection(db_path).cursor()
+    cursor.execute("""
+        SELECT COUNT(*),
+               COUNT(translated_title),
+               COALESCE(SUM(published_at >= ?), 0)
+        FROM articles
+    """, (today_start,))
+    return tuple(cursor.fetchone())
+
+def create_export(fmt, search_query="", date_filter="all"):
+    """
+    エクスポートファイルを作成（ボタンが押されたときだけ実行）
+    
+    EXPORT_DIRには新しいものから一定数だけ残し、古いエクスポートは削除する
+    
+    Returns:
+        tuple: (ファイルパス, ファイル名, MIMEタイプ, 記事数)
+    """
+    filename, mime = export_filename(fmt, datetime.now().strftime('%Y%m%d_%H%M%S'))
+    path = os.path.join(EXPORT_DIR, filename)
+    since = get_date_filter_start(date_filter)
+    
+    if USE_MEMORY_DB:
+        # セッション状態の記事を同じ条件で絞り込んで書き出す
+        articles = st.session_state.get('articles', [])
+        if search_query or since is not None:
+            ids = sorted(row[0] for row in get_translated_articles(search_query, date_filter, len(articles))[0])
+            articles = [articles[i] for i in ids]
+        count = write_export(iter_dict_batches(articles), path, fmt)
+    else:
+        count = export_articles(path, fmt, search_query, since, DB_PATH)
+    prune_exports(EXPORT_DIR)
+    return path, filename, mime, count
 
-def fetch_and_process_new_articles(num_articles=3):
-    """新着記事を取得して処理する"""
+@st.cache_resource(show_spinner=False)
+def get_translator():
+    """翻訳器を取得（プロセス内の全セッションで共有）"""
+    return MeduzaTranslator()
+
+def fetch_and_process_new_articles(num_articles=3, mode=INGEST_MODE_FULL):
+    """
+    新着記事を取得して処理する（Streamlit Cloud版：セッション状態に保存）
+    
+    ローカル環境では取り込みサービスにジョブを登録する（enqueue_ingest_job）。
+    """
     progress_bar = st.progress(0)
     status_text = st.empty()
     
+    # 進捗と保存はパイプラインを呼び出したこのスレッドで行われる
+    def on_progress(done, total, message):
+        status_text.text(f"🌐 {message}")
+        progress_bar.progress(int(done / total * 100) if total else 0)
+    
+    def store(article):
+        before = len(st.session_state.articles)
+        save_article_to_session(article)
+        return len(st.session_state.articles) > before
+    
     try:
         # セッション状態初期化
         init_session_state()
         
-        # 記事取得
-        status_text.text("📰 新着記事を取得中...")
-        progress_bar.progress(20)
-        articles = fetch_meduza_articles(limit=num_articles)
+        # 取得・翻訳・要約を記事ごとに重ねて処理（処理済みの記事は本文取得前に除外）
+        result = ingest_articles(
+            limit=num_articles,
+            translator=get_translator(),
+            on_progress=on_progress,
+            known_keys_lookup=get_session_article_keys,
+            store=store,
+            mode=mode
+        )
         
-        if not articles:
-            st.error("記事の取得に失敗しました")
+        if not result.fetched:
+            st.warning("新着記事がないか、記事の取得に失敗しました")
             return False
         
-        # 翻訳器初期化
-        translator = MeduzaTranslator()
-        
-        for i, article in enumerate(articles):
-            progress = 20 + (i + 1) * (80 / len(articles))
-            
-            # 翻訳
-            status_text.text(f"🌐 記事 {i+1}/{len(articles)} を翻訳中...")
-            progress_bar.progress(int(progress * 0.6))
-            
-            translated = translator.translate_article(article)
-            
-            # 要約
-            status_text.text(f"📝 記事 {i+1}/{len(articles)} を要約中...")
-            progress_bar.progress(int(progress * 0.8))
-            
-            if translated.get('translated_content'):
-                summary = summarize_article(translated['translated_content'])
-                translated['summary'] = summary
-            
-            # 保存
-            status_text.text(f"💾 記事 {i+1}/{len(articles)} を保存中...")
-            if USE_MEMORY_DB:
-                save_article_to_session(translated)
-            else:
-                # ローカル環境では従来通りデータベースに保存
-                from src.database import init_db, save_article_to_db
-                init_db()
-                save_article_to_db(translated)
-            progress_bar.progress(int(progress))
-        
         progress_bar.progress(100)
         status_text.text("✅ 処理完了！")
         return True
@@ -253,6 +309,93 @@ def fetch_and_process_new_articles(num_articles=3):
         st.error(f"エラーが発生しました: {str(e)}")
         return False
 
+def enqueue_ingest_job(num_articles=3, mode=INGEST_MODE_FULL):
+    """
+    取り込みサービスにジョブを登録し、進捗表示の対象にする
+
+    同じ処理モードのジョブが待機中・実行中なら新しく登録せず、そのジョブの進捗を表示する
+    """
+    job_id = enqueue_job(num_articles, "ui", DB_PATH, mode)
+    job = get_job(job_id, DB_PATH)
+    if job and (job["source"] != "ui" or job["article_limit"] != num_articles):
+        st.toast(f"同じ処理モードのジョブ #{job_id}（{job['article_limit']}件）が登録済みのため、その進捗を表示します")
+    st.session_state.ingest_job_id = job_id
+
+@st.fragment(run_every=2)
+def show_ingest_status():
+    """取り込みサービスの稼働状況と、登録したジョブの進捗を表示（2秒ごとに更新）"""
+    service = get_service_status(DB_PATH)
+    if service and service["alive"]:
+        next_poll = (
+            f" | 次回確認 {datetime.fromtimestamp(service['next_poll_at']).strftime('%H:%M')}"
+            if service.get("next_poll_at") else ""
+        )
+        st.caption(f"🟢 取り込みサービス稼働中{next_poll}")
+    else:
+        st.caption("🔴 取り込みサービス停止中（`python main.py serve` で起動してください）")
+    
+    job_id = st.session_state.get('ingest_job_id')
+    job = get_job(job_id, DB_PATH) if job_id else None
+    if not job:
+        return
+    
+    if job["status"] == JOB_QUEUED:
+        st.info(f"⏳ ジョブ #{job_id} は実行待ちです")
+    elif job["status"] == JOB_RUNNING:
+        progress = job["progress"] / job["total"] if job["total"] else 0.0
+        st.progress(progress, text=job["message"] or "処理中...")
+    else:
+        # 完了したら一覧と統計を更新する（世代番号が進んでいるのでキャッシュも切り替わる）
+        st.session_state.ingest_job_id = None
+        if job["status"] == JOB_DONE:
+            st.session_state.ingest_result = ("success", f"✅ {job['saved']}件の記事を保存しました！")
+        else:
+            st.session_state.ingest_result = ("error", f"取り込みに失敗しました: {job['error']}")
+        st.rerun()
+
+def get_pipeline_metrics():
+    """取り込み処理の指標（メモリ内DBではこのプロセス、ローカルでは取り込みサービスから取得）"""
+    if USE_MEMORY_DB:
+        return REGISTRY.snapshot()
+    service = get_service_status(DB_PATH)
+    if not service or not service["alive"] or not service.get("metrics_port"):
+        return None
+    # 指標は127.0.0.1でだけ公開しているため、同じホストのサービスのみ
+    if service.get("host") != socket.gethostname():
+        return None
+    return fetch_metrics_snapshot(service["metrics_port"])
+
+@st.fragment(run_every=10)
+def show_pipeline_metrics():
+    """取り込み処理の記事数・キャッシュのヒット率・ステージごとの処理時間を表示（10秒ごとに更新）"""
+    snapshot = get_pipeline_metrics()
+    if snapshot is None:
+        st.caption("取り込みサービスの指標はありません（`python main.py serve` で公開されます）")
+        return
+    
+    articles = counter_totals(snapshot, ARTICLES.name)
+    characters = sum(counter_totals(snapshot, TRANSLATED_CHARACTERS.name).values())
+    hits = sum(counter_totals(snapshot, CACHE_HITS.name).values())
+    lookups = hits + sum(counter_totals(snapshot, CACHE_MISSES.name).values())
+    errors = sum(counter_totals(snapshot, HTTP_ERRORS.name).values())
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("保存した記事", int(articles.get("saved", 0)))
+        st.metric("翻訳文字数", f"{int(characters):,}")
+    with col2:
+        st.metric("キャッシュヒット率", f"{hits / lookups * 100:.1f}%" if lookups else "-")
+        st.metric("HTTPエラー", int(errors))
+    
+    stages = stage_summary(snapshot)
+    lines = [
+        f"{stage}: {stages[stage]['count']}件 平均 {stages[stage]['mean'] * 1000:.0f}ms"
+        f" / p95 {(stages[stage]['p95'] or 0) * 1000:.0f}ms"
+        for stage in STAGES if stage in stages
+    ]
+    if lines:
+        st.caption("  \n".join(lines))
+
 # --- Streamlit UI ---
 st.set_page_config(
     page_title="Meduza翻訳記事ビューア", 
@@ -263,6 +406,12 @@ st.set_page_config(
 # セッション状態を初期化
 init_session_state()
 
+# ローカル環境ではスキーマを最新化（カラム追加・公開日時の正規化）
+if not USE_MEMORY_DB and not st.session_state.db_initialized:
+    from src.database import init_db
+    init_db(DB_PATH)
+    st.session_state.db_initialized = True
+
 st.title("📰 Meduza翻訳記事ビューア")
 st.markdown("---")
 
@@ -282,17 +431,43 @@ with st.sidebar:
         if total_count > 0:
             st.metric("翻訳率", f"{translated_count/total_count*100:.1f}%")
     
+    with st.expander("📈 処理の指標"):
+        show_pipeline_metrics()
+    
     st.markdown("---")
     
     # 新着記事取得
     st.subheader("🆕 新着記事取得")
     num_articles = st.selectbox("取得記事数", [1, 3, 5, 10], index=1)
+    ingest_mode = st.selectbox(
+        "処理モード",
+        INGEST_MODES,
+        format_func=lambda x: {
+            "full": "全文翻訳",
+            "digest": "ダイジェスト（要約だけ翻訳）"
+        }[x],
+        help="ダイジェストでは原文を要約してタイトルと要約だけを翻訳し、本文は読むときに翻訳します"
+    )
     
-    if st.button("🔄 新着記事を取得・翻訳", type="primary"):
-        with st.spinner("処理中..."):
-            if fetch_and_process_new_articles(num_articles):
-                st.success(f"✅ {num_articles}件の記事を処理しました！")
-                st.rerun()
+    if USE_MEMORY_DB:
+        if st.button("🔄 新着記事を取得・翻訳", type="primary"):
+            with st.spinner("処理中..."):
+                if fetch_and_process_new_articles(num_articles, ingest_mode):
+                    st.success(f"✅ {num_articles}件の記事を処理しました！")
+                    st.rerun()
+    else:
+        # 取得・翻訳は取り込みサービスが行い、ここではジョブの登録と進捗表示だけ行う
+        st.button(
+            "🔄 新着記事を取得・翻訳",
+            type="primary",
+            on_click=enqueue_ingest_job,
+            args=(num_articles, ingest_mode),
+            disabled=bool(st.session_state.get('ingest_job_id'))
+        )
+        ingest_result = st.session_state.pop('ingest_result', None)
+        if ingest_result:
+            getattr(st, ingest_result[0])(ingest_result[1])
+        show_ingest_status()
     
     st.markdown("---")
     
@@ -313,6 +488,31 @@ with st.sidebar:
     
     display_limit = st.selectbox("表示件数", [10, 20, 50, 100], index=1)
     
+    st.markdown("---")
+    
+    # エクスポート（表示中のページではなくアーカイブ全体が対象）
+    st.subheader("📥 エクスポート")
+    export_format = st.selectbox(
+        "形式",
+        EXPORT_FORMATS,
+        format_func=lambda x: {"csv": "CSV", "jsonl": "JSON Lines", "parquet": "Parquet"}[x]
+    )
+    export_filtered = st.checkbox("検索・期間の条件で絞り込む", value=False)
+    
+    if st.button("📦 エクスポートを作成"):
+        with st.spinner("エクスポート中..."):
+            st.session_state.export = create_export(
+                export_format,
+                search_query if export_filtered else "",
+                date_filter if export_filtered else "all"
+            )
+    
+    export = st.session_state.get('export')
+    if export and os.path.exists(export[0]):
+        path, filename, mime, count = export
+        with open(path, "rb") as f:
+            st.download_button(f"⬇️ {filename}（{count}件）", f, filename, mime)
+    
     # サンプルデータボタン（Streamlit Cloud用）
     if USE_MEMORY_DB and st.button("📝 サンプルデータを追加", help="デモ用のサンプル記事を追加します"):
         add_sample_data()
@@ -320,7 +520,15 @@ with st.sidebar:
         st.rerun()
 
 # メインコンテンツ
-articles = get_translated_articles(search_query, date_filter, display_limit)
+# 条件が変わったら1ページ目に戻る（page_cursorsは各ページの開始位置）
+page_key = (search_query, date_filter, display_limit)
+if st.session_state.get('page_key') != page_key:
+    st.session_state.page_key = page_key
+    st.session_state.page_cursors = [None]
+page_cursors = st.session_state.page_cursors
+page_start = (len(page_cursors) - 1) * display_limit
+
+articles, next_cursor = get_translated_articles(search_query, date_filter, display_limit, page_cursors[-1])
 
 if not articles:
     st.warning("条件に一致する記事が見つかりません。")
@@ -328,57 +536,79 @@ if not articles:
         st.info("💡 Streamlit Cloud版では「新着記事を取得・翻訳」または「サンプルデータを追加」ボタンで記事を追加してください。")
     st.info("💡 「新着記事を取得・翻訳」ボタンで記事を追加してください。")
 else:
-    st.success(f"📊 {len(articles)}件の記事が見つかりました")
+    st.success(f"📊 {page_start + 1}〜{page_start + len(articles)}件目を表示中")
     
     # 記事表示オプション
-    col1, col2, col3 = st.columns([2, 2, 1])
+    col1, col2 = st.columns([2, 2])
     with col1:
         view_mode = st.radio("表示モード", ["カード表示", "リスト表示"], horizontal=True)
     with col2:
         show_content = st.checkbox("本文を表示", value=False)
-    with col3:
-        st.download_button(
-            "📥 CSVダウンロード",
-            pd.DataFrame(articles, columns=["翻訳タイトル", "要約", "翻訳本文", "公開日", "原題"]).to_csv(index=False),
-            "meduza_articles.csv",
-            "text/csv"
-        )
+    
+    # 本文は「本文を表示」のときだけこのページの分をまとめて取得する
+    contents = get_contents([article[0] for article in articles]) if show_content else {}
     
     st.markdown("---")
     
     # 記事表示
     if view_mode == "カード表示":
-        for idx, (translated_title, summary, content, published, original_title) in enumerate(articles, 1):
+        for idx, (article_id, translated_title, summary, published, original_title, snippet, _) in enumerate(articles, page_start + 1):
             with st.expander(f"📰 {idx}. {translated_title} ({published})"):
                 
                 # 原題
                 st.caption(f"🇷🇺 原題: {original_title}")
                 
+                # 検索キーワードの一致箇所
+                if snippet:
+                    st.markdown(f"🔎 {snippet}")
+                
                 # 要約
                 if summary:
                     st.write("### 📝 要約")
                     st.info(summary)
                 
-                # 本文
-                if show_content and content:
-                    st.write("### 📖 本文")
-                    st.write(content)
-                elif not show_content:
-                    st.caption("💡 本文を表示するには「本文を表示」をチェックしてください")
+                # 本文（カードごとに開いたときだけ取得）
+                if show_content or st.toggle("📖 本文を読む", key=f"content_{article_id}"):
+                    content = contents.get(article_id) if show_content else get_contents([article_id]).get(article_id)
+                    if not content and not show_content:
+                        # ダイジェストモードの記事は開いたときに本文を翻訳する
+                        with st.spinner("本文を翻訳中..."):
+                            content = translate_content(article_id)
+                    if content:
+                        st.write("### 📖 本文")
+                        st.write(content)
+                    elif show_content:
+                        st.caption("本文は未翻訳です（「本文を表示」を外して「本文を読む」を開くと翻訳します）")
     
     else:  # リスト表示
-        for idx, (translated_title, summary, content, published, original_title) in enumerate(articles, 1):
+        for idx, (article_id, translated_title, summary, published, original_title, snippet, _) in enumerate(articles, page_start + 1):
             st.write(f"**{idx}. {translated_title}**")
             st.caption(f"📅 {published} | 🇷🇺 {original_title}")
             
+            if snippet:
+                st.markdown(f"🔎 {snippet}")
+            
             if summary:
                 st.write(f"📝 {summary[:200]}..." if len(summary) > 200 else summary)
             
-            if show_content and content:
+            if show_content and contents.get(article_id):
                 with st.expander("本文を読む"):
-                    st.write(content)
+                    st.write(contents[article_id])
             
             st.markdown("---")
+    
+    # ページ送り
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("← 前へ", key="page_prev", disabled=len(page_cursors) == 1):
+            page_cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"{len(page_cursors)}ページ目")
+    with col_next:
+        if st.button("次へ →", key="page_next", disabled=next_cursor is None):
+            page_cursors.append(next_cursor)
+            st.rerun()
 
 # フッター
 st.markdown("---")
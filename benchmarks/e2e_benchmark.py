@@ -0,0 +1,415 @@
+# benchmarks/e2e_benchmark.py
+
+"""
+取り込み処理のオフラインベンチマーク
+記録したRSSフィードと保存済みの記事ページをローカルのHTTPサーバーから配信し、
+スタブの翻訳バックエンドを使って、ステージごとと全体の処理速度を計測する
+
+計測するステージ:
+    fetch       fetch_meduza_articles（RSSの取得と本文の取得・抽出）
+    translate   MeduzaTranslator.translate_article（1記事ずつ、要約なし）
+    summarize   MeduzaSummarizer.summarize_text（1記事ずつ。スタブの翻訳結果は日本語ではないため、原文をロシア語で要約する）
+    db_write    save_article_to_db（1記事ずつ）
+    end_to_end  ingest_articles（パイプラインで取得から保存まで）
+
+各ステージの記事数/秒・1記事あたりの所要時間のp50/p95・ステージ中のピークRSSをJSONで出力する。
+記録したフィードは --articles 件になるまで記事を複製して配信する（複製した記事はページの内容も少し変える）。
+DB・ページキャッシュなどは一時ディレクトリに作るため、data/ には書き込まない。
+
+使い方:
+    python -m benchmarks.e2e_benchmark [--articles 40] [--latency 0.05] [--error-rate 0.02] [--json]
+    python -m benchmarks.e2e_benchmark --output before.json
+    python -m benchmarks.e2e_benchmark --baseline before.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+from src.database import init_db, save_article_to_db
+from src.fetch_articles import MeduzaFetcher, fetch_meduza_articles
+from src.ingest_service import ingest_articles, DEFAULT_STAGE_WORKERS
+from src.jobs import INGEST_MODES, INGEST_MODE_FULL
+from src.rate_limiter import AdaptiveRateLimiter
+from src.summarize import MeduzaSummarizer, DEFAULT_SUMMARY_LENGTH
+from src.translate import MeduzaTranslator
+from src.translation_backends import StubBackend
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FEED_PATH = os.path.join(BENCHMARK_DIR, "fixtures", "meduza_rss.xml")
+PAGES_DIR = os.path.join(BENCHMARK_DIR, "..", "tests", "fixtures", "meduza")
+
+ORIGIN = "https://meduza.io"
+
+_ITEM = re.compile(r"<item>.*?</item>", re.DOTALL)
+_LINK = re.compile(r"<link>(.*?)</link>")
+
+
+class ReplayServer:
+    """
+    記録したRSSフィードと記事ページを配信するローカルのHTTPサーバー
+
+    フィード内のmeduza.ioのURLはこのサーバーのURLに書き換える。各記事のURLには
+    保存済みのページを順に割り当てる。
+    """
+
+    def __init__(self, articles: int, latency: float = 0.0):
+        """
+        Args:
+            articles (int): フィードに載せる記事数（記録した記事を複製して増やす）
+            latency (float): 1レスポンスあたりの遅延（秒）
+        """
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.feed, self.pages = self._build(articles)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def rss_url(self) -> str:
+        return self.base_url + "/rss/all"
+
+    def _build(self, articles: int) -> Tuple[bytes, Dict[str, bytes]]:
+        """配信するフィードとページ（パスごと）を作成"""
+        with open(FEED_PATH, encoding="utf-8") as f:
+            feed = f.read()
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(PAGES_DIR, "*.html"))):
+            with open(path, "rb") as f:
+                corpus.append(f.read())
+
+        recorded = _ITEM.findall(feed)
+        items = []
+        pages = {}
+        for index in range(articles):
+            item = recorded[index % len(recorded)]
+            copy = index // len(recorded)
+            link = _LINK.search(item).group(1)
+            if copy:
+                item = item.replace(link, f"{link}-{copy}")
+                link = f"{link}-{copy}"
+            # 複製した記事のページは内容を変え、要約のメモなどが効かないようにする
+            page = corpus[index % len(corpus)]
+            if index >= len(corpus):
+                page = page.replace(b"<p>", f"<p>[{index}] ".encode("ascii"), 1)
+            pages[urlparse(link).path] = page
+            items.append(item)
+
+        head, tail = feed.split(recorded[0], 1)[0], feed.rsplit(recorded[-1], 1)[1]
+        feed = head + "\n    ".join(items) + tail
+        return feed.replace(ORIGIN, self.base_url).encode("utf-8"), pages
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                path = urlparse(self.path).path
+                if path == "/rss/all":
+                    body, content_type = server.feed, "application/rss+xml; charset=utf-8"
+                elif path in server.pages:
+                    body, content_type = server.pages[path], "text/html"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class PeakRss:
+    """
+    計測区間中のピークRSS（常駐メモリ）を記録する
+
+    /proc/self/statm を一定間隔で読む。/proc がない環境ではプロセス全体の
+    最大RSS（getrusage）を使う。
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def _current(self) -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Linuxはキロバイト、macOSはバイト
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self._current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._current())
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """最近傍順位法によるパーセンタイル"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def stage_result(latencies: List[float], seconds: float, peak_rss: int, **extra) -> Dict:
+    """ステージの計測結果"""
+    articles = len(latencies)
+    return dict({
+        "articles": articles,
+        "seconds": round(seconds, 4),
+        "articles_per_sec": round(articles / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }, **extra)
+
+
+def run_each(items: List, func: Callable) -> Tuple[List, List[float], float, int]:
+    """itemsを1件ずつfuncで処理し、結果・1件ごとの秒数・合計秒数・ピークRSSを返す"""
+    results, latencies = [], []
+    with PeakRss() as rss:
+        started = time.perf_counter()
+        for item in items:
+            item_started = time.perf_counter()
+            results.append(func(item))
+            latencies.append(time.perf_counter() - item_started)
+        seconds = time.perf_counter() - started
+    return results, latencies, seconds, rss.peak
+
+
+def make_translator(args) -> MeduzaTranslator:
+    """スタブの翻訳バックエンドを使う翻訳器（翻訳メモリは使わない）"""
+    backend = StubBackend(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    limiter = AdaptiveRateLimiter(rate=args.rate, burst=args.rate, max_rate=args.rate)
+    return MeduzaTranslator(backend=backend, use_cache=False, rate_limiter=limiter)
+
+
+def bench_fetch(args) -> Tuple[List[Dict], Dict]:
+    """fetch_meduza_articlesの計測"""
+    latencies = []
+    resolve = MeduzaFetcher.resolve_article_content
+
+    def timed_resolve(fetcher, article):
+        started = time.perf_counter()
+        try:
+            return resolve(fetcher, article)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    with patch.object(MeduzaFetcher, "resolve_article_content", timed_resolve), PeakRss() as rss:
+        started = time.perf_counter()
+        articles = fetch_meduza_articles(limit=args.articles, max_workers=DEFAULT_STAGE_WORKERS["fetch"])
+        seconds = time.perf_counter() - started
+    return articles, stage_result(latencies, seconds, rss.peak)
+
+
+def bench_translate(args, articles: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """MeduzaTranslator.translate_articleの計測"""
+    translator = make_translator(args)
+    translated, latencies, seconds, peak = run_each(
+        articles, lambda article: translator.translate_article(article, summarize=False)
+    )
+    failed = sum(1 for article in translated if not article or not article.get("translated_content"))
+    backend = translator.backend
+    result = stage_result(latencies, seconds, peak, failed=failed,
+                          requests=backend.requests, characters=backend.characters)
+    return [article for article in translated if article], result
+
+
+def bench_summarize(articles: List[Dict]) -> Dict:
+    """MeduzaSummarizer.summarize_textの計測（要約のメモは使わない）"""
+    summarizer = MeduzaSummarizer("russian", max_cached_summaries=0)
+    _, latencies, seconds, peak = run_each(
+        articles, lambda article: summarizer.summarize_text(article.get("content", ""), DEFAULT_SUMMARY_LENGTH)
+    )
+    return stage_result(latencies, seconds, peak)
+
+
+def bench_db_write(articles: List[Dict], db_path: str) -> Dict:
+    """save_article_to_dbの計測"""
+    init_db(db_path)
+    saved, latencies, seconds, peak = run_each(articles, lambda article: save_article_to_db(article, db_path))
+    return stage_result(latencies, seconds, peak, saved=sum(saved))
+
+
+def bench_end_to_end(args, db_path: str) -> Dict:
+    """ingest_articlesの計測（1記事あたりの所要時間は本文の取得開始から保存まで）"""
+    init_db(db_path)
+    started_at: Dict[str, float] = {}
+    latencies = []
+    resolve = MeduzaFetcher.resolve_article_content
+
+    def timed_resolve(fetcher, article):
+        started_at[article["article_key"]] = time.perf_counter()
+        return resolve(fetcher, article)
+
+    def store(article: Dict) -> bool:
+        saved = save_article_to_db(article, db_path)
+        latencies.append(time.perf_counter() - started_at[article["article_key"]])
+        return saved
+
+    translator = make_translator(args)
+    with patch.object(MeduzaFetcher, "resolve_article_content", timed_resolve), PeakRss() as rss:
+        started = time.perf_counter()
+        result = ingest_articles(
+            limit=args.articles,
+            db_path=db_path,
+            translator=translator,
+            store=store,
+            known_keys_lookup=lambda keys: set(),
+            mode=args.mode
+        )
+        seconds = time.perf_counter() - started
+    return stage_result(latencies, seconds, rss.peak, saved=result.saved,
+                        page_fetches_avoided=result.page_fetches_avoided)
+
+
+def environment() -> Dict:
+    """計測環境（比較のためにコミットも記録する）"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(args) -> Dict:
+    workdir = tempfile.TemporaryDirectory()
+    cwd = os.getcwd()
+    # ページキャッシュ・フィードのバリデータなどの保存先（相対パス）を一時ディレクトリにする
+    os.chdir(workdir.name)
+    try:
+        with ReplayServer(args.articles, args.http_latency) as server, \
+                patch.dict(os.environ, {"MEDUZA_RSS_URL": server.rss_url}):
+            stages = {}
+            articles, stages["fetch"] = bench_fetch(args)
+            translated, stages["translate"] = bench_translate(args, articles)
+            stages["summarize"] = bench_summarize(articles)
+            stages["db_write"] = bench_db_write(translated, os.path.join(workdir.name, "stage.db"))
+            stages["end_to_end"] = bench_end_to_end(args, os.path.join(workdir.name, "e2e.db"))
+    finally:
+        os.chdir(cwd)
+        workdir.cleanup()
+
+    return {
+        "config": {
+            "articles": args.articles,
+            "mode": args.mode,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "http_latency": args.http_latency,
+            "rate": args.rate,
+            "seed": args.seed,
+        },
+        "environment": environment(),
+        "stages": stages,
+    }
+
+
+def print_table(report: Dict, baseline: Optional[Dict] = None) -> None:
+    """結果を表で表示（ベースラインがあれば記事数/秒の比も表示）"""
+    header = f"{'ステージ':<12} {'記事':>5} {'秒':>8} {'記事/秒':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'RSS(MB)':>8}"
+    if baseline:
+        header += f" {'前回比':>7}"
+    print(header)
+    for name, stage in report["stages"].items():
+        line = (f"{name:<12} {stage['articles']:>5} {stage['seconds']:>8.3f} {stage['articles_per_sec'] or 0:>9.1f} "
+                f"{stage['p50_ms'] or 0:>9.1f} {stage['p95_ms'] or 0:>9.1f} {stage['peak_rss_mb']:>8.1f}")
+        if baseline:
+            before = baseline.get("stages", {}).get(name, {}).get("articles_per_sec")
+            line += f" {stage['articles_per_sec'] / before:>6.2f}x" if before and stage["articles_per_sec"] else f" {'-':>7}"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="取り込み処理のオフラインベンチマーク")
+    parser.add_argument("--articles", type=int, default=40, help="フィードに載せる記事数")
+    parser.add_argument("--mode", choices=INGEST_MODES, default=INGEST_MODE_FULL, help="end_to_endの処理モード")
+    parser.add_argument("--latency", type=float, default=0.0, help="スタブの翻訳の1リクエストあたりの遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="スタブの翻訳がエラーになる確率")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="ローカルサーバーの1レスポンスあたりの遅延（秒）")
+    parser.add_argument("--rate", type=float, default=1000.0, help="翻訳リクエストの速度の上限（リクエスト/秒）")
+    parser.add_argument("--seed", type=int, default=0, help="スタブの翻訳の乱数シード")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    parser.add_argument("--output", help="結果のJSONを書き出すファイル")
+    parser.add_argument("--baseline", help="比較する前回の結果（--outputで書き出したJSON）")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        print_table(report, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
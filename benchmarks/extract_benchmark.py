@@ -0,0 +1,134 @@
+# benchmarks/extract_benchmark.py
+
+"""
+本文抽出のベンチマーク
+置き換え前のBeautifulSoupによる抽出とsrc.extractで、抽出時間と出力文字数を比べる
+
+保存済みの記事ページ（tests/fixtures/meduza）に加え、div・spanの入れ子の深さを変えた
+ロングリード風のページを生成して計測する。
+
+使い方:
+    python -m benchmarks.extract_benchmark [--paragraphs 200] [--depths 1 4 8] [--repeat 5] [--json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from src.extract import extract_article_text
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "meduza")
+
+LEGACY_SELECTORS = [
+    'div.GeneralMaterial-article',
+    'div.RichText',
+    'div.SimpleBlock-article',
+    'article',
+    '.article-content',
+    '.post-content'
+]
+
+
+def extract_legacy(content: bytes) -> str:
+    """置き換え前の抽出（MeduzaFetcher.fetch_article_contentのセレクタ順の探索）"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+
+    for selector in LEGACY_SELECTORS:
+        content_div = soup.select_one(selector)
+        if content_div:
+            paragraphs = content_div.find_all(['p', 'div', 'span'])
+            text = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+            if text and len(text) > 100:
+                return text
+
+    paragraphs = soup.find_all('p')
+    return '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+
+
+def make_page(paragraphs: int, depth: int) -> bytes:
+    """各段落をdepth段のdiv/spanで包んだ記事ページを作成"""
+    blocks = []
+    for i in range(paragraphs):
+        text = (f"Абзац {i}: власти объявили о новых мерах, а эксперты предупредили "
+                f"о последствиях для экономики и рынка труда.")
+        inner = f"<span>{text}</span>"
+        for level in range(depth):
+            inner = f'<div class="SimpleBlock-wrap-{level}">{inner}</div>'
+        blocks.append(inner)
+    body = "\n".join(blocks)
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Лонгрид</title>'
+        '<script>window.state = {};</script></head><body>'
+        f'<div class="GeneralMaterial-article"><div class="RichText">{body}</div></div>'
+        '</body></html>'
+    ).encode("utf-8")
+
+
+def load_pages(paragraphs: int, depths: List[int]) -> List[Tuple[str, bytes]]:
+    """計測するページ（保存済みのページと生成したページ）"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read()))
+    for depth in depths:
+        pages.append((f"generated-{paragraphs}p-depth{depth}", make_page(paragraphs, depth)))
+    return pages
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """repeat回実行した中で最短の秒数"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run(paragraphs: int, depths: List[int], repeat: int) -> List[Dict]:
+    results = []
+    for name, page in load_pages(paragraphs, depths):
+        legacy_seconds = best_time(lambda: extract_legacy(page), repeat)
+        lxml_seconds = best_time(lambda: extract_article_text(page), repeat)
+        legacy_chars = len(extract_legacy(page))
+        lxml_chars = len(extract_article_text(page) or "")
+        results.append({
+            "page": name,
+            "html_bytes": len(page),
+            "legacy_seconds": round(legacy_seconds, 5),
+            "lxml_seconds": round(lxml_seconds, 5),
+            "speedup": round(legacy_seconds / lxml_seconds, 1),
+            "legacy_chars": legacy_chars,
+            "lxml_chars": lxml_chars,
+            "size_ratio": round(lxml_chars / legacy_chars, 3) if legacy_chars else None,
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="本文抽出のベンチマーク")
+    parser.add_argument("--paragraphs", type=int, default=200, help="生成するページの段落数")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 4, 8], help="生成するページの入れ子の深さ")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    results = run(args.paragraphs, args.depths, args.repeat)
+    if args.json:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(f"{'ページ':<28} {'旧(秒)':>9} {'lxml(秒)':>9} {'倍率':>6} {'旧(文字)':>9} {'lxml(文字)':>10} {'比率':>6}")
+        for r in results:
+            print(f"{r['page']:<28} {r['legacy_seconds']:>9.5f} {r['lxml_seconds']:>9.5f} {r['speedup']:>5.1f}x "
+                  f"{r['legacy_chars']:>9} {r['lxml_chars']:>10} {r['size_ratio'] or 0:>6.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
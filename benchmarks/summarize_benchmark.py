@@ -0,0 +1,98 @@
+# benchmarks/summarize_benchmark.py
+
+"""
+要約のベンチマーク
+sumyのLexRankSummarizerとsrc.lexrankのLexRankで、文数の違う記事の要約時間を比べる
+
+使い方:
+    python -m benchmarks.summarize_benchmark [--sizes 50 100 200 400] [--repeat 3] [--json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+from sumy.parsers.plaintext import PlaintextParser
+from sumy.nlp.tokenizers import Tokenizer
+from sumy.summarizers.lex_rank import LexRankSummarizer
+
+from src.lexrank import LexRank
+
+WORDS = (
+    "政府 大統領 ロシア ウクライナ 停戦 交渉 モスクワ 会談 経済 制裁 軍 攻撃 ドローン 市民 選挙 "
+    "野党 裁判所 記者 報道 石油 価格 銀行 ルーブル 国境 難民 議会 法案 当局 拘束 抗議 動員 前線"
+).split()
+PARTICLES = "は が を に で と の も".split()
+ENDINGS = ("した。", "している。", "と述べた。", "と伝えた。", "？")
+
+
+def make_article(sentence_count: int, seed: int = 0) -> str:
+    """ベンチマーク用の記事を作成（5文ごとに段落を分ける）"""
+    r = random.Random(seed)
+    paragraphs = []
+    for start in range(0, sentence_count, 5):
+        paragraphs.append("".join(
+            "".join(r.choice(WORDS) + r.choice(PARTICLES) for _ in range(r.randint(3, 9))) + r.choice(ENDINGS)
+            for _ in range(min(5, sentence_count - start))
+        ))
+    return "\n\n".join(paragraphs)
+
+
+def summarize_with_sumy(text: str, count: int):
+    """置き換え前の要約（呼び出しごとに分割器と要約器を作る）"""
+    parser = PlaintextParser.from_string(text, Tokenizer("japanese"))
+    return tuple(str(sentence) for sentence in LexRankSummarizer()(parser.document, count))
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """repeat回実行した中で最短の秒数"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run(sizes: List[int], repeat: int, count: int) -> List[Dict]:
+    lexrank = LexRank(max_sentences=None)
+    results = []
+    for size in sizes:
+        text = make_article(size, seed=size)
+        sumy_seconds = best_time(lambda: summarize_with_sumy(text, count), repeat)
+        lexrank_seconds = best_time(lambda: lexrank.summarize(text, count), repeat)
+        results.append({
+            "sentences": size,
+            "sumy_seconds": round(sumy_seconds, 4),
+            "lexrank_seconds": round(lexrank_seconds, 4),
+            "speedup": round(sumy_seconds / lexrank_seconds, 1),
+            "same_output": summarize_with_sumy(text, count) == lexrank.summarize(text, count),
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="要約のベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400], help="記事の文数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    parser.add_argument("--count", type=int, default=3, help="抽出する文数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.count)
+    if args.json:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(f"{'文数':>6} {'sumy(秒)':>10} {'LexRank(秒)':>12} {'倍率':>6} 一致")
+        for r in results:
+            print(f"{r['sentences']:>6} {r['sumy_seconds']:>10.4f} {r['lexrank_seconds']:>12.4f} "
+                  f"{r['speedup']:>5.1f}x {'○' if r['same_output'] else '×'}")
+    return 0 if all(r["same_output"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
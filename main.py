@@ -2,43 +2,161 @@
 """
 Meduza Translator - メインエントリーポイント
 """
-from src.fetch_articles import fetch_meduza_articles
-from src.translate import MeduzaTranslator
-from src.summarize import summarize_article
-from src.database import init_db, save_article_to_db
+import argparse
+import os
+from datetime import datetime
 
-def main():
-    # データベース初期化
-    init_db()
-    
-    # 記事取得
+from src.database import rebuild_fts_index
+from src.ingest_service import (
+    IngestService, ingest_articles, DEFAULT_POLL_INTERVAL, DEFAULT_POLL_JITTER, DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_STAGE_WORKERS
+)
+from src.jobs import INGEST_MODES, INGEST_MODE_FULL
+from src.fetch_articles import CONTENT_SOURCES, CONTENT_SOURCE_AUTO
+from src.reextract import reextract_articles, DEFAULT_REEXTRACT_BATCH_SIZE
+from src.export import (
+    export_articles, export_filename, prune_exports, EXPORT_DIR, EXPORT_FORMATS, DEFAULT_EXPORT_BATCH_SIZE,
+    DEFAULT_EXPORT_KEEP
+)
+from src.utils import parse_published_timestamp
+from src.metrics import DEFAULT_METRICS_PORT
+from src.migrations import migrate, run_backfills, get_schema_version, DEFAULT_BACKFILL_BATCH_SIZE
+
+def add_stage_worker_arguments(parser: argparse.ArgumentParser):
+    """パイプラインのステージごとのワーカー数の引数を追加"""
+    for stage, workers in DEFAULT_STAGE_WORKERS.items():
+        parser.add_argument(f"--{stage}-workers", type=int, default=workers,
+                            help=f"{stage}ステージのワーカー数")
+
+def stage_workers_from_args(args) -> dict:
+    """引数からステージごとのワーカー数を取得"""
+    return {stage: getattr(args, f"{stage}_workers") for stage in DEFAULT_STAGE_WORKERS}
+
+def add_mode_argument(parser: argparse.ArgumentParser):
+    """処理モードと本文の取得元の引数を追加"""
+    parser.add_argument("--mode", choices=INGEST_MODES, default=INGEST_MODE_FULL,
+                        help="full: 本文を翻訳して要約 / digest: 原文を要約してタイトルと要約だけを翻訳")
+    parser.add_argument("--content-source", choices=CONTENT_SOURCES, default=CONTENT_SOURCE_AUTO,
+                        help="auto: RSSの本文で足りる記事はページを取得しない / page: 常にページを取得")
+
+def run_ingest(
+    limit: int = 3,
+    stage_workers: dict = None,
+    mode: str = INGEST_MODE_FULL,
+    content_source: str = CONTENT_SOURCE_AUTO
+):
+    """新着記事を取得・翻訳・要約してDBに保存"""
     print("📰 Meduza記事を取得中...")
-    articles = fetch_meduza_articles(limit=3)
-    
-    # 翻訳器初期化
-    translator = MeduzaTranslator()
-
-    for i, article in enumerate(articles, 1):
-        print(f"\n=== 記事 {i}/{len(articles)} ===")
-        print(f"原題: {article['title']}")
-        
-        # 翻訳
-        print("🌐 翻訳中...")
-        translated = translator.translate_article(article)
-        print(f"和訳: {translated.get('translated_title', '翻訳失敗')}")
-        
-        # 要約
-        print("📝 要約作成中...")
-        summary = summarize_article(translated.get('translated_content', ''))
-        translated['summary'] = summary
-        print(f"要約: {summary[:100]}..." if summary else "要約失敗")
-        
-        # 保存
-        print("💾 データベースに保存中...")
-        save_article_to_db(translated)
-        print("✅ 保存完了")
-
-    print(f"\n🎉 {len(articles)}件の記事処理が完了しました！")
+    result = ingest_articles(
+        limit=limit,
+        on_progress=lambda done, total, message: print(message),
+        stage_workers=stage_workers,
+        mode=mode,
+        content_source=content_source
+    )
+    if not result.fetched:
+        print("新着記事はありません")
+        return
+
+    print(f"✅ {result.saved}件を保存しました")
+    if result.page_fetches_avoided:
+        print(f"📄 {result.page_fetches_avoided}件はRSSの本文を使い、ページの取得を省きました")
+    print(f"\n🎉 {result.fetched}件の記事処理が完了しました！")
+
+def main():
+    parser = argparse.ArgumentParser(description="Meduza Translator")
+    subparsers = parser.add_subparsers(dest="command")
+
+    ingest_parser = subparsers.add_parser("ingest", help="新着記事を取得・翻訳・保存（既定）")
+    ingest_parser.add_argument("--limit", type=int, default=3, help="処理する記事数")
+    add_mode_argument(ingest_parser)
+    add_stage_worker_arguments(ingest_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="取り込みサービスを常駐させる（定期確認とビューアからのジョブ）")
+    serve_parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                              help="フィードを確認する間隔（秒、0なら定期確認しない）")
+    serve_parser.add_argument("--jitter", type=float, default=DEFAULT_POLL_JITTER,
+                              help="確認間隔の揺らぎの割合")
+    serve_parser.add_argument("--limit", type=int, default=3, help="1回の取り込みで処理する記事数")
+    serve_parser.add_argument("--heartbeat", type=float, default=DEFAULT_HEARTBEAT_INTERVAL,
+                              help="ハートビートを書き込む間隔（秒）")
+    serve_parser.add_argument("--metrics-port", type=int, default=DEFAULT_METRICS_PORT,
+                              help="指標（Prometheusのテキスト形式）を127.0.0.1で公開するポート（0なら公開しない）")
+    add_mode_argument(serve_parser)
+    add_stage_worker_arguments(serve_parser)
+
+    subparsers.add_parser("rebuild-fts", help="全文検索インデックスを再構築（修復用）")
+
+    migrate_parser = subparsers.add_parser("migrate", help="DBスキーマを最新化し、既存記事のカラムを埋める")
+    migrate_parser.add_argument("--batch-size", type=int, default=DEFAULT_BACKFILL_BATCH_SIZE,
+                                help="バックフィルで1トランザクションに処理する行数")
+
+    export_parser = subparsers.add_parser("export", help="記事アーカイブをファイルに書き出す")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="出力形式")
+    export_parser.add_argument("--output", help=f"出力ファイルパス（省略時は{EXPORT_DIR}/に作成し、新しい{DEFAULT_EXPORT_KEEP}件だけを残す）")
+    export_parser.add_argument("--search", default="", help="検索キーワードで絞り込む")
+    export_parser.add_argument("--since", help="この日付（YYYY-MM-DD）以降の記事に絞り込む")
+    export_parser.add_argument("--batch-size", type=int, default=DEFAULT_EXPORT_BATCH_SIZE,
+                               help="1回に読み出す行数")
+
+    reextract_parser = subparsers.add_parser("reextract", help="保存済みのページから記事の原文を抽出し直す（ページは再取得しない）")
+    reextract_parser.add_argument("--since", help="この日付（YYYY-MM-DD）以降に公開された記事に絞り込む")
+    reextract_parser.add_argument("--until", help="この日付（YYYY-MM-DD）より前に公開された記事に絞り込む")
+    reextract_parser.add_argument("--workers", type=int, default=None, help="抽出のワーカープロセス数（省略時はCPU数）")
+    reextract_parser.add_argument("--batch-size", type=int, default=DEFAULT_REEXTRACT_BATCH_SIZE,
+                                  help="1トランザクションで保存する記事数")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        IngestService(
+            poll_interval=args.interval,
+            jitter=args.jitter,
+            article_limit=args.limit,
+            heartbeat_interval=args.heartbeat,
+            stage_workers=stage_workers_from_args(args),
+            mode=args.mode,
+            content_source=args.content_source,
+            metrics_port=args.metrics_port or None
+        ).run()
+    elif args.command == "migrate":
+        before = get_schema_version()
+        after = migrate()
+        print(f"🗂️ スキーマバージョン: {before} → {after}")
+        for column, count in run_backfills(batch_size=args.batch_size).items():
+            print(f"   {column}: {count}件を更新")
+    elif args.command == "export":
+        output = args.output or os.path.join(
+            EXPORT_DIR, export_filename(args.format, datetime.now().strftime('%Y%m%d_%H%M%S'))[0]
+        )
+        since = parse_published_timestamp(args.since) if args.since else None
+        count = export_articles(output, args.format, args.search, since, batch_size=args.batch_size)
+        if not args.output:
+            prune_exports(EXPORT_DIR)
+        print(f"📥 {count}件の記事をエクスポートしました: {output}")
+    elif args.command == "reextract":
+        result = reextract_articles(
+            since=parse_published_timestamp(args.since) if args.since else None,
+            until=parse_published_timestamp(args.until) if args.until else None,
+            workers=args.workers,
+            batch_size=args.batch_size
+        )
+        print(f"🧾 {result.selected}件中 {result.updated}件の原文を更新しました")
+        if result.missing or result.failed:
+            print(f"   キャッシュなし: {result.missing}件 / 抽出失敗: {result.failed}件")
+    elif args.command == "rebuild-fts":
+        count = rebuild_fts_index()
+        print(f"🔎 全文検索インデックスを再構築しました（{count}件）")
+    else:
+        if args.command == "ingest":
+            run_ingest(
+                limit=args.limit,
+                stage_workers=stage_workers_from_args(args),
+                mode=args.mode,
+                content_source=args.content_source
+            )
+        else:
+            run_ingest()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
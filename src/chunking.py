@@ -0,0 +1,166 @@
+# chunking.py
+
+"""
+翻訳用テキスト分割
+段落・文の境界で分割し、翻訳APIの文字数上限まで詰めてリクエスト数を減らす
+"""
+
+import re
+from typing import List, NamedTuple
+
+# deep-translator (GoogleTranslator) は 5000文字未満のみ受け付ける
+MAX_CHUNK_CHARS = 4999
+
+# 文末候補: 終止符の後に閉じ括弧・引用符が続き、空白が来る位置
+_SENTENCE_END = re.compile(r'[.!?…]+[»”"’)\]]*\s+')
+
+# 文頭になりうる文字（大文字・数字・開き引用符・ダッシュ）
+_SENTENCE_START = re.compile(r'[«“"„(\[—–\-A-ZА-ЯЁ0-9]')
+
+# ピリオドの後でも文を区切らない略語（小文字で比較）
+_ABBREVIATIONS = {
+    "г", "гг", "т", "е", "д", "ул", "им", "см", "др", "пр", "проф", "акад",
+    "тыс", "млн", "млрд", "руб", "долл", "св", "ст", "стр", "рис", "англ",
+    "mr", "mrs", "dr", "st", "vs",
+}
+
+
+class TextChunk(NamedTuple):
+    """翻訳単位のチャンク"""
+    text: str
+    starts_paragraph: bool
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    テキストを段落（改行区切り）に分割
+
+    Args:
+        text (str): 対象テキスト
+
+    Returns:
+        List[str]: 空でない段落のリスト
+    """
+    return [line.strip() for line in (text or "").splitlines() if line.strip()]
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    """
+    段落を文に分割（ロシア語の句読点・略語・イニシャルを考慮）
+
+    Args:
+        paragraph (str): 対象の段落
+
+    Returns:
+        List[str]: 文のリスト
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        end = match.end()
+        if end >= len(paragraph) or not _SENTENCE_START.match(paragraph[end]):
+            continue
+
+        # 「В. Путин」のようなイニシャルや「т. е.」などの略語では区切らない
+        head = paragraph[start:match.start()]
+        last_word = head.rsplit(None, 1)[-1] if head.strip() else ""
+        last_word = last_word.lstrip("«“\"(")
+        if match.group().startswith(".") and (
+            len(last_word) == 1 or last_word.lower() in _ABBREVIATIONS
+        ):
+            continue
+
+        sentences.append(paragraph[start:end].strip())
+        start = end
+
+    tail = paragraph[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def _split_oversized(sentence: str, max_chars: int) -> List[str]:
+    """上限を超える文を単語境界で分割（単語自体が長すぎる場合は強制的に切る）"""
+    pieces = []
+    current = ""
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            pieces.append(current)
+            current = word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_chunks(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[TextChunk]:
+    """
+    テキストを段落・文の境界で分割し、上限文字数まで貪欲に詰める
+
+    段落内の文は空白、段落同士は改行で連結する。上限を超える段落だけを
+    文に分割するため、段落の途中でチャンクが切れるのはその場合のみ。
+
+    Args:
+        text (str): 対象テキスト
+        max_chars (int): 1チャンクの最大文字数
+
+    Returns:
+        List[TextChunk]: 元の順序のチャンクのリスト
+    """
+    # (文字列, 段落の先頭かどうか) の列に展開
+    segments = []
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= max_chars:
+            segments.append((paragraph, True))
+            continue
+        first = True
+        for sentence in split_sentences(paragraph):
+            pieces = [sentence] if len(sentence) <= max_chars else _split_oversized(sentence, max_chars)
+            for piece in pieces:
+                segments.append((piece, first))
+                first = False
+
+    chunks: List[TextChunk] = []
+    current = ""
+    current_starts = True
+    for segment, starts_paragraph in segments:
+        separator = "\n" if starts_paragraph else " "
+        if current and len(current) + len(separator) + len(segment) <= max_chars:
+            current += separator + segment
+            continue
+        if current:
+            chunks.append(TextChunk(current, current_starts))
+        current = segment
+        current_starts = starts_paragraph
+    if current:
+        chunks.append(TextChunk(current, current_starts))
+
+    return chunks
+
+
+def join_chunks(chunks: List[TextChunk], translations: List[str], sentence_separator: str = " ") -> str:
+    """
+    翻訳済みチャンクを元の段落構造どおりに連結
+
+    Args:
+        chunks (List[TextChunk]): pack_chunksの結果
+        translations (List[str]): 各チャンクの翻訳（chunksと同じ順序）
+        sentence_separator (str): 段落の途中で分かれたチャンクの連結文字
+
+    Returns:
+        str: 連結したテキスト
+    """
+    parts = []
+    for i, (chunk, translated) in enumerate(zip(chunks, translations)):
+        if i > 0:
+            parts.append("\n" if chunk.starts_paragraph else sentence_separator)
+        parts.append(translated)
+    return "".join(parts)
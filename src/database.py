@@ -2,49 +2,380 @@
 
 import sqlite3
 import os
+import logging
 from datetime import datetime
-from typing import Optional, Dict
-
-DB_PATH = "data/articles.db"
-
-def init_db():
-    """初期テーブルを作成（初回のみ呼び出す）"""
-    os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS articles (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT,
-        content TEXT,
-        translated_title TEXT,
-        translated_content TEXT,
-        summary TEXT,
-        published TEXT
-    )
-    """)
+from typing import Optional, Dict, Iterable, List, Set, Tuple, Union
+from src.utils import parse_published_timestamp, compute_content_hash
+from src.repository import DB_PATH, get_connection, transaction
+from src.migrations import migrate, backfills_pending, run_backfills, ensure_fts, has_fts
+from src.metrics import ARTICLES, STAGE_SECONDS
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# trigramトークナイザは3文字以上の語しか検索できない
+FTS_MIN_TERM_LENGTH = 3
+
+# 記事一覧で取得する軽量カラム（本文はget_article_contentsで必要なときだけ取得）
+ARTICLE_LIST_COLUMNS = ("id", "translated_title", "summary", "published", "title", "snippet", "published_at")
 
-    conn.commit()
-    conn.close()
+# 次ページの開始位置：日付順は最後の記事の (published_at, id)、検索の関連度順は件数オフセット
+PageCursor = Union[Tuple[Optional[int], int], int]
+
+def init_db(db_path: str = DB_PATH):
+    """スキーマを最新化し、未設定のカラムを埋める（起動時に呼び出す）"""
+    migrate(db_path)
+    # バックフィルは完了を記録したスキーマバージョンまでは再実行しない（毎回の全件走査を避ける）
+    if backfills_pending(db_path) and any(run_backfills(db_path).values()):
+        with transaction(db_path) as conn:
+            bump_db_generation(conn)
+
+
+def get_db_generation(db_path: str = DB_PATH) -> int:
+    """
+    データベースの世代番号を取得
+    
+    記事が追加・更新されるたびに増えるため、ビューアのキャッシュキーに使う。
+    
+    Args:
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        int: 世代番号（DBやメタ情報テーブルがなければ0）
+    """
+    if not os.path.exists(db_path):
+        return 0
+    try:
+        row = get_connection(db_path).execute(
+            "SELECT value FROM meta WHERE key = 'generation'"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def bump_db_generation(conn: sqlite3.Connection) -> None:
+    """世代番号を1つ進める（記事を書き込んだトランザクション内で呼び出す）"""
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+
+def rebuild_fts_index(db_path: str = DB_PATH) -> int:
+    """
+    既存の記事から全文検索インデックスを再構築（修復用）
+
+    既存の記事の登録はマイグレーションで行われるため、通常は不要。
+    インデックスが壊れた場合などに手動で実行する。
+    
+    Args:
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        int: インデックス対象の記事数
+    """
+    init_db(db_path)
+    with transaction(db_path) as conn:
+        if not ensure_fts(conn.cursor()):
+            logger.warning("全文検索が使えないため、再構築をスキップします")
+            return 0
+        conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+        # 全件を登録したので、バックフィル待ちの記事はない
+        conn.execute("UPDATE meta SET value = 0 WHERE key = 'fts_unindexed_max'")
+        bump_db_generation(conn)
+        count = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    logger.info(f"全文検索インデックスを再構築しました（{count}件）")
+    return count
 
 
-def save_article_to_db(article: Dict, db_path="data/articles.db") -> None:
-    """記事データをSQLiteに保存"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def build_fts_query(query: str) -> Optional[str]:
+    """
+    検索キーワードをFTS5のMATCH式に変換
     
-    cursor.execute('''
-        INSERT INTO articles (title, content, translated_title, translated_content, summary, published)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (
+    空白区切りの各語をフレーズとして引用し、AND検索にする。
+    trigramで検索できない短い語を含む場合はNoneを返す（LIKE検索を使う）。
+    
+    Args:
+        query (str): 検索キーワード
+        
+    Returns:
+        Optional[str]: MATCH式
+    """
+    terms = (query or "").split()
+    if not terms or any(len(term) < FTS_MIN_TERM_LENGTH for term in terms):
+        return None
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def get_existing_article_keys(keys: Iterable[str], db_path: str = DB_PATH) -> Set[str]:
+    """
+    保存済みの記事キーを1回のクエリでまとめて取得
+    
+    Args:
+        keys (Iterable[str]): 確認する記事キー
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        Set[str]: DBに既に存在する記事キー
+    """
+    keys = list({key for key in keys if key})
+    if not keys or not os.path.exists(db_path):
+        return set()
+    
+    placeholders = ",".join("?" * len(keys))
+    rows = get_connection(db_path).execute(
+        f"SELECT article_key FROM articles WHERE article_key IN ({placeholders})",
+        keys
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+ARTICLE_INSERT_SQL = '''
+    INSERT OR IGNORE INTO articles (
+        title, content, translated_title, translated_content, summary, published,
+        article_key, published_at, link, content_hash, summary_ja, summary_auto
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _article_row(article: Dict) -> tuple:
+    """記事データをINSERT用のタプルに変換"""
+    return (
         article.get("title"),
         article.get("content"),
         article.get("translated_title"),
         article.get("translated_content"),
         article.get("summary"),
-        article.get("published")
-    ))
+        article.get("published"),
+        article.get("article_key") or None,
+        parse_published_timestamp(article.get("published")),
+        article.get("link"),
+        compute_content_hash(article.get("content")),
+        article.get("summary_ja"),
+        article.get("summary_auto")
+    )
+
+
+def save_article_to_db(article: Dict, db_path=DB_PATH) -> bool:
+    """
+    記事データをSQLiteに保存（同じ記事キーが既にあれば何もしない）
+    
+    Returns:
+        bool: 新しく保存したかどうか
+    """
+    with STAGE_SECONDS.time(stage="db_write"), transaction(db_path) as conn:
+        saved = conn.execute(ARTICLE_INSERT_SQL, _article_row(article)).rowcount > 0
+        if saved:
+            bump_db_generation(conn)
+    if saved:
+        ARTICLES.inc(stage="saved")
+    return saved
+
+
+def save_articles_bulk(articles: List[Dict], db_path=DB_PATH) -> int:
+    """
+    複数の記事を1トランザクションでまとめて保存
+    
+    Args:
+        articles (List[Dict]): 記事データのリスト
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        int: 新しく保存された記事数（記事キーが重複したものは除く）
+    """
+    if not articles:
+        return 0
+    
+    with STAGE_SECONDS.time(stage="db_write"), transaction(db_path) as conn:
+        # rowcountはFTSトリガーによる変更を含まない
+        saved = conn.executemany(ARTICLE_INSERT_SQL, [_article_row(article) for article in articles]).rowcount
+        if saved:
+            bump_db_generation(conn)
+    ARTICLES.inc(saved, stage="saved")
+    logger.info(f"記事を一括保存しました（{saved}/{len(articles)}件）")
+    return saved
+
+
+def list_translated_articles(
+    search_query: str = "",
+    since: Optional[int] = None,
+    limit: int = 20,
+    cursor: Optional[PageCursor] = None,
+    db_path: str = DB_PATH
+) -> Tuple[List[tuple], Optional[PageCursor]]:
+    """
+    翻訳済みの記事一覧を1ページ分取得（本文は含まない）
+    
+    日付順の一覧は (published_at, id) のキーセットでページングするため、
+    何ページ目でもインデックスの範囲検索だけで済む。全文検索の関連度順は
+    スコアで範囲指定できないので件数オフセットでページングする。
+    
+    Args:
+        search_query (str): 検索キーワード（日本語訳とロシア語原文）
+        since (Optional[int]): この時刻（UNIX時刻）以降の記事に絞り込む
+        limit (int): 1ページの件数
+        cursor (Optional[PageCursor]): 前のページが返した次ページの開始位置
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        Tuple[List[tuple], Optional[PageCursor]]:
+            ARTICLE_LIST_COLUMNS順の行と、次ページの開始位置（最後のページならNone）
+    """
+    if not os.path.exists(db_path):
+        return [], None
+    
+    cur = get_connection(db_path).cursor()
+    
+    # 全文検索インデックスが使える場合はFTS5（bm25順・一致箇所のスニペット付き）
+    fts_query = build_fts_query(search_query) if search_query else None
+    use_fts = fts_query is not None and has_fts(cur)
+    
+    if use_fts:
+        query = """
+            SELECT a.id, a.translated_title, a.summary, a.published, a.title,
+                   snippet(articles_fts, -1, '**', '**', '…', 16), a.published_at
+            FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ? AND a.translated_title IS NOT NULL
+        """
+        params = [fts_query]
+    else:
+        query = """
+            SELECT a.id, a.translated_title, a.summary, a.published, a.title, '', a.published_at
+            FROM articles a
+            WHERE a.translated_title IS NOT NULL
+        """
+        params = []
+        
+        # 検索クエリ（短いキーワードなどFTSで扱えない場合）
+        if search_query:
+            query += """ AND (a.translated_title LIKE ? OR a.summary LIKE ? OR a.translated_content LIKE ?
+                              OR a.title LIKE ? OR a.content LIKE ?)"""
+            params.extend([f"%{search_query}%"] * 5)
+    
+    # 日付フィルター（published_atのインデックスで範囲検索）
+    if since is not None:
+        query += " AND a.published_at >= ?"
+        params.append(since)
+    
+    # 次のページがあるか判定するため1件多く取得する
+    if use_fts:
+        # タイトルの一致を本文より重く評価
+        offset = cursor or 0
+        rows = cur.execute(
+            query + " ORDER BY bm25(articles_fts, 10.0, 5.0, 1.0, 10.0, 1.0) LIMIT ? OFFSET ?",
+            params + [limit + 1, offset]
+        ).fetchall()
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], offset + limit
+    
+    order = " ORDER BY a.published_at DESC, a.id DESC LIMIT ?"
+    if cursor is None:
+        rows = cur.execute(query + order, params + [limit + 1]).fetchall()
+    elif cursor[0] is None:
+        rows = cur.execute(
+            query + " AND a.published_at IS NULL AND a.id < ?" + order,
+            params + [cursor[1], limit + 1]
+        ).fetchall()
+    else:
+        # 前のページの最後の記事より古いもの（行値の比較でインデックスを範囲検索する）
+        rows = cur.execute(
+            query + " AND (a.published_at, a.id) < (?, ?)" + order,
+            params + [cursor[0], cursor[1], limit + 1]
+        ).fetchall()
+        # 公開日時のない記事は日付順の最後に続ける
+        if len(rows) <= limit and since is None:
+            rows += cur.execute(
+                query + " AND a.published_at IS NULL" + order,
+                params + [limit + 1 - len(rows)]
+            ).fetchall()
+    
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][6], rows[-1][0])
+
+
+def get_article_contents(article_ids: Iterable[int], db_path: str = DB_PATH) -> Dict[int, str]:
+    """
+    記事の翻訳本文を1回のクエリでまとめて取得
+    
+    Args:
+        article_ids (Iterable[int]): 記事ID
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        Dict[int, str]: 記事IDと翻訳本文
+    """
+    article_ids = list(set(article_ids))
+    if not article_ids or not os.path.exists(db_path):
+        return {}
+    
+    placeholders = ",".join("?" * len(article_ids))
+    rows = get_connection(db_path).execute(
+        f"SELECT id, translated_content FROM articles WHERE id IN ({placeholders})",
+        article_ids
+    ).fetchall()
+    return {row[0]: row[1] or "" for row in rows}
+
+
+def get_untranslated_content(article_id: int, db_path: str = DB_PATH) -> Optional[str]:
+    """
+    本文が未翻訳の記事の原文を取得（ダイジェストモードで取り込んだ記事）
+    
+    Args:
+        article_id (int): 記事ID
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        Optional[str]: 原文（翻訳済み・原文なし・記事がない場合はNone）
+    """
+    if not os.path.exists(db_path):
+        return None
+    row = get_connection(db_path).execute(
+        "SELECT content FROM articles WHERE id = ? AND COALESCE(translated_content, '') = ''",
+        (article_id,)
+    ).fetchone()
+    return row[0] if row and row[0] else None
+
+
+def save_translated_content(article_id: int, translated_content: str, db_path: str = DB_PATH) -> bool:
+    """
+    後から翻訳した本文を保存（全文検索インデックスはトリガーで更新される）
+    
+    Returns:
+        bool: 保存したかどうか（既に翻訳済みの場合はFalse）
+    """
+    with transaction(db_path) as conn:
+        saved = conn.execute(
+            "UPDATE articles SET translated_content = ? WHERE id = ? AND COALESCE(translated_content, '') = ''",
+            (translated_content, article_id)
+        ).rowcount > 0
+        if saved:
+            bump_db_generation(conn)
+    return saved
+
+
+def update_article_contents(contents: Dict[int, str], db_path: str = DB_PATH) -> int:
+    """
+    抽出し直した原文をまとめて保存（content_hashも更新し、全文検索インデックスはトリガーで更新される）
+    
+    Args:
+        contents (Dict[int, str]): 記事IDと原文
+        db_path (str): データベースファイルパス
+        
+    Returns:
+        int: 原文が変わった記事数
+    """
+    if not contents:
+        return 0
     
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        updated = conn.executemany(
+            "UPDATE articles SET content = ?, content_hash = ? WHERE id = ? AND content IS NOT ?",
+            [(content, compute_content_hash(content), article_id, content) for article_id, content in contents.items()]
+        ).rowcount
+        if updated:
+            bump_db_generation(conn)
+    return updated
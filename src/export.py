@@ -0,0 +1,322 @@
+# src/export.py
+
+"""
+記事アーカイブのエクスポート
+SQLiteからカーソルで一定件数ずつ読み出し、CSV・JSON Lines・Parquetに書き出す
+"""
+
+import csv
+import itertools
+import json
+import logging
+import os
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.repository import DB_PATH, data_path, get_connection
+from src.database import build_fts_query, has_fts
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# エクスポートするカラム（この順で書き出す）
+EXPORT_COLUMNS = (
+    "id", "article_key", "link", "published", "published_at",
+    "title", "translated_title", "summary", "summary_ja", "summary_auto",
+    "content", "translated_content",
+)
+
+# 整数として書き出すカラム（それ以外は文字列）
+INTEGER_COLUMNS = {"id", "published_at"}
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# 1回のfetchで読み出す行数（メモリ使用量の上限を決める）
+DEFAULT_EXPORT_BATCH_SIZE = 500
+
+
+
+def export_dir(db_path: str = DB_PATH) -> str:
+    """エクスポートファイルの保存先（DBと同じディレクトリ）"""
+    return data_path("exports", db_path)
+
+
+# 既定のエクスポートの保存先（MEDUZA_DB_PATHに従う）
+EXPORT_DIR = export_dir()
+
+# EXPORT_DIRに残すエクスポートファイルの数（古いものから削除する）
+DEFAULT_EXPORT_KEEP = 5
+
+# export_filenameで作るファイル名の接頭辞
+EXPORT_FILE_PREFIX = "meduza_articles_"
+
+# 書き込み中の一時ファイルの接尾辞（完了したら出力ファイル名に置き換える）
+EXPORT_TMP_SUFFIX = ".tmp"
+
+# ファイル名・一時ファイル名をプロセス内で一意にする連番
+_export_counter = itertools.count(1)
+
+
+def iter_article_batches(
+    search_query: str = "",
+    since: Optional[int] = None,
+    db_path: str = DB_PATH,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE
+) -> Iterator[List[tuple]]:
+    """
+    条件に一致する記事をID順に一定件数ずつ取得
+
+    各バッチは前のバッチの最後のIDから範囲検索するため、アーカイブ全体を
+    読み出しても同時に保持するのは1バッチ分だけになる。
+
+    Args:
+        search_query (str): 検索キーワード（空なら全件）
+        since (Optional[int]): この時刻（UNIX時刻）以降の記事に絞り込む
+        db_path (str): データベースファイルパス
+        batch_size (int): 1バッチの行数
+
+    Yields:
+        List[tuple]: EXPORT_COLUMNS順の行
+    """
+    if not os.path.exists(db_path):
+        return
+
+    conn = get_connection(db_path)
+    query = f"SELECT {', '.join('a.' + c for c in EXPORT_COLUMNS)} FROM articles a WHERE a.id > ?"
+    params: List = []
+
+    if search_query:
+        fts_query = build_fts_query(search_query)
+        if fts_query is not None and has_fts(conn):
+            query += " AND a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+            params.append(fts_query)
+        else:
+            query += """ AND (a.translated_title LIKE ? OR a.summary LIKE ? OR a.translated_content LIKE ?
+                              OR a.title LIKE ? OR a.content LIKE ?)"""
+            params.extend([f"%{search_query}%"] * 5)
+
+    if since is not None:
+        query += " AND a.published_at >= ?"
+        params.append(since)
+
+    query += " ORDER BY a.id LIMIT ?"
+
+    last_id = 0
+    while True:
+        rows = conn.execute(query, [last_id] + params + [batch_size]).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def iter_dict_batches(
+    articles: Iterable[Dict],
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE
+) -> Iterator[List[tuple]]:
+    """
+    記事データ（辞書）をEXPORT_COLUMNS順の行のバッチに変換
+
+    Args:
+        articles (Iterable[Dict]): 記事データ
+        batch_size (int): 1バッチの行数
+
+    Yields:
+        List[tuple]: EXPORT_COLUMNS順の行
+    """
+    batch = []
+    for index, article in enumerate(articles, 1):
+        row = dict(article, id=article.get("id", index))
+        batch.append(tuple(row.get(column) for column in EXPORT_COLUMNS))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_csv(batches: Iterable[List[tuple]], fp: IO[str]) -> int:
+    """
+    バッチをCSVとして書き出す
+
+    Args:
+        batches (Iterable[List[tuple]]): EXPORT_COLUMNS順の行のバッチ
+        fp (IO[str]): 書き込み先（テキストモード、newline=''）
+
+    Returns:
+        int: 書き出した行数
+    """
+    writer = csv.writer(fp)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for batch in batches:
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+def write_jsonl(batches: Iterable[List[tuple]], fp: IO[str]) -> int:
+    """
+    バッチをJSON Lines（1行1記事）として書き出す
+
+    Args:
+        batches (Iterable[List[tuple]]): EXPORT_COLUMNS順の行のバッチ
+        fp (IO[str]): 書き込み先（テキストモード）
+
+    Returns:
+        int: 書き出した行数
+    """
+    count = 0
+    for batch in batches:
+        fp.writelines(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+            for row in batch
+        )
+        count += len(batch)
+    return count
+
+
+def write_parquet(batches: Iterable[List[tuple]], fp) -> int:
+    """
+    バッチをParquetとして書き出す（1バッチを1行グループにする）
+
+    Args:
+        batches (Iterable[List[tuple]]): EXPORT_COLUMNS順の行のバッチ
+        fp: 書き込み先のファイルパスまたはバイナリファイル
+
+    Returns:
+        int: 書き出した行数
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (column, pa.int64() if column in INTEGER_COLUMNS else pa.string())
+        for column in EXPORT_COLUMNS
+    ])
+    count = 0
+    with pq.ParquetWriter(fp, schema) as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            count += len(batch)
+    return count
+
+
+def write_export(batches: Iterable[List[tuple]], path: str, fmt: str) -> int:
+    """
+    バッチを指定した形式でファイルに書き出す
+
+    Args:
+        batches (Iterable[List[tuple]]): EXPORT_COLUMNS順の行のバッチ
+        path (str): 出力ファイルパス
+        fmt (str): "csv"・"jsonl"・"parquet" のいずれか
+
+    Returns:
+        int: 書き出した行数
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"未対応のエクスポート形式です: {fmt}")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 一時ファイルに書き出してから置き換え、書き込み途中のファイルを読まれたり削除されたりしないようにする
+    tmp_path = f"{path}.{os.getpid()}-{next(_export_counter)}{EXPORT_TMP_SUFFIX}"
+    try:
+        if fmt == "parquet":
+            count = write_parquet(batches, tmp_path)
+        else:
+            # CSVはExcelで文字化けしないようBOM付きにする
+            encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+            with open(tmp_path, "w", encoding=encoding, newline="") as fp:
+                count = write_csv(batches, fp) if fmt == "csv" else write_jsonl(batches, fp)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def export_articles(
+    path: str,
+    fmt: str = "csv",
+    search_query: str = "",
+    since: Optional[int] = None,
+    db_path: str = DB_PATH,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE
+) -> int:
+    """
+    アーカイブ全体（または絞り込んだ記事）をファイルにエクスポート
+
+    Args:
+        path (str): 出力ファイルパス
+        fmt (str): "csv"・"jsonl"・"parquet" のいずれか
+        search_query (str): 検索キーワード（空なら全件）
+        since (Optional[int]): この時刻（UNIX時刻）以降の記事に絞り込む
+        db_path (str): データベースファイルパス
+        batch_size (int): 1回に読み出す行数
+
+    Returns:
+        int: エクスポートした記事数
+    """
+    count = write_export(iter_article_batches(search_query, since, db_path, batch_size), path, fmt)
+    logger.info(f"記事をエクスポートしました（{count}件）: {path}")
+    return count
+
+
+def export_filename(fmt: str, timestamp: str) -> Tuple[str, str]:
+    """
+    エクスポートファイル名とMIMEタイプを取得
+
+    同じ秒に複数のエクスポートを作っても上書きしないよう、プロセスIDと連番を付ける。
+
+    Args:
+        fmt (str): エクスポート形式
+        timestamp (str): ファイル名に付ける時刻
+
+    Returns:
+        Tuple[str, str]: (ファイル名, MIMEタイプ)
+    """
+    mime_types = {
+        "csv": "text/csv",
+        "jsonl": "application/x-ndjson",
+        "parquet": "application/vnd.apache.parquet",
+    }
+    return f"{EXPORT_FILE_PREFIX}{timestamp}_{os.getpid()}-{next(_export_counter)}.{fmt}", mime_types[fmt]
+
+
+def prune_exports(directory: str = EXPORT_DIR, keep: int = DEFAULT_EXPORT_KEEP) -> int:
+    """
+    エクスポートファイルを新しいものからkeep件だけ残して削除
+
+    export_filenameで作った名前のファイルだけを対象にし、それ以外のファイルや
+    書き込み中の一時ファイルは削除しない。
+
+    Args:
+        directory (str): エクスポートファイルのディレクトリ
+        keep (int): 残すファイル数
+
+    Returns:
+        int: 削除したファイル数
+    """
+    if not os.path.isdir(directory):
+        return 0
+    suffixes = tuple(f".{fmt}" for fmt in EXPORT_FORMATS)
+    paths = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith(EXPORT_FILE_PREFIX) and name.endswith(suffixes)
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    removed = 0
+    for path in paths[max(0, keep):]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            logger.warning(f"古いエクスポートを削除できません: {path} ({e})")
+    if removed:
+        logger.info(f"古いエクスポートを削除しました（{removed}件）")
+    return removed
@@ -0,0 +1,159 @@
+# src/extract.py
+
+"""
+記事本文の抽出
+記事ページのHTMLをlxmlで1回だけパースし、本文コンテナ内のテキストをブロック要素の単位で取り出す
+"""
+
+import logging
+import re
+from typing import List, Optional, Union
+
+from lxml import etree, html
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 本文コンテナの候補（先に見つかったものを使う）
+# クラス名はclass属性の単語単位で比較する（CSSの .RichText と同じ）
+CONTENT_CONTAINERS = [
+    ("div", "GeneralMaterial-article"),
+    ("div", "RichText"),
+    ("div", "SimpleBlock-article"),
+    ("article", None),
+    (None, "article-content"),
+    (None, "post-content"),
+]
+
+# これより短い抽出結果は本文とみなさず、次の候補を試す
+MIN_CONTENT_CHARS = 100
+
+# テキストの区切りになる要素（この要素の開始・終了で段落を分ける）
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+})
+
+# 本文ではない要素（配下のテキストごと無視する）
+SKIP_TAGS = frozenset({
+    "button", "form", "iframe", "nav", "noscript", "script", "style", "svg", "template",
+})
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _container_xpath(tag: Optional[str], class_name: Optional[str]) -> str:
+    """コンテナ候補をXPathに変換"""
+    path = f"//{tag or '*'}"
+    if class_name:
+        path += f"[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+    return path
+
+
+_CONTAINER_XPATHS = [etree.XPath(_container_xpath(tag, class_name)) for tag, class_name in CONTENT_CONTAINERS]
+_PARAGRAPH_XPATH = etree.XPath("//p")
+
+
+def parse_html(content: Union[bytes, str]):
+    """
+    HTMLをパース
+
+    Args:
+        content (Union[bytes, str]): HTML（バイト列ならmetaタグの文字コードで解釈する）
+
+    Returns:
+        パース済みの文書（空の場合はNone）
+    """
+    if not content or not content.strip():
+        return None
+    try:
+        return html.document_fromstring(content)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"HTMLのパースに失敗しました: {e}")
+        return None
+
+
+def extract_blocks(element) -> List[str]:
+    """
+    要素配下のテキストをブロック要素の境界で段落に分けて取り出す
+
+    木を1回だけ走査し、各テキストノードは1回しか読まないため、div・spanが
+    入れ子になっていても同じ文章が繰り返されることはない。同じ段落が
+    ページ内で繰り返される場合（リードの再掲など）は最初の1つだけを残す。
+
+    Args:
+        element: 起点の要素
+
+    Returns:
+        List[str]: 空白を正規化した段落のリスト
+    """
+    blocks: List[str] = []
+    seen = set()
+    buffer: List[str] = []
+
+    def flush():
+        text = _WHITESPACE.sub(" ", "".join(buffer)).strip()
+        buffer.clear()
+        if text and text not in seen:
+            seen.add(text)
+            blocks.append(text)
+
+    walker = etree.iterwalk(element, events=("start", "end", "comment", "pi"))
+    for event, el in walker:
+        tag = el.tag
+        if event in ("comment", "pi"):
+            # コメント・処理命令は本文ではないが、後ろに続くテキストは本文
+            if el.tail:
+                buffer.append(el.tail)
+        elif event == "start":
+            if tag in SKIP_TAGS:
+                walker.skip_subtree()
+                continue
+            if tag in BLOCK_TAGS:
+                flush()
+            if el.text:
+                buffer.append(el.text)
+        else:
+            if tag in BLOCK_TAGS:
+                flush()
+            if el is not element and el.tail:
+                buffer.append(el.tail)
+    flush()
+    return blocks
+
+
+def extract_article_text(content: Union[bytes, str], min_chars: int = MIN_CONTENT_CHARS) -> Optional[str]:
+    """
+    記事ページのHTMLから本文を抽出
+
+    本文コンテナの候補を順に探し、最初にmin_chars文字を超えたものを使う。
+    どの候補もなければページ内のすべてのpタグから抽出する。
+
+    Args:
+        content (Union[bytes, str]): 記事ページのHTML
+        min_chars (int): 本文とみなす最小文字数
+
+    Returns:
+        Optional[str]: 段落を改行でつないだ本文（抽出できなければNone）
+    """
+    document = parse_html(content)
+    if document is None:
+        return None
+
+    for xpath in _CONTAINER_XPATHS:
+        for container in xpath(document)[:1]:
+            text = "\n".join(extract_blocks(container))
+            if len(text) > min_chars:
+                return text
+
+    # フォールバック: すべてのpタグ
+    blocks: List[str] = []
+    seen = set()
+    for paragraph in _PARAGRAPH_XPATH(document):
+        for block in extract_blocks(paragraph):
+            if block not in seen:
+                seen.add(block)
+                blocks.append(block)
+    return "\n".join(blocks) or None
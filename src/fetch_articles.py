@@ -5,35 +5,262 @@ Meduzaサイトからニュース記事を取得する
 
 import requests
 import feedparser
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse
+from typing import Callable, Iterable, List, Dict, Optional, Set
+import html
+import os
+import re
+import sqlite3
+import threading
 import logging
+from src.utils import load_json, save_json, clean_text
+from src.extract import extract_article_text
+from src.page_cache import PAGE_CACHE_DIR, get_page_cache
+from src.metrics import ARTICLES, HTTP_ERRORS, STAGE_SECONDS
+from src.repository import DB_PATH, data_path
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# RSSフィードのURL（環境変数 MEDUZA_RSS_URL で差し替えられる。オフラインのベンチマーク用）
+RSS_URL = "https://meduza.io/rss/all"
+
+
+def feed_state_path(db_path: str = DB_PATH) -> str:
+    """RSSの条件付きGET用バリデータ（ETag / Last-Modified）の保存先（DBと同じディレクトリ）"""
+    return data_path("feed_state.json", db_path)
+
+
+# 既定のバリデータの保存先（MEDUZA_DB_PATHに従う）
+FEED_STATE_PATH = feed_state_path()
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# 本文の取得元
+# auto: RSSの本文が完全ならそれを使い、途中までの記事や長文記事だけページを取得する / page: 常にページを取得する
+CONTENT_SOURCE_AUTO = "auto"
+CONTENT_SOURCE_PAGE = "page"
+CONTENT_SOURCES = (CONTENT_SOURCE_AUTO, CONTENT_SOURCE_PAGE)
+
+# RSSの本文を完全とみなす最小文字数
+FEED_CONTENT_MIN_CHARS = 200
+
+# RSSに途中までしか載らない長文記事のセクション（URLの最初のパス）
+LONG_FORM_SECTIONS = frozenset({"feature", "slides", "cards", "games", "podcasts", "episodes", "video", "quiz"})
+
+# 本文が途中で切られていることを示す末尾
+_TRUNCATION_MARKERS = re.compile(
+    r'(\.\.\.|…|\[…\]|\[\.\.\.\]|читать далее|читать полностью|продолжение|read more)\W*$',
+    re.IGNORECASE
+)
+
+# 段落の区切りになるタグ
+_FEED_BLOCK_BOUNDARY = re.compile(r'<br\s*/?>|</?(?:p|div|li|h[1-6]|blockquote|figcaption|ul|ol)\b[^>]*>', re.IGNORECASE)
+
+# 文末として扱う末尾の文字（閉じ引用符・括弧の前）
+_SENTENCE_END = re.compile(r'[.!?][»”"’)\]]*$')
+
+
+def clean_feed_content(value: Optional[str]) -> str:
+    """
+    RSSの本文（HTML）をテキストに変換
+
+    ブロック要素の境界で段落に分け、段落ごとにタグと余分な空白を除く。
+
+    Args:
+        value (Optional[str]): RSSエントリの本文
+
+    Returns:
+        str: 段落を改行でつないだ本文
+    """
+    if not value:
+        return ""
+    paragraphs = (clean_text(html.unescape(clean_text(part))) for part in _FEED_BLOCK_BOUNDARY.split(value))
+    return "\n".join(p for p in paragraphs if p)
+
+
+def is_complete_feed_content(content: str, link: Optional[str] = None, summary: Optional[str] = None) -> bool:
+    """
+    RSSの本文が記事全体かどうかを判定
+
+    長文記事のセクションではなく、十分な長さがあり、文の途中や「続きを読む」で
+    終わっておらず、リード（summary）より長い場合に完全とみなす。
+
+    Args:
+        content (str): clean_feed_contentで変換した本文
+        link (Optional[str]): 記事のURL
+        summary (Optional[str]): RSSエントリの概要
+
+    Returns:
+        bool: ページを取得せずにこの本文を使ってよいかどうか
+    """
+    if not content or len(content) < FEED_CONTENT_MIN_CHARS:
+        return False
+    path = urlparse(link or "").path.strip("/").split("/")
+    if path and path[0] in LONG_FORM_SECTIONS:
+        return False
+    last_line = content.rsplit("\n", 1)[-1]
+    if _TRUNCATION_MARKERS.search(last_line) or not _SENTENCE_END.search(last_line):
+        return False
+    lead = clean_feed_content(summary)
+    if lead and len(content) <= len(lead):
+        return False
+    return True
+
+
+def make_article_key(guid: Optional[str], link: Optional[str]) -> str:
+    """
+    RSSエントリから記事の安定したキーを作成
+    
+    GUIDがあればそれを使い、なければクエリ・フラグメントを除いたURLを使う
+    
+    Args:
+        guid (Optional[str]): RSSエントリのGUID
+        link (Optional[str]): 記事のURL
+        
+    Returns:
+        str: 記事キー（作成できない場合は空文字）
+    """
+    if isinstance(guid, str) and guid.strip():
+        return guid.strip()
+    if isinstance(link, str) and link.strip():
+        parsed = urlparse(link.strip())
+        return urlunparse((parsed.scheme, parsed.netloc.lower(), parsed.path.rstrip('/'), '', '', ''))
+    return ""
+
 
 class MeduzaFetcher:
     """Meduzaからニュース記事を取得するクラス"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections_per_host: int = 4,
+        state_path: Optional[str] = FEED_STATE_PATH,
+        content_source: str = CONTENT_SOURCE_AUTO,
+        page_cache_dir: Optional[str] = PAGE_CACHE_DIR
+    ):
+        """
+        Args:
+            max_connections_per_host (int): 同一ホストへの最大同時接続数
+            state_path (Optional[str]): RSSバリデータの保存先（Noneなら保存しない）
+            content_source (str): 本文の取得元（CONTENT_SOURCES のいずれか）
+            page_cache_dir (Optional[str]): 取得したページの保存先（Noneなら保存しない）
+        """
+        if content_source not in CONTENT_SOURCES:
+            raise ValueError(f"未対応の本文の取得元です: {content_source}")
         self.base_url = "https://meduza.io"
-        self.rss_url = "https://meduza.io/rss/all"
+        self.rss_url = os.environ.get("MEDUZA_RSS_URL", RSS_URL)
+        self.state_path = state_path
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.content_source = content_source
+        self.page_cache_dir = page_cache_dir
+        
+        # 本文の取得元ごとの記事数（feedの件数がページ取得を省いた回数）
+        self.content_source_counts = {"feed": 0, "page": 0}
+        self._counts_lock = threading.Lock()
+        
+        # 取得したフィードのバリデータ（記事を処理し終えるまで保存しない）と、記事を打ち切ったかどうか
+        self._pending_validators: Dict[str, str] = {}
+        self._feed_truncated = False
+        
+        # Keep-Aliveで接続を使い回すための共有セッション
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_maxsize=self.max_connections_per_host)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # ホストごとの同時接続数制限
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+    
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """URLのホストに対応する同時接続制限用セマフォを取得"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_connections_per_host)
+                self._host_slots[host] = slot
+            return slot
     
-    def fetch_rss_feed(self) -> Optional[List[Dict]]:
+    def close(self) -> None:
+        """共有セッションを閉じる"""
+        self.session.close()
+    
+    def _load_validators(self) -> Dict[str, str]:
+        """前回取得時のETag / Last-Modifiedを読み込む"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        state = load_json(self.state_path) or {}
+        return state.get(self.rss_url, {})
+    
+    def save_feed_state(self, complete: bool = True) -> None:
+        """
+        取得したフィードの記事を処理し終えたあとにETag / Last-Modifiedを保存
+        
+        記事を件数で打ち切った場合や処理に失敗した記事がある場合は保存済みのバリデータも消し、
+        次回は条件付きGETを使わずにフィード全体を取得する（304で残りの記事を取りこぼさないため）。
+        
+        Args:
+            complete (bool): 取得した記事をすべて処理できたかどうか
+        """
+        validators, self._pending_validators = self._pending_validators, {}
+        if not self.state_path:
+            return
+        complete = complete and not self._feed_truncated
+        if complete and not validators:
+            return
+        state = (load_json(self.state_path) if os.path.exists(self.state_path) else None) or {}
+        if complete:
+            state[self.rss_url] = validators
+        elif state.pop(self.rss_url, None) is None:
+            return
+        else:
+            logger.info("未処理の記事が残っているため、次回は条件付きGETを使わずにRSSを取得します")
+        save_json(state, self.state_path)
+    
+    def fetch_rss_feed(self, use_validators: bool = True) -> Optional[List[Dict]]:
         """
         RSSフィードから記事一覧を取得
         
+        前回のETag / Last-Modifiedを送信し、304 (Not Modified) の場合は
+        パースせずに空リストを返す。新しいバリデータは記事を処理し終えてから
+        save_feed_stateで保存する。
+        
+        Args:
+            use_validators (bool): 条件付きGETを使うかどうか
+        
         Returns:
-            List[Dict]: 記事データのリスト
+            List[Dict]: 記事データのリスト（更新なしの場合は空リスト）
         """
+        self._pending_validators = {}
+        self._feed_truncated = False
         try:
             logger.info(f"RSSフィードを取得中: {self.rss_url}")
-            feed = feedparser.parse(self.rss_url)
+            validators = self._load_validators() if use_validators else {}
+            feed = feedparser.parse(
+                self.rss_url,
+                etag=validators.get('etag'),
+                modified=validators.get('modified')
+            )
+            
+            status = getattr(feed, 'status', None)
+            if isinstance(status, int) and status >= 400:
+                HTTP_ERRORS.inc(target="rss")
+            if status == 304:
+                logger.info("RSSフィードに更新はありません (304 Not Modified)")
+                return []
             
             articles = []
             for entry in feed.entries:
                 article = {
+                    'article_key': make_article_key(entry.get('id'), entry.link),
                     'title': entry.title,
                     'link': entry.link,
                     'published': entry.get('published', ''),
@@ -43,89 +270,161 @@ class MeduzaFetcher:
                 articles.append(article)
             
             logger.info(f"取得した記事数: {len(articles)}")
+            if status == 200:
+                self._pending_validators = {
+                    key: value for key, value in (('etag', feed.get('etag')), ('modified', feed.get('modified')))
+                    if isinstance(value, str) and value
+                }
             return articles
             
         except Exception as e:
+            HTTP_ERRORS.inc(target="rss")
             logger.error(f"RSS取得エラー: {e}")
             return None
     
+    def fetch_new_entries(
+        self,
+        limit: int = 5,
+        known_keys_lookup: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+        use_validators: bool = True
+    ) -> List[Dict]:
+        """
+        RSSフィードから未処理の記事を取得（本文は取得しない）
+        
+        Args:
+            limit: 取得する記事数
+            known_keys_lookup: 記事キーのリストを受け取り、処理済みのキーを返す関数
+            use_validators: 条件付きGETを使うかどうか
+            
+        Returns:
+            List[Dict]: 記事データのリスト（RSSの順序を維持）
+        """
+        articles = self.fetch_rss_feed(use_validators)
+        if not articles:
+            return []
+        
+        # 処理済みの記事を一括で除外
+        if known_keys_lookup is not None:
+            known_keys = known_keys_lookup([a['article_key'] for a in articles if a.get('article_key')])
+            articles = [a for a in articles if a.get('article_key') not in known_keys]
+            logger.info(f"未処理の記事数: {len(articles)}")
+        
+        self._feed_truncated = len(articles) > limit
+        return articles[:limit]
+    
     def fetch_article_content(self, url: str) -> Optional[str]:
         """
         指定URLから記事の詳細コンテンツを取得
         Args:
             url (str): 記事のURL
         Returns:
-            Optional[str]: 記事コンテンツ
+            Optional[str]: 記事コンテンツ（取得・抽出に失敗した場合はNone）
         """
         try:
             logger.info(f"記事コンテンツを取得中: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
+            with self._host_slot(url), STAGE_SECONDS.time(stage="fetch"):
+                response = self.session.get(url, timeout=10)
             response.raise_for_status()
+            self._cache_page(url, response)
             
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Meduzaの本文コンテナからブロック要素ごとにテキストを抽出
+            with STAGE_SECONDS.time(stage="extract"):
+                content = extract_article_text(response.content)
             
-            # Meduzaサイトの記事本文を抽出
-            # 一般的な記事セレクタを試す
-            content_selectors = [
-                'div.GeneralMaterial-article',
-                'div.RichText',
-                'div.SimpleBlock-article',
-                'article',
-                '.article-content',
-                '.post-content'
-            ]
-            
-            for selector in content_selectors:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    # テキストのみ抽出、改行を保持
-                    paragraphs = content_div.find_all(['p', 'div', 'span'])
-                    content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-                    if content and len(content) > 100:  # 最小限の長さチェック
-                        return content
-            
-            # フォールバック: すべてのpタグを取得
-            paragraphs = soup.find_all('p')
-            content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-            
-            return content if content else "記事本文の抽出に失敗しました"
+            if not content:
+                logger.error(f"記事本文の抽出に失敗しました: {url}")
+                return None
+            return content
             
         except Exception as e:
+            if isinstance(e, requests.RequestException):
+                HTTP_ERRORS.inc(target="page")
             logger.error(f"記事取得エラー: {e}")
-            return f"記事取得エラー: {str(e)}"
+            return None
+    
+    def _cache_page(self, url: str, response: requests.Response) -> None:
+        """取得したページをキャッシュに保存（失敗しても本文の抽出は続ける）"""
+        if self.page_cache_dir is None:
+            return
+        try:
+            get_page_cache(self.page_cache_dir).put(
+                url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"ページのキャッシュに失敗しました: {url} ({e})")
+    
+    def resolve_article_content(self, article: Dict) -> Optional[str]:
+        """
+        記事の本文を取得（RSSの本文が完全ならページを取得しない）
+        
+        Args:
+            article (Dict): fetch_rss_feedで取得した記事データ
+            
+        Returns:
+            Optional[str]: 記事の本文（ページの取得・抽出に失敗した場合はNone）
+        """
+        if self.content_source == CONTENT_SOURCE_AUTO:
+            feed_content = clean_feed_content(article.get('content'))
+            if is_complete_feed_content(feed_content, article.get('link'), article.get('summary')):
+                with self._counts_lock:
+                    self.content_source_counts["feed"] += 1
+                ARTICLES.inc(stage="fetched")
+                logger.info(f"RSSの本文を使用します（ページ取得なし）: {article.get('link')}")
+                return feed_content
+        
+        with self._counts_lock:
+            self.content_source_counts["page"] += 1
+        content = self.fetch_article_content(article['link'])
+        ARTICLES.inc(stage="fetched" if content is not None else "fetch_failed")
+        return content
+    
+    def content_source_stats(self) -> Dict[str, int]:
+        """本文の取得元ごとの記事数"""
+        with self._counts_lock:
+            return dict(self.content_source_counts)
 
 
-def fetch_meduza_articles(limit: int = 5) -> List[Dict]:
+def fetch_meduza_articles(
+    limit: int = 5,
+    max_workers: int = 4,
+    known_keys_lookup: Optional[Callable[[Iterable[str]], Set[str]]] = None
+) -> List[Dict]:
     """
     Meduzaから記事を取得する便利関数
     
     Args:
         limit: 取得する記事数
+        max_workers: 本文取得の並列数（1なら逐次取得）
+        known_keys_lookup: 記事キーのリストを受け取り、処理済みのキーを返す関数。
+            指定した場合、処理済みの記事は本文取得の前に除外される
         
     Returns:
-        List[Dict]: 記事データのリスト
+        List[Dict]: 記事データのリスト（RSSの順序を維持。本文を取得できなかった記事は含めない）
     """
     fetcher = MeduzaFetcher()
-    articles = fetcher.fetch_rss_feed()
-    
-    if not articles:
-        return []
-    
-    # limit件に制限
-    limited_articles = articles[:limit]
-    
-    # 各記事の本文も取得
-    for article in limited_articles:
-        content = fetcher.fetch_article_content(article['link'])
-        article['content'] = content or "本文取得失敗"
-    
-    return limited_articles
+    try:
+        limited_articles = fetcher.fetch_new_entries(limit, known_keys_lookup)
+        
+        # 各記事の本文も取得（RSSの本文で足りる記事はページを取得しない）
+        if max_workers <= 1 or len(limited_articles) <= 1:
+            contents = [fetcher.resolve_article_content(article) for article in limited_articles]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(limited_articles))) as executor:
+                contents = list(executor.map(fetcher.resolve_article_content, limited_articles))
+        articles = []
+        for article, content in zip(limited_articles, contents):
+            if content is not None:
+                article['content'] = content
+                articles.append(article)
+        # 本文を取得できなかった記事があれば、次回はフィード全体を取得し直す
+        fetcher.save_feed_state(complete=len(articles) == len(limited_articles))
+        
+        stats = fetcher.content_source_stats()
+        logger.info(f"本文の取得元: RSS {stats['feed']}件 / ページ {stats['page']}件")
+        return articles
+    finally:
+        fetcher.close()
 
 
 def main():
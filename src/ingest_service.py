@@ -0,0 +1,401 @@
+# src/ingest_service.py
+
+"""
+取り込みサービス
+フィードの定期確認とジョブキューの処理を行う常駐プロセス（python main.py serve）
+"""
+
+import logging
+import random
+import signal
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from src.fetch_articles import MeduzaFetcher, CONTENT_SOURCE_AUTO, feed_state_path
+from src.page_cache import page_cache_dir
+from src.translate import MeduzaTranslator
+from src.translation_cache import get_translation_memory, translation_cache_path
+from src.summarize import get_summarizer, DEFAULT_SUMMARY_LENGTH
+from src.database import init_db, save_articles_bulk, get_existing_article_keys
+from src.pipeline import Pipeline, Stage, DEFAULT_QUEUE_SIZE
+from src.repository import DB_PATH, close_connections
+from src.metrics import MetricsServer
+from src.jobs import (
+    claim_next_job, enqueue_job, fail_job, finish_job, requeue_job,
+    requeue_running_jobs, update_job_progress, write_heartbeat,
+    INGEST_MODE_DIGEST, INGEST_MODE_FULL, INGEST_MODES
+)
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# フィードを確認する間隔（秒）と、その揺らぎの割合
+DEFAULT_POLL_INTERVAL = 15 * 60
+DEFAULT_POLL_JITTER = 0.1
+
+# ハートビートを書き込む間隔（秒）
+DEFAULT_HEARTBEAT_INTERVAL = 10
+
+# 進捗の通知先: (処理済み件数, 全件数, メッセージ)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+# ステージごとの既定のワーカー数
+# 本文取得はホストごとの同時接続数、翻訳はAPIの同時リクエスト数に合わせ、要約はCPU処理なので1つにする
+DEFAULT_STAGE_WORKERS = {"fetch": 4, "translate": 2, "summarize": 1}
+
+# DBに1トランザクションでまとめて保存する記事数
+DEFAULT_SAVE_BATCH_SIZE = 10
+
+
+class IngestResult(NamedTuple):
+    """1回の取り込みの結果"""
+    fetched: int
+    processed: int
+    saved: int
+    interrupted: bool
+    # RSSの本文を使い、ページの取得を省いた記事数
+    page_fetches_avoided: int = 0
+
+
+def ingest_articles(
+    limit: int = 3,
+    db_path: str = DB_PATH,
+    translator: Optional[MeduzaTranslator] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    stage_workers: Optional[Dict[str, int]] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    known_keys_lookup: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+    store: Optional[Callable[[Dict], bool]] = None,
+    mode: str = INGEST_MODE_FULL,
+    content_source: str = CONTENT_SOURCE_AUTO,
+    use_validators: bool = True,
+    save_batch_size: int = DEFAULT_SAVE_BATCH_SIZE
+) -> IngestResult:
+    """
+    新着記事を取得・翻訳・要約してDBに保存
+
+    本文取得→翻訳→要約の各ステージを上限付きキューでつないだパイプラインで処理し、
+    処理が終わった記事をsave_batch_size件ずつ1トランザクションでまとめてDBに保存する
+    （残りはバッチの最後に保存する）。進捗は保存した後に通知する。should_stopがTrueを返したら
+    新しい記事の投入をやめ、処理中の記事を保存して終了する。
+
+    ダイジェストモードでは本文取得→要約（ロシア語の原文）→翻訳（タイトルと要約のみ）の
+    順に処理し、本文は翻訳しない（ビューアで読むときに翻訳する）。
+
+    Args:
+        limit (int): 取得する記事数
+        db_path (str): データベースファイルパス
+        translator (Optional[MeduzaTranslator]): 翻訳器（省略時はDBと同じディレクトリの翻訳メモリを使って新しく作成）
+        on_progress (Optional[ProgressCallback]): 進捗の通知先（保存と同じスレッドで呼ばれる）
+        should_stop (Optional[Callable[[], bool]]): 中断するかどうか
+        stage_workers (Optional[Dict[str, int]]): ステージごとのワーカー数（DEFAULT_STAGE_WORKERSを上書き）
+        queue_size (int): ステージ間のキューの長さ
+        known_keys_lookup (Optional[Callable]): 処理済みの記事キーを返す関数（省略時はDBを参照）
+        store (Optional[Callable[[Dict], bool]]): 記事の保存先（省略時はDBに保存）。保存したらTrueを返す。
+            指定した場合は1件ずつ渡し、RSSのバリデータを読み書きしない（バリデータはDBの保存済みの記事に対応するため）
+        mode (str): 処理モード（"full" または "digest"）
+        content_source (str): 本文の取得元（"auto" ならRSSの本文で足りる記事はページを取得しない）
+        use_validators (bool): RSSの取得に条件付きGETを使うかどうか（Falseなら304を受けずに全件を取得）
+        save_batch_size (int): DBに1トランザクションでまとめて保存する記事数
+
+    Returns:
+        IngestResult: 取り込みの結果
+    """
+    if mode not in INGEST_MODES:
+        raise ValueError(f"未対応の処理モードです: {mode}")
+    on_progress = on_progress or (lambda done, total, message: None)
+    workers = dict(DEFAULT_STAGE_WORKERS, **(stage_workers or {}))
+
+    # RSSのバリデータはDBに保存した記事と対応するので、DBに保存するときだけ使う
+    # （セッションごとの保存先で共有すると、別のセッションの304で記事を取得できなくなる）
+    state_path = None
+    if store is None:
+        init_db(db_path)
+        known_keys_lookup = known_keys_lookup or (lambda keys: get_existing_article_keys(keys, db_path))
+        save_batch = lambda batch: save_articles_bulk(batch, db_path)
+        state_path = feed_state_path(db_path)
+    else:
+        # 指定された保存先（セッション状態など）には1件ずつ渡し、すぐに進捗を通知する
+        save_batch = lambda batch: sum(1 for article in batch if store(article))
+        save_batch_size = 1
+    save_batch_size = max(1, save_batch_size)
+
+    # 記事一覧の取得（処理済みの記事は本文取得前に除外）
+    on_progress(0, 0, "新着記事を取得中...")
+    fetcher = MeduzaFetcher(
+        max_connections_per_host=workers["fetch"], state_path=state_path, content_source=content_source,
+        page_cache_dir=page_cache_dir(db_path)
+    )
+    try:
+        articles = fetcher.fetch_new_entries(limit, known_keys_lookup, use_validators)
+        if not articles:
+            fetcher.save_feed_state()
+            return IngestResult(0, 0, 0, False)
+
+        translator = translator or MeduzaTranslator(cache=get_translation_memory(translation_cache_path(db_path)))
+        summarizer = get_summarizer("russian" if mode == INGEST_MODE_DIGEST else "japanese")
+        total = len(articles)
+
+        def fetch(article: Dict) -> Optional[Dict]:
+            content = fetcher.resolve_article_content(article)
+            if content is None:
+                # 本文を取得できなかった記事は保存せず、未完了として次回の取り込みで取得し直す
+                return None
+            article['content'] = content
+            return article
+
+        def translate(article: Dict) -> Optional[Dict]:
+            # 要約は次のステージで1回だけ行う
+            return translator.translate_article(article, summarize=False)
+
+        def summarize(article: Dict) -> Dict:
+            summary = summarizer.summarize_text(article.get('translated_content', ''), DEFAULT_SUMMARY_LENGTH)
+            article['summary'] = summary or "要約作成に失敗しました"
+            if summary:
+                article['summary_auto'] = summary
+            return article
+
+        def summarize_source(article: Dict) -> Dict:
+            article['source_summary'] = summarizer.summarize_text(article.get('content', ''), DEFAULT_SUMMARY_LENGTH)
+            return article
+
+        def translate_digest(article: Dict) -> Optional[Dict]:
+            translated = translator.translate_digest(article, article.pop('source_summary', None) or "")
+            if translated is not None and not translated.get('summary'):
+                translated['summary'] = "要約作成に失敗しました"
+            return translated
+
+        done = 0
+        saved = 0
+        pending: List[Dict] = []
+
+        def flush() -> None:
+            nonlocal done, saved
+            batch = list(pending)
+            pending.clear()
+            saved += save_batch(batch)
+            for article in batch:
+                done += 1
+                on_progress(done, total, f"記事 {done}/{total} を保存しました: {article.get('translated_title', '')}")
+
+        def save(article: Dict) -> None:
+            pending.append(article)
+            if len(pending) >= save_batch_size:
+                flush()
+
+        if mode == INGEST_MODE_DIGEST:
+            stages = [
+                Stage("fetch", fetch, workers["fetch"], queue_size),
+                Stage("summarize", summarize_source, workers["summarize"], queue_size),
+                Stage("translate", translate_digest, workers["translate"], queue_size),
+            ]
+        else:
+            stages = [
+                Stage("fetch", fetch, workers["fetch"], queue_size),
+                Stage("translate", translate, workers["translate"], queue_size),
+                Stage("summarize", summarize, workers["summarize"], queue_size),
+            ]
+        pipeline = Pipeline(stages, output_queue_size=queue_size)
+
+        on_progress(0, total, f"{total}件の記事を処理中...")
+        interrupted = pipeline.run(articles, save, should_stop)
+        if pending:
+            try:
+                flush()
+            except Exception as e:
+                # 保存できなかった記事は未完了として次回の取り込みで取得し直す
+                logger.error(f"保存中にエラーが発生しました: {e}")
+        # 全件を保存できたときだけバリデータを保存する（残りがあれば次回はフィード全体を取得する）
+        fetcher.save_feed_state(complete=not interrupted and done == total)
+        logger.info(f"パイプラインの処理結果: {pipeline.stats_summary()}")
+        logger.info(f"要約の再利用: {summarizer.stats()}")
+        content_sources = fetcher.content_source_stats()
+        logger.info(f"本文の取得元: RSS {content_sources['feed']}件 / ページ {content_sources['page']}件")
+        return IngestResult(total, done, saved, interrupted, content_sources["feed"])
+    finally:
+        fetcher.close()
+
+
+class IngestService:
+    """
+    取り込みサービス
+
+    一定間隔（揺らぎ付き）でフィード確認のジョブを登録し、ビューアから登録された
+    ジョブとあわせてキューから1件ずつ処理する。稼働状況はservice_statusに
+    ハートビートとして書き込む。SIGINT/SIGTERMを受けると実行中の記事を
+    終えたところで保存して停止し、未処理のジョブは次回の起動時に再開する。
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        jitter: float = DEFAULT_POLL_JITTER,
+        article_limit: int = 3,
+        db_path: str = DB_PATH,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        translator: Optional[MeduzaTranslator] = None,
+        stage_workers: Optional[Dict[str, int]] = None,
+        seed: Optional[int] = None,
+        mode: str = INGEST_MODE_FULL,
+        content_source: str = CONTENT_SOURCE_AUTO,
+        metrics_port: Optional[int] = None
+    ):
+        """
+        Args:
+            poll_interval (float): フィードを確認する間隔（秒、0なら定期確認しない）
+            jitter (float): 間隔の揺らぎの割合（0.1なら±10%）
+            article_limit (int): 1回の取り込みで取得する記事数
+            db_path (str): データベースファイルパス
+            heartbeat_interval (float): ハートビートを書き込む間隔（秒）
+            translator (Optional[MeduzaTranslator]): 翻訳器（省略時は最初のジョブで作成）
+            stage_workers (Optional[Dict[str, int]]): パイプラインのステージごとのワーカー数
+            seed (Optional[int]): 揺らぎの乱数シード
+            mode (str): 定期確認のジョブの処理モード（ビューアからのジョブはジョブごとのモード）
+            content_source (str): 本文の取得元（"auto" または "page"）
+            metrics_port (Optional[int]): 指標をPrometheusの形式で公開するポート（Noneなら公開しない）
+        """
+        self.poll_interval = poll_interval
+        self.jitter = jitter
+        self.article_limit = article_limit
+        self.db_path = db_path
+        self.heartbeat_interval = heartbeat_interval
+        self.translator = translator
+        self.stage_workers = stage_workers
+        self.mode = mode
+        self.content_source = content_source
+        self.metrics_port = metrics_port
+        self._random = random.Random(seed)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._status = {
+            "state": "starting", "next_poll_at": None, "current_job_id": None, "message": "", "metrics_port": None
+        }
+        self.started_at = None
+
+    def next_poll_delay(self) -> float:
+        """次にフィードを確認するまでの秒数（揺らぎ付き）"""
+        return self.poll_interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+
+    def stop(self, *args) -> None:
+        """停止を要求（シグナルハンドラからも呼び出せる）"""
+        if not self._stop.is_set():
+            logger.info("停止要求を受け付けました。実行中の記事を終えてから停止します")
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def _set_status(self, **status) -> None:
+        with self._lock:
+            self._status.update(status)
+        self._write_heartbeat()
+
+    def _write_heartbeat(self) -> None:
+        with self._lock:
+            status = dict(self._status)
+        try:
+            write_heartbeat(started_at=self.started_at, db_path=self.db_path, **status)
+        except Exception as e:
+            logger.warning(f"ハートビートの書き込みに失敗しました: {e}")
+
+    def _heartbeat_loop(self) -> None:
+        """長いジョブの実行中もハートビートを書き続ける"""
+        while not self._stop.wait(self.heartbeat_interval):
+            self._write_heartbeat()
+        close_connections()
+
+    def process_job(self, job) -> None:
+        """
+        ジョブを1件処理
+
+        Args:
+            job (Dict): claim_next_jobで取得したジョブ
+        """
+        job_id = job["id"]
+        logger.info(f"ジョブ #{job_id} を開始します（{job['source']}, {job['article_limit']}件, {job['mode']}）")
+        self._set_status(state="running", current_job_id=job_id, message=f"ジョブ #{job_id} を実行中")
+
+        def on_progress(done: int, total: int, message: str) -> None:
+            update_job_progress(job_id, done, total, message, self.db_path)
+            with self._lock:
+                self._status["message"] = message
+
+        try:
+            if self.translator is None:
+                self.translator = MeduzaTranslator(cache=get_translation_memory(translation_cache_path(self.db_path)))
+            result = ingest_articles(
+                job["article_limit"], self.db_path, self.translator, on_progress, lambda: self.stopping,
+                stage_workers=self.stage_workers, mode=job["mode"], content_source=self.content_source,
+                # 再開したジョブは前回と同じフィードが304になるため、条件付きGETを使わずに残りの記事を取得する
+                use_validators=not job.get("resumed")
+            )
+        except Exception as e:
+            logger.error(f"ジョブ #{job_id} が失敗しました: {e}")
+            fail_job(job_id, str(e), self.db_path)
+        else:
+            if result.interrupted:
+                # 再開時はフィード全体を取得し直し、保存済みの記事を除いた残りだけを処理する
+                requeue_job(job_id, self.db_path)
+                logger.info(f"ジョブ #{job_id} を中断しました（{result.saved}件保存済み）")
+            else:
+                finish_job(job_id, result.saved, self.db_path)
+                logger.info(
+                    f"ジョブ #{job_id} が完了しました（{result.saved}/{result.fetched}件保存、"
+                    f"ページ取得の省略 {result.page_fetches_avoided}件）"
+                )
+        finally:
+            self._set_status(state="idle", current_job_id=None, message="")
+
+    def run(self) -> None:
+        """停止が要求されるまでジョブを処理し続ける"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        init_db(self.db_path)
+        requeue_running_jobs(self.db_path)
+        self.started_at = int(time.time())
+
+        metrics_server = None
+        if self.metrics_port is not None:
+            try:
+                metrics_server = MetricsServer(self.metrics_port).start()
+            except OSError as e:
+                logger.warning(f"指標の公開を開始できませんでした（ポート {self.metrics_port}）: {e}")
+            else:
+                with self._lock:
+                    self._status["metrics_port"] = metrics_server.port
+
+        next_poll = time.time() if self.poll_interval > 0 else None
+        self._set_status(state="idle", next_poll_at=int(next_poll) if next_poll else None)
+
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="ingest-heartbeat", daemon=True)
+        heartbeat.start()
+        logger.info(f"取り込みサービスを開始しました（間隔 {self.poll_interval}秒 ±{self.jitter:.0%}）")
+
+        try:
+            while not self.stopping:
+                if next_poll is not None and time.time() >= next_poll:
+                    enqueue_job(self.article_limit, "poll", self.db_path, self.mode)
+                    next_poll = time.time() + self.next_poll_delay()
+                    self._set_status(next_poll_at=int(next_poll))
+
+                job = claim_next_job(self.db_path)
+                if job:
+                    self.process_job(job)
+                    continue
+
+                # ビューアから登録されたジョブを1秒以内に拾えるよう短い間隔で確認する
+                self._stop.wait(1.0)
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            if metrics_server is not None:
+                metrics_server.stop()
+            self._set_status(state="stopped", current_job_id=None, next_poll_at=None, message="", metrics_port=None)
+            logger.info("取り込みサービスを停止しました")
@@ -0,0 +1,246 @@
+# src/jobs.py
+
+"""
+取り込みジョブのキュー
+SQLiteのテーブルをキューとして使い、ビューアと取り込みサービスの間でジョブと進捗をやり取りする
+"""
+
+import logging
+import os
+import socket
+import time
+from typing import Dict, Optional
+
+from src.repository import DB_PATH, get_connection, transaction
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ジョブの状態
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# 取り込みの処理モード
+# full: 本文を翻訳してから要約する / digest: 原文を要約し、タイトルと要約だけを翻訳する（本文は読むときに翻訳）
+INGEST_MODE_FULL = "full"
+INGEST_MODE_DIGEST = "digest"
+INGEST_MODES = (INGEST_MODE_FULL, INGEST_MODE_DIGEST)
+
+# 取り込みサービスの名前（service_statusの主キー）
+INGEST_SERVICE = "ingest"
+
+# ハートビートがこの秒数より古ければサービスは停止しているとみなす
+HEARTBEAT_TIMEOUT = 60
+
+JOB_COLUMNS = (
+    "id", "status", "source", "article_limit", "progress", "total", "saved",
+    "message", "error", "created_at", "started_at", "finished_at", "mode",
+)
+
+SERVICE_COLUMNS = (
+    "name", "state", "pid", "host", "started_at", "heartbeat_at",
+    "next_poll_at", "current_job_id", "message", "metrics_port",
+)
+
+
+def _job_from_row(row) -> Optional[Dict]:
+    return dict(zip(JOB_COLUMNS, row)) if row else None
+
+
+def enqueue_job(
+    article_limit: int,
+    source: str = "ui",
+    db_path: str = DB_PATH,
+    mode: str = INGEST_MODE_FULL
+) -> int:
+    """
+    取り込みジョブを登録
+
+    同じ処理モードの待機中・実行中のジョブが既にあれば新しく登録せず、そのジョブを返す
+    （ボタンの連打やポーリングで同じ取り込みが積み重ならないようにする）。
+    処理モードが異なるジョブはまとめず、別のジョブとして登録する。
+
+    Args:
+        article_limit (int): 取得する記事数
+        source (str): 登録元（"ui"・"poll"・"cli"）
+        db_path (str): データベースファイルパス
+        mode (str): 処理モード（INGEST_MODES のいずれか）
+
+    Returns:
+        int: ジョブID
+    """
+    if mode not in INGEST_MODES:
+        raise ValueError(f"未対応の処理モードです: {mode}")
+    with transaction(db_path, immediate=True) as conn:
+        row = conn.execute(
+            "SELECT id FROM ingest_jobs WHERE status IN (?, ?) AND mode = ? ORDER BY id LIMIT 1",
+            (JOB_QUEUED, JOB_RUNNING, mode)
+        ).fetchone()
+        if row:
+            return row[0]
+        cur = conn.execute(
+            "INSERT INTO ingest_jobs (status, source, article_limit, created_at, mode) VALUES (?, ?, ?, ?, ?)",
+            (JOB_QUEUED, source, article_limit, int(time.time()), mode)
+        )
+        job_id = cur.lastrowid
+    logger.info(f"取り込みジョブを登録しました（#{job_id}, {source}, {article_limit}件, {mode}）")
+    return job_id
+
+
+def claim_next_job(db_path: str = DB_PATH) -> Optional[Dict]:
+    """
+    最も古い待機中のジョブを実行中にして取得
+
+    中断後に待機中に戻したジョブは、最初の開始日時を残したまま再開し、resumedをTrueにして返す。
+
+    Returns:
+        Optional[Dict]: ジョブ（待機中のジョブがなければNone）
+    """
+    # 待機中のジョブがなければ書き込みロックを取らずに終える
+    if not get_connection(db_path).execute(
+        "SELECT EXISTS (SELECT 1 FROM ingest_jobs WHERE status = ?)", (JOB_QUEUED,)
+    ).fetchone()[0]:
+        return None
+    with transaction(db_path, immediate=True) as conn:
+        row = conn.execute(
+            "SELECT id, started_at FROM ingest_jobs WHERE status = ? ORDER BY id LIMIT 1",
+            (JOB_QUEUED,)
+        ).fetchone()
+        if not row:
+            return None
+        resumed = row[1] is not None
+        conn.execute(
+            "UPDATE ingest_jobs SET status = ?, started_at = COALESCE(started_at, ?), message = ? WHERE id = ?",
+            (JOB_RUNNING, int(time.time()), "再開しました" if resumed else "開始しました", row[0])
+        )
+    job = get_job(row[0], db_path)
+    job["resumed"] = resumed
+    return job
+
+
+def get_job(job_id: int, db_path: str = DB_PATH) -> Optional[Dict]:
+    """ジョブを取得"""
+    if not os.path.exists(db_path):
+        return None
+    row = get_connection(db_path).execute(
+        f"SELECT {', '.join(JOB_COLUMNS)} FROM ingest_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    return _job_from_row(row)
+
+
+def update_job_progress(job_id: int, progress: int, total: int, message: str, db_path: str = DB_PATH) -> None:
+    """
+    ジョブの進捗を更新
+
+    Args:
+        job_id (int): ジョブID
+        progress (int): 処理済みの記事数
+        total (int): 処理する記事数
+        message (str): 現在の処理内容
+        db_path (str): データベースファイルパス
+    """
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE ingest_jobs SET progress = ?, total = ?, message = ? WHERE id = ?",
+            (progress, total, message, job_id)
+        )
+
+
+def finish_job(job_id: int, saved: int, db_path: str = DB_PATH) -> None:
+    """ジョブを完了にする"""
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE ingest_jobs SET status = ?, saved = ?, message = ?, finished_at = ? WHERE id = ?",
+            (JOB_DONE, saved, f"{saved}件を保存しました", int(time.time()), job_id)
+        )
+
+
+def fail_job(job_id: int, error: str, db_path: str = DB_PATH) -> None:
+    """ジョブを失敗にする"""
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE ingest_jobs SET status = ?, error = ?, message = ?, finished_at = ? WHERE id = ?",
+            (JOB_FAILED, error, "失敗しました", int(time.time()), job_id)
+        )
+
+
+def requeue_job(job_id: int, db_path: str = DB_PATH) -> None:
+    """実行中のジョブを待機中に戻す（停止時に処理しきれなかった場合）"""
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE ingest_jobs SET status = ?, message = ? WHERE id = ? AND status = ?",
+            (JOB_QUEUED, "再開待ち", job_id, JOB_RUNNING)
+        )
+
+
+def requeue_running_jobs(db_path: str = DB_PATH) -> int:
+    """
+    実行中のまま残ったジョブを待機中に戻す
+
+    サービスが異常終了した場合に、起動時に呼び出して処理をやり直す。
+
+    Returns:
+        int: 待機中に戻したジョブ数
+    """
+    with transaction(db_path) as conn:
+        count = conn.execute(
+            "UPDATE ingest_jobs SET status = ?, message = ? WHERE status = ?",
+            (JOB_QUEUED, "再開待ち", JOB_RUNNING)
+        ).rowcount
+    if count:
+        logger.info(f"中断されたジョブを再登録しました（{count}件）")
+    return count
+
+
+def write_heartbeat(
+    state: str,
+    started_at: Optional[int] = None,
+    next_poll_at: Optional[int] = None,
+    current_job_id: Optional[int] = None,
+    message: str = "",
+    metrics_port: Optional[int] = None,
+    db_path: str = DB_PATH,
+    name: str = INGEST_SERVICE
+) -> None:
+    """
+    サービスの稼働状況（ハートビート）を記録
+
+    Args:
+        state (str): "idle"・"running"・"stopped" など
+        started_at (Optional[int]): サービスの起動時刻
+        next_poll_at (Optional[int]): 次にフィードを確認する時刻
+        current_job_id (Optional[int]): 実行中のジョブID
+        message (str): 表示用のメッセージ
+        metrics_port (Optional[int]): 指標を公開しているポート（公開していなければNone）
+        db_path (str): データベースファイルパス
+        name (str): サービス名
+    """
+    with transaction(db_path) as conn:
+        conn.execute(
+            f"INSERT OR REPLACE INTO service_status ({', '.join(SERVICE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(SERVICE_COLUMNS))})",
+            (name, state, os.getpid(), socket.gethostname(), started_at, int(time.time()),
+             next_poll_at, current_job_id, message, metrics_port)
+        )
+
+
+def get_service_status(db_path: str = DB_PATH, name: str = INGEST_SERVICE) -> Optional[Dict]:
+    """
+    サービスの稼働状況を取得
+
+    Returns:
+        Optional[Dict]: 稼働状況（"alive" にハートビートが新しいかどうかを含む）。記録がなければNone
+    """
+    if not os.path.exists(db_path):
+        return None
+    row = get_connection(db_path).execute(
+        f"SELECT {', '.join(SERVICE_COLUMNS)} FROM service_status WHERE name = ?", (name,)
+    ).fetchone()
+    if not row:
+        return None
+    status = dict(zip(SERVICE_COLUMNS, row))
+    status["alive"] = status["state"] != "stopped" and time.time() - status["heartbeat_at"] < HEARTBEAT_TIMEOUT
+    return status
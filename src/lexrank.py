@@ -0,0 +1,267 @@
+# src/lexrank.py
+
+"""
+NumPyによるLexRank要約
+sumyのLexRankSummarizerと同じ計算を行列演算で行い、長い記事でも文の組み合わせをPythonで回さない
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sumy.nlp.tokenizers import DefaultWordTokenizer, Tokenizer
+from sumy.parsers.plaintext import PlaintextParser
+
+from src.chunking import split_sentences
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# sumyのLexRankSummarizerと同じ既定値
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_EPSILON = 0.1
+
+# 要約の対象にする文数の上限（ニュース記事は冒頭に要点があるため先頭から数える）
+DEFAULT_MAX_SENTENCES = 300
+
+
+class _SharedJapaneseWordTokenizer:
+    """
+    TinySegmenterを使い回す単語分割
+
+    sumyのJapaneseWordTokenizerは呼び出しのたびにTinySegmenterを作り直すため、
+    1文ごとに重い辞書の構築が走る。分割処理自体は状態を持たないので1つを共有する。
+    """
+
+    def __init__(self):
+        import tinysegmenter
+        self._segmenter = tinysegmenter.TinySegmenter()
+
+    def tokenize(self, text: str) -> List[str]:
+        return self._segmenter.tokenize(text)
+
+
+class _ChunkingSentenceTokenizer:
+    """
+    翻訳用の文分割（src.chunking）による文分割
+
+    NLTKのpunktデータがない環境で、ロシア語などの文分割に使う。
+    """
+
+    def tokenize(self, text: str) -> List[str]:
+        return split_sentences(text)
+
+
+class _LineWordTokenizer:
+    """文分割を済ませた1文を単語に分割（punktを使わないnltk.word_tokenize）"""
+
+    def tokenize(self, text: str) -> List[str]:
+        import nltk
+        return nltk.word_tokenize(text, preserve_line=True)
+
+
+class _OfflineTokenizer(Tokenizer):
+    """punktデータがなければ翻訳用の文分割に切り替えるTokenizer"""
+
+    def __init__(self, language: str):
+        self._punkt_missing = False
+        super().__init__(language)
+        # 既定の単語分割も内部でpunktの文分割を呼ぶため、1文として分割させる
+        if self._punkt_missing and isinstance(self._word_tokenizer, DefaultWordTokenizer):
+            self._word_tokenizer = _LineWordTokenizer()
+
+    def _get_sentence_tokenizer(self, language):
+        try:
+            return super()._get_sentence_tokenizer(language)
+        except LookupError:
+            logger.warning(f"NLTKのpunktデータがないため、{language}の文分割には翻訳用の分割を使います")
+            self._punkt_missing = True
+            return _ChunkingSentenceTokenizer()
+
+
+_tokenizers: Dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(language: str = "japanese") -> Tokenizer:
+    """
+    言語ごとのsumyのTokenizerを取得（プロセス内で共有）
+
+    Args:
+        language (str): 言語名
+
+    Returns:
+        Tokenizer: 文・単語の分割器
+    """
+    with _tokenizers_lock:
+        tokenizer = _tokenizers.get(language)
+        if tokenizer is None:
+            tokenizer = _OfflineTokenizer(language)
+            if language == "japanese":
+                tokenizer._word_tokenizer = _SharedJapaneseWordTokenizer()
+            _tokenizers[language] = tokenizer
+        return tokenizer
+
+
+def sentence_vectors(sentences_words: Sequence[Sequence[str]]) -> np.ndarray:
+    """
+    文ごとのTF-IDFベクトルを作成
+
+    sumyと同じく、TFは文内の最大出現回数で割った値、IDFは
+    log(文数 / (1 + その語を含む文数)) とする。
+
+    Args:
+        sentences_words (Sequence[Sequence[str]]): 文ごとの正規化済みの単語
+
+    Returns:
+        np.ndarray: 文数×語彙数の行列
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, cols, counts = [], [], []
+    for row, words in enumerate(sentences_words):
+        term_counts: Dict[int, int] = {}
+        for word in words:
+            col = vocabulary.setdefault(word, len(vocabulary))
+            term_counts[col] = term_counts.get(col, 0) + 1
+        rows.extend([row] * len(term_counts))
+        cols.extend(term_counts.keys())
+        counts.extend(term_counts.values())
+
+    tf = np.zeros((len(sentences_words), len(vocabulary)))
+    tf[rows, cols] = counts
+    max_tf = tf.max(axis=1, initial=0)
+    max_tf[max_tf == 0] = 1
+    tf /= max_tf[:, None]
+
+    document_frequency = np.count_nonzero(tf, axis=0)
+    idf = np.log(len(sentences_words) / (1 + document_frequency))
+    return tf * idf
+
+
+def similarity_matrix(vectors: np.ndarray, threshold: float = DEFAULT_THRESHOLD) -> np.ndarray:
+    """
+    コサイン類似度がthresholdを超える文同士をつないだ遷移行列を作成
+
+    Args:
+        vectors (np.ndarray): 文ごとのTF-IDFベクトル
+        threshold (float): 辺を張る類似度の下限
+
+    Returns:
+        np.ndarray: 行ごとに次数で割った隣接行列
+    """
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+    similarity = vectors @ vectors.T
+    nonzero = norms > 0
+    similarity[nonzero] /= norms[nonzero, None]
+    similarity[:, nonzero] /= norms[None, nonzero]
+    # ノルムが0の文（単語がない・全文に出る語だけの文）は他の文と類似度0
+    similarity[~nonzero] = 0
+    similarity[:, ~nonzero] = 0
+
+    adjacency = (similarity > threshold).astype(float)
+    degrees = adjacency.sum(axis=1)
+    degrees[degrees == 0] = 1
+    return adjacency / degrees[:, None]
+
+
+def power_method(matrix: np.ndarray, epsilon: float = DEFAULT_EPSILON) -> np.ndarray:
+    """
+    べき乗法で定常分布（各文の中心性）を求める（sumyと同じ収束判定）
+
+    Args:
+        matrix (np.ndarray): 遷移行列
+        epsilon (float): 収束とみなす変化量
+
+    Returns:
+        np.ndarray: 文ごとのスコア
+    """
+    transposed = matrix.T
+    count = len(matrix)
+    p_vector = np.array([1.0 / count] * count)
+    lambda_val = 1.0
+    # どの文もつながらない場合はsumyと同じくNaNのスコアになる（並び順は出現順のまま）
+    with np.errstate(divide="ignore", invalid="ignore"):
+        while lambda_val > epsilon:
+            next_p = np.dot(transposed, p_vector)
+            next_p /= np.linalg.norm(next_p)
+            lambda_val = np.linalg.norm(np.subtract(next_p, p_vector))
+            p_vector = next_p
+    return p_vector
+
+
+class LexRank:
+    """
+    LexRankによる抽出型要約
+
+    sumyのLexRankSummarizer（null_stemmer・ストップワードなし）と同じ文を選ぶ。
+    """
+
+    def __init__(
+        self,
+        language: str = "japanese",
+        threshold: float = DEFAULT_THRESHOLD,
+        epsilon: float = DEFAULT_EPSILON,
+        max_sentences: Optional[int] = DEFAULT_MAX_SENTENCES
+    ):
+        """
+        Args:
+            language (str): 文・単語の分割に使う言語
+            threshold (float): 文同士をつなぐ類似度の下限
+            epsilon (float): べき乗法の収束判定
+            max_sentences (Optional[int]): 対象にする先頭からの文数（Noneなら全文）
+        """
+        self.tokenizer = get_tokenizer(language)
+        self.threshold = threshold
+        self.epsilon = epsilon
+        self.max_sentences = max_sentences
+
+    def split_sentences(self, text: str) -> List:
+        """テキストを文に分割（sumyのPlaintextParserと同じ分割）"""
+        sentences = list(PlaintextParser.from_string(text, self.tokenizer).document.sentences)
+        if self.max_sentences is not None and len(sentences) > self.max_sentences:
+            logger.info(f"先頭の{self.max_sentences}文だけを要約の対象にします（全{len(sentences)}文）")
+            sentences = sentences[:self.max_sentences]
+        return sentences
+
+    def rate_sentences(self, sentences: Sequence) -> np.ndarray:
+        """
+        各文のスコアを計算
+
+        Args:
+            sentences (Sequence): sumyのSentence
+
+        Returns:
+            np.ndarray: 文ごとのスコア
+        """
+        sentences_words = [[word.lower() for word in sentence.words] for sentence in sentences]
+        vectors = sentence_vectors(sentences_words)
+        return power_method(similarity_matrix(vectors, self.threshold), self.epsilon)
+
+    def summarize(self, text: str, sentences_count: int) -> Tuple[str, ...]:
+        """
+        重要な文を元の順序で抽出
+
+        Args:
+            text (str): 要約対象のテキスト
+            sentences_count (int): 抽出する文数
+
+        Returns:
+            Tuple[str, ...]: 抽出した文
+        """
+        sentences = self.split_sentences(text)
+        if not sentences:
+            return ()
+
+        scores = self.rate_sentences(sentences)
+
+        # sumyは同じ文をまとめて評価するため、同じ文には最後に出現した位置のスコアを使う
+        last_scores = {}
+        for sentence, score in zip(sentences, scores):
+            last_scores[sentence] = score
+        ratings = np.array([last_scores[sentence] for sentence in sentences])
+
+        # スコアの高い順（同点は出現順）に選び、元の順序に並べ直す
+        best = np.argsort(-ratings, kind="stable")[:sentences_count]
+        return tuple(str(sentences[i]) for i in sorted(best))
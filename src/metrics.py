@@ -0,0 +1,409 @@
+# src/metrics.py
+
+"""
+処理の指標（メトリクス）
+記事数・翻訳文字数・キャッシュのヒット数などのカウンターと、ステージごとの処理時間の
+ヒストグラムをプロセス内に集計し、Prometheusのテキスト形式で公開する
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 取り込みサービスが指標を公開する既定のポート（127.0.0.1のみで待ち受ける）
+DEFAULT_METRICS_PORT = 9108
+
+# 処理時間を記録するステージ（表示順）
+STAGES = ("fetch", "extract", "translate", "summarize", "db_write")
+
+# 処理時間のヒストグラムの区切り（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """ラベルをPrometheusのテキスト形式に変換"""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """数値をPrometheusのテキスト形式に変換"""
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """カウンター・ヒストグラムの共通部分"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} のラベルは {self.labelnames} です: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """増えるだけの値（記事数・文字数・エラー数など）"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        値を増やす
+
+        Args:
+            amount (float): 増やす量（0以上）
+            **labels: ラベルの値
+        """
+        if amount < 0:
+            raise ValueError("カウンターは減らせません")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """現在の値"""
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {"labels": dict(zip(self.labelnames, key)), "value": value}
+                for key, value in sorted(self._values.items())
+            ]
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, sample['labels'].values())} {_format_value(sample['value'])}"
+            for sample in self.samples()
+        ]
+
+
+class Histogram(_Metric):
+    """値の分布（処理時間など）"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベルの値 → [区切りごとの件数（累積でない）..., +Infの件数], 合計, 件数
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        値を1件記録
+
+        Args:
+            value (float): 記録する値
+            **labels: ラベルの値
+        """
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """withブロックの処理時間（秒）を記録"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            samples = []
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative, buckets = 0, []
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    buckets.append([bound, cumulative])
+                samples.append({
+                    "labels": dict(zip(self.labelnames, key)),
+                    "count": count,
+                    "sum": total,
+                    "buckets": buckets,
+                })
+            return samples
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for sample in self.samples():
+            values = sample["labels"].values()
+            for bound, cumulative in sample["buckets"]:
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, values)} {_format_value(sample['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, values)} {sample['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """指標の登録先（同じ名前の指標は1つだけ作る）"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} は別の種類の指標として登録済みです")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """カウンターを取得（なければ作成）"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """ヒストグラムを取得（なければ作成）"""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """
+        すべての指標をPrometheusのテキスト形式で出力
+
+        Returns:
+            str: text/plain; version=0.0.4 の本文
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        すべての指標の現在の値（JSONに変換できる形式）
+
+        Returns:
+            Dict[str, Dict]: {"counters": {名前: サンプル}, "histograms": {名前: サンプル}}
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {"counters": {}, "histograms": {}}
+        for metric in metrics:
+            snapshot["counters" if isinstance(metric, Counter) else "histograms"][metric.name] = metric.samples()
+        # JSONでは+Infを表せないため、最後の区切りはNoneにする
+        for samples in snapshot["histograms"].values():
+            for sample in samples:
+                sample["buckets"][-1][0] = None
+        return snapshot
+
+
+# プロセス共有の登録先
+REGISTRY = MetricsRegistry()
+
+# 取り込み処理の指標
+ARTICLES = REGISTRY.counter(
+    "meduza_articles_total", "処理した記事数（stage: fetched・fetch_failed・translated・saved）", ("stage",)
+)
+TRANSLATED_CHARACTERS = REGISTRY.counter(
+    "meduza_translated_characters_total", "翻訳APIに送った文字数（翻訳メモリから返した分は含まない）"
+)
+CACHE_HITS = REGISTRY.counter("meduza_cache_hits_total", "キャッシュのヒット数（cache: translation・summary）", ("cache",))
+CACHE_MISSES = REGISTRY.counter("meduza_cache_misses_total", "キャッシュのミス数（cache: translation・summary）", ("cache",))
+HTTP_ERRORS = REGISTRY.counter("meduza_http_errors_total", "HTTPリクエストの失敗数（target: rss・page・translate）", ("target",))
+STAGE_SECONDS = REGISTRY.histogram(
+    "meduza_stage_duration_seconds",
+    "処理時間（秒、stage: fetch・extract・translate・summarize・db_write）",
+    ("stage",)
+)
+
+
+def histogram_quantile(q: float, buckets: List[List[Optional[float]]]) -> Optional[float]:
+    """
+    ヒストグラムの区切りごとの累積件数から分位点を推定（Prometheusのhistogram_quantileと同じ線形補間）
+
+    Args:
+        q (float): 分位（0〜1）
+        buckets (List[List[Optional[float]]]): [区切り, 累積件数] のリスト（最後は+InfまたはNone）
+
+    Returns:
+        Optional[float]: 推定値（件数が0ならNone。+Infの区切りに入る場合は最後の有限の区切り）
+    """
+    if not buckets or not buckets[-1][1]:
+        return None
+    rank = q * buckets[-1][1]
+    lower, previous = 0.0, 0
+    for bound, cumulative in buckets:
+        if cumulative >= rank:
+            if bound is None or bound == math.inf:
+                return lower
+            if cumulative == previous:
+                return bound
+            return lower + (bound - lower) * (rank - previous) / (cumulative - previous)
+        lower, previous = bound, cumulative
+    return lower
+
+
+def stage_summary(snapshot: Dict[str, Dict]) -> Dict[str, Dict[str, float]]:
+    """
+    スナップショットからステージごとの件数・平均・p95（秒）を集計
+
+    Args:
+        snapshot (Dict[str, Dict]): MetricsRegistry.snapshotの結果
+
+    Returns:
+        Dict[str, Dict[str, float]]: {ステージ: {"count", "mean", "p95"}}
+    """
+    summary = {}
+    for sample in snapshot.get("histograms", {}).get(STAGE_SECONDS.name, []):
+        count = sample["count"]
+        summary[sample["labels"]["stage"]] = {
+            "count": count,
+            "mean": sample["sum"] / count if count else 0.0,
+            "p95": histogram_quantile(0.95, sample["buckets"]),
+        }
+    return summary
+
+
+def counter_totals(snapshot: Dict[str, Dict], name: str) -> Dict[str, float]:
+    """
+    スナップショットからカウンターの値をラベルごとに取得
+
+    Args:
+        snapshot (Dict[str, Dict]): MetricsRegistry.snapshotの結果
+        name (str): カウンターの名前
+
+    Returns:
+        Dict[str, float]: {ラベルの値（ラベルがなければ""）: 値}
+    """
+    return {
+        ",".join(sample["labels"].values()): sample["value"]
+        for sample in snapshot.get("counters", {}).get(name, [])
+    }
+
+
+class MetricsServer:
+    """
+    指標をHTTPで公開するサーバー（別スレッドで動く）
+
+    /metrics はPrometheusのテキスト形式、/metrics.json はスナップショットを返す。
+    """
+
+    def __init__(self, port: int = DEFAULT_METRICS_PORT, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY):
+        """
+        Args:
+            port (int): 待ち受けるポート（0なら空いているポート）
+            host (str): 待ち受けるアドレス
+            registry (MetricsRegistry): 公開する指標の登録先
+        """
+        self.registry = registry
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body = registry.render().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        logger.info(f"指標を公開しています: http://{self._server.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def fetch_metrics_snapshot(port: int, host: str = "127.0.0.1", timeout: float = 1.0) -> Optional[Dict[str, Dict]]:
+    """
+    別プロセス（取り込みサービス）が公開している指標のスナップショットを取得
+
+    Args:
+        port (int): 指標を公開しているポート
+        host (str): 指標を公開しているアドレス
+        timeout (float): タイムアウト（秒）
+
+    Returns:
+        Optional[Dict[str, Dict]]: スナップショット（取得できなければNone）
+    """
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics.json", timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"指標を取得できませんでした: {e}")
+        return None
@@ -0,0 +1,396 @@
+# src/migrations.py
+
+"""
+スキーママイグレーション
+PRAGMA user_version でスキーマのバージョンを管理し、既存のDBをその場で最新化する
+"""
+
+import logging
+import sqlite3
+from typing import Callable, Dict, List, Tuple
+
+from src.repository import DB_PATH, get_connection, transaction
+from src.utils import parse_published_timestamp, compute_content_hash
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 全文検索の対象カラム（日本語訳とロシア語原文）
+FTS_COLUMNS = ("translated_title", "summary", "translated_content", "title", "content")
+
+# バックフィルで1トランザクションに処理する行数
+DEFAULT_BACKFILL_BATCH_SIZE = 500
+
+# 全文検索インデックスに未登録の記事のIDの上限（これより大きいIDの記事は登録済み）
+FTS_UNINDEXED_MAX_SQL = "COALESCE((SELECT value FROM meta WHERE key = 'fts_unindexed_max'), 0)"
+
+
+def _ensure_column(cur: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+    """カラムが存在しなければ追加する"""
+    columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migration_001_create_articles(cur: sqlite3.Cursor) -> None:
+    """記事テーブルを作成"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        content TEXT,
+        translated_title TEXT,
+        translated_content TEXT,
+        summary TEXT,
+        published TEXT
+    )
+    """)
+
+
+def _migration_002_article_key(cur: sqlite3.Cursor) -> None:
+    """重複防止用の記事キー"""
+    _ensure_column(cur, "articles", "article_key", "TEXT")
+    cur.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_article_key
+    ON articles (article_key)
+    """)
+
+
+def _migration_003_published_at(cur: sqlite3.Cursor) -> None:
+    """日付フィルター・新しい順の一覧表示用の公開日時（UTCのUNIX時刻）"""
+    _ensure_column(cur, "articles", "published_at", "INTEGER")
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_articles_published_at
+    ON articles (published_at, id)
+    """)
+
+
+def ensure_fts(cur: sqlite3.Cursor) -> bool:
+    """
+    全文検索用のFTS5仮想テーブルと同期用トリガーを作成
+
+    日本語を扱えるようtrigramトークナイザを使う。FTS5やtrigramが使えない
+    SQLiteでは作成をスキップし、検索はLIKEにフォールバックする。
+
+    作成時点の既存の記事はここでは登録せず、run_fts_backfillで小さなバッチに分けて登録する。
+    未登録の記事のIDの上限をmetaのfts_unindexed_maxに記録し、トリガーはそれより
+    大きいIDの記事だけを更新する（未登録の行を削除してインデックスが壊れないようにする）。
+
+    Returns:
+        bool: 全文検索テーブルが使えるかどうか
+    """
+    existed = has_fts(cur)
+    columns = ", ".join(FTS_COLUMNS)
+    new_columns = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+    old_columns = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+    try:
+        cur.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            {columns},
+            content='articles', content_rowid='id', tokenize='trigram'
+        )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"全文検索インデックスを作成できません（LIKE検索を使用します）: {e}")
+        return False
+
+    _ensure_meta(cur)
+    if existed:
+        cur.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('fts_unindexed_max', 0)")
+    else:
+        cur.execute(
+            "INSERT OR REPLACE INTO meta (key, value) "
+            "VALUES ('fts_unindexed_max', (SELECT COALESCE(MAX(id), 0) FROM articles))"
+        )
+
+    for trigger in ("articles_fts_insert", "articles_fts_delete", "articles_fts_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute(f"""
+    CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles
+    WHEN new.id > {FTS_UNINDEXED_MAX_SQL} BEGIN
+        INSERT INTO articles_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+    END
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles
+    WHEN old.id > {FTS_UNINDEXED_MAX_SQL} BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+    END
+    """)
+    # 検索対象カラムの更新時だけインデックスを更新する
+    cur.execute(f"""
+    CREATE TRIGGER articles_fts_update AFTER UPDATE OF {columns} ON articles
+    WHEN old.id > {FTS_UNINDEXED_MAX_SQL} BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+        INSERT INTO articles_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+    END
+    """)
+    return True
+
+
+def has_fts(cur) -> bool:
+    """全文検索テーブルが存在するか確認"""
+    row = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).fetchone()
+    return row is not None
+
+
+def _ensure_meta(cur: sqlite3.Cursor) -> None:
+    """キャッシュ無効化用の世代番号などを保持するメタ情報テーブルを作成"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """)
+    cur.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+
+
+def _migration_004_fts(cur: sqlite3.Cursor) -> None:
+    """全文検索インデックス（既存の記事はrun_fts_backfillで登録する）"""
+    ensure_fts(cur)
+
+
+def _migration_005_article_details(cur: sqlite3.Cursor) -> None:
+    """記事URL・本文ハッシュ・翻訳済み要約・自動要約"""
+    _ensure_column(cur, "articles", "link", "TEXT")
+    _ensure_column(cur, "articles", "content_hash", "TEXT")
+    _ensure_column(cur, "articles", "summary_ja", "TEXT")
+    _ensure_column(cur, "articles", "summary_auto", "TEXT")
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_articles_content_hash
+    ON articles (content_hash)
+    """)
+
+
+def _migration_006_meta(cur: sqlite3.Cursor) -> None:
+    """キャッシュ無効化用の世代番号などを保持するメタ情報テーブル"""
+    _ensure_meta(cur)
+
+
+def _migration_007_ingest_jobs(cur: sqlite3.Cursor) -> None:
+    """取り込みジョブのキューと取り込みサービスの稼働状況"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS ingest_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        source TEXT NOT NULL,
+        article_limit INTEGER NOT NULL,
+        progress INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        saved INTEGER NOT NULL DEFAULT 0,
+        message TEXT,
+        error TEXT,
+        created_at INTEGER NOT NULL,
+        started_at INTEGER,
+        finished_at INTEGER
+    )
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_ingest_jobs_status
+    ON ingest_jobs (status, id)
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS service_status (
+        name TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        pid INTEGER,
+        host TEXT,
+        started_at INTEGER,
+        heartbeat_at INTEGER NOT NULL,
+        next_poll_at INTEGER,
+        current_job_id INTEGER,
+        message TEXT
+    )
+    """)
+
+
+def _migration_008_ingest_job_mode(cur: sqlite3.Cursor) -> None:
+    """取り込みジョブごとの処理モード（全文翻訳・ダイジェスト）"""
+    _ensure_column(cur, "ingest_jobs", "mode", "TEXT NOT NULL DEFAULT 'full'")
+
+
+def _migration_009_service_metrics_port(cur: sqlite3.Cursor) -> None:
+    """取り込みサービスが指標を公開しているポート"""
+    _ensure_column(cur, "service_status", "metrics_port", "INTEGER")
+
+
+# (バージョン, 説明, 適用関数) の一覧。追加するときは末尾にバージョンを増やして足す
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "articlesテーブル作成", _migration_001_create_articles),
+    (2, "記事キーと一意インデックス", _migration_002_article_key),
+    (3, "正規化した公開日時とインデックス", _migration_003_published_at),
+    (4, "全文検索インデックス", _migration_004_fts),
+    (5, "記事URL・本文ハッシュ・要約カラム", _migration_005_article_details),
+    (6, "メタ情報テーブル", _migration_006_meta),
+    (7, "取り込みジョブキューと稼働状況", _migration_007_ingest_jobs),
+    (8, "取り込みジョブの処理モード", _migration_008_ingest_job_mode),
+    (9, "取り込みサービスの指標のポート", _migration_009_service_metrics_port),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db_path: str = DB_PATH) -> int:
+    """現在のスキーマバージョン（PRAGMA user_version）を取得"""
+    return get_connection(db_path).execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path: str = DB_PATH) -> int:
+    """
+    未適用のマイグレーションを順に適用
+
+    各マイグレーションは書き込みロックを取った1トランザクション内で実行し、
+    成功したらuser_versionを更新する。途中で失敗した場合はそのバージョンの
+    変更だけがロールバックされる。
+
+    Args:
+        db_path (str): データベースファイルパス
+
+    Returns:
+        int: 適用後のスキーマバージョン
+    """
+    version = get_schema_version(db_path)
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        with transaction(db_path, immediate=True) as conn:
+            # 他のプロセスが先に適用した場合はスキップ
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= target:
+                continue
+            apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {target}")
+        logger.info(f"マイグレーション {target} を適用しました: {description}")
+        version = target
+    return version
+
+
+def _backfill_published_at(rows: List[Tuple]) -> List[Tuple]:
+    """公開日時の文字列からpublished_atを計算"""
+    updates = []
+    for row_id, published in rows:
+        timestamp = parse_published_timestamp(published)
+        if timestamp is not None:
+            updates.append((timestamp, row_id))
+    return updates
+
+
+def _backfill_content_hash(rows: List[Tuple]) -> List[Tuple]:
+    """本文からcontent_hashを計算"""
+    return [(compute_content_hash(content), row_id) for row_id, content in rows]
+
+
+# カラム名: (元データのカラム, 値の計算関数)
+BACKFILLS: Dict[str, Tuple[str, Callable[[List[Tuple]], List[Tuple]]]] = {
+    "published_at": ("published", _backfill_published_at),
+    "content_hash": ("content", _backfill_content_hash),
+}
+
+
+def run_backfill(column: str, db_path: str = DB_PATH, batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE) -> int:
+    """
+    未設定のカラムを小さなバッチに分けて埋める（オンラインバックフィル）
+
+    バッチごとに別トランザクションでコミットするため、大きなテーブルでも
+    書き込みロックを長時間保持しない。
+
+    Args:
+        column (str): 埋めるカラム名（BACKFILLSのキー）
+        db_path (str): データベースファイルパス
+        batch_size (int): 1トランザクションで処理する行数
+
+    Returns:
+        int: 更新した行数
+    """
+    source, compute = BACKFILLS[column]
+    last_id = 0
+    updated = 0
+    while True:
+        with transaction(db_path) as conn:
+            rows = conn.execute(
+                f"SELECT id, {source} FROM articles "
+                f"WHERE id > ? AND {column} IS NULL AND {source} IS NOT NULL AND {source} != '' "
+                f"ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            updates = compute(rows)
+            conn.executemany(f"UPDATE articles SET {column} = ? WHERE id = ?", updates)
+        last_id = rows[-1][0]
+        updated += len(updates)
+
+    if updated:
+        logger.info(f"{column} をバックフィルしました（{updated}件）")
+    return updated
+
+
+def run_fts_backfill(db_path: str = DB_PATH, batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE) -> int:
+    """
+    全文検索インデックスに未登録の既存記事を小さなバッチに分けて登録
+
+    fts_unindexed_max以下のIDの記事をIDの大きい方から範囲ごとに登録し、バッチごとに
+    上限を下げて別トランザクションでコミットする。登録済みの範囲はトリガーが更新する。
+
+    Args:
+        db_path (str): データベースファイルパス
+        batch_size (int): 1トランザクションで登録する行数
+
+    Returns:
+        int: 登録した行数
+    """
+    columns = ", ".join(FTS_COLUMNS)
+    indexed = 0
+    while True:
+        with transaction(db_path, immediate=True) as conn:
+            if not has_fts(conn):
+                break
+            upper = conn.execute(f"SELECT {FTS_UNINDEXED_MAX_SQL}").fetchone()[0]
+            if upper <= 0:
+                break
+            rows = conn.execute(
+                "SELECT id FROM articles WHERE id <= ? ORDER BY id DESC LIMIT ?", (upper, batch_size)
+            ).fetchall()
+            lower = rows[-1][0] if rows else 1
+            conn.execute(
+                f"INSERT INTO articles_fts (rowid, {columns}) "
+                f"SELECT id, {columns} FROM articles WHERE id BETWEEN ? AND ?",
+                (lower, upper)
+            )
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'fts_unindexed_max'", (lower - 1,))
+        indexed += len(rows)
+
+    if indexed:
+        logger.info(f"全文検索インデックスに既存記事を登録しました（{indexed}件）")
+    return indexed
+
+
+def backfills_pending(db_path: str = DB_PATH) -> bool:
+    """
+    現在のスキーマバージョンでバックフィルが未完了かどうか
+
+    新しく保存する記事はバックフィル対象のカラムを保存時に設定するため、
+    完了後はマイグレーションでスキーマが変わるまで再実行しなくてよい。
+    """
+    conn = get_connection(db_path)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'backfilled_version'").fetchone()
+    return row is None or row[0] < get_schema_version(db_path)
+
+
+def run_backfills(db_path: str = DB_PATH, batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE) -> Dict[str, int]:
+    """
+    すべてのバックフィルを実行し、完了したスキーマバージョンをmetaに記録
+
+    Returns:
+        Dict[str, int]: カラム（全文検索インデックスはarticles_fts）ごとの更新行数
+    """
+    counts = {column: run_backfill(column, db_path, batch_size) for column in BACKFILLS}
+    counts["articles_fts"] = run_fts_backfill(db_path, batch_size)
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled_version', ?)",
+            (conn.execute("PRAGMA user_version").fetchone()[0],)
+        )
+    return counts
@@ -0,0 +1,296 @@
+# src/page_cache.py
+
+"""
+記事ページのキャッシュ
+取得したページのHTML（バイト列）を圧縮して内容のハッシュで保存し、抽出ルールを
+変えたときにページを再取得せずに本文を作り直せるようにする
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from src.repository import DB_PATH, data_path
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+
+def page_cache_dir(db_path: str = DB_PATH) -> str:
+    """ページキャッシュの保存先（DBと同じディレクトリ）"""
+    return data_path("page_cache", db_path)
+
+
+# 既定のページキャッシュの保存先（MEDUZA_DB_PATHに従う）
+PAGE_CACHE_DIR = page_cache_dir()
+
+# ディスクに保存するページの合計サイズ上限（圧縮後、バイト）
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# これより前に取得したページは削除する（秒）
+DEFAULT_MAX_CACHE_AGE = 180 * 24 * 60 * 60
+
+# 期限切れのページを確認する間隔（秒）
+EXPIRY_CHECK_INTERVAL = 60 * 60
+
+# zlibの圧縮レベル（HTMLは6でも1/5程度になり、9との差は小さい）
+COMPRESSION_LEVEL = 6
+
+
+def load_page(path: str) -> bytes:
+    """
+    保存済みのページを読み込んで展開
+
+    Args:
+        path (str): PageCache.page_pathで取得したファイルパス
+
+    Returns:
+        bytes: ページのHTML
+    """
+    with open(path, "rb") as f:
+        return zlib.decompress(f.read())
+
+
+class PageCache:
+    """
+    記事ページのディスクキャッシュ
+
+    ページ本体は内容のSHA-256をファイル名にして保存し（同じ内容のページは1つだけ持つ）、
+    URLとレスポンスのバリデータ（ETag・Last-Modified）の組からその内容を引く索引をSQLiteに持つ。
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = PAGE_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+        max_age: float = DEFAULT_MAX_CACHE_AGE
+    ):
+        """
+        Args:
+            cache_dir (str): キャッシュの保存先ディレクトリ
+            max_bytes (int): 保存するページの合計サイズ上限（圧縮後、バイト）
+            max_age (float): ページを保持する期間（秒）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._next_expiry_check = 0.0
+
+        os.makedirs(os.path.join(cache_dir, "pages"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT NOT NULL,
+            etag TEXT NOT NULL DEFAULT '',
+            last_modified TEXT NOT NULL DEFAULT '',
+            digest TEXT NOT NULL,
+            fetched_at REAL,
+            PRIMARY KEY (url, etag, last_modified)
+        )
+        """)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            digest TEXT PRIMARY KEY,
+            size INTEGER,
+            raw_size INTEGER,
+            last_used REAL
+        )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_url ON responses (url, fetched_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages (last_used)")
+        self._conn.commit()
+        self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _path(self, digest: str) -> str:
+        """内容のハッシュからファイルパスを作成"""
+        return os.path.join(self.cache_dir, "pages", digest[:2], digest + ".zz")
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        取得したページを保存
+
+        Args:
+            url (str): ページのURL
+            content (bytes): レスポンスの本文
+            etag (Optional[str]): レスポンスのETag
+            last_modified (Optional[str]): レスポンスのLast-Modified
+
+        Returns:
+            Optional[str]: 内容のハッシュ（空のページは保存せずNone）
+        """
+        if not content:
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM pages WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                compressed = zlib.compress(content, COMPRESSION_LEVEL)
+                path = self._path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # 書き込み途中のファイルを読まれないよう、一時ファイルから置き換える
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+                self._conn.execute(
+                    "INSERT INTO pages (digest, size, raw_size, last_used) VALUES (?, ?, ?, ?)",
+                    (digest, len(compressed), len(content), now)
+                )
+                self._disk_bytes += len(compressed)
+            else:
+                self._conn.execute("UPDATE pages SET last_used = ? WHERE digest = ?", (now, digest))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, digest, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag or "", last_modified or "", digest, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+        return digest
+
+    def page_path(self, url: str) -> Optional[str]:
+        """
+        URLの最新のページのファイルパスを取得（別プロセスでload_pageに渡す用）
+
+        Args:
+            url (str): ページのURL
+
+        Returns:
+            Optional[str]: ファイルパス（保存されていなければNone）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM responses WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+            ).fetchone()
+            if row is None or not os.path.exists(self._path(row[0])):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE pages SET last_used = ? WHERE digest = ?", (time.time(), row[0]))
+            self._conn.commit()
+            self.hits += 1
+            return self._path(row[0])
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        URLの最新のページを取得
+
+        Args:
+            url (str): ページのURL
+
+        Returns:
+            Optional[bytes]: ページのHTML（保存されていなければNone）
+        """
+        path = self.page_path(url)
+        return load_page(path) if path else None
+
+    def _remove(self, digests) -> None:
+        """ページ本体と索引を削除（ロック取得済みで呼ぶ）"""
+        for digest in digests:
+            row = self._conn.execute("SELECT size FROM pages WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                continue
+            self._conn.execute("DELETE FROM pages WHERE digest = ?", (digest,))
+            self._conn.execute("DELETE FROM responses WHERE digest = ?", (digest,))
+            self._disk_bytes -= row[0]
+            self.evictions += 1
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, now: float) -> None:
+        """期限切れのページと、合計サイズの上限を超えた分を削除（ロック取得済みで呼ぶ）"""
+        before = self.evictions
+
+        # 期限切れ: 古い索引を消し、どのURLからも参照されなくなったページを削除
+        # （全件の走査になるため、確認は一定間隔ごとに行う）
+        if now >= self._next_expiry_check:
+            self._next_expiry_check = now + EXPIRY_CHECK_INTERVAL
+            self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (now - self.max_age,))
+            expired = self._conn.execute(
+                "SELECT digest FROM pages WHERE digest NOT IN (SELECT digest FROM responses)"
+            ).fetchall()
+            self._remove(digest for (digest,) in expired)
+
+        if self._disk_bytes > self.max_bytes:
+            # 上限の9割まで減らして、削除が頻発しないようにする
+            target = int(self.max_bytes * 0.9)
+            rows = self._conn.execute("SELECT digest, size FROM pages ORDER BY last_used").fetchall()
+            removed = []
+            remaining = self._disk_bytes
+            for digest, size in rows:
+                if remaining <= target:
+                    break
+                removed.append(digest)
+                remaining -= size
+            self._remove(removed)
+
+        if self.evictions > before:
+            logger.info(f"ページキャッシュを整理しました（削除: {self.evictions - before}件）")
+
+    def evict(self) -> None:
+        """期限切れのページと、合計サイズの上限を超えた分を削除"""
+        with self._lock:
+            self._next_expiry_check = 0.0
+            self._evict(time.time())
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            Dict[str, int]: ヒット数・ミス数・件数・サイズなど
+        """
+        with self._lock:
+            pages, raw_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM pages"
+            ).fetchone()
+            responses = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "responses": responses,
+                "pages": pages,
+                "disk_bytes": self._disk_bytes,
+                "raw_bytes": raw_bytes,
+            }
+
+    def close(self) -> None:
+        """DB接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+_default_caches: Dict[str, PageCache] = {}
+_default_caches_lock = threading.Lock()
+
+
+def get_page_cache(cache_dir: str = PAGE_CACHE_DIR) -> PageCache:
+    """プロセス共有のページキャッシュを取得"""
+    with _default_caches_lock:
+        cache = _default_caches.get(cache_dir)
+        if cache is None:
+            cache = _default_caches[cache_dir] = PageCache(cache_dir)
+        return cache
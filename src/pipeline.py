@@ -0,0 +1,203 @@
+# src/pipeline.py
+
+"""
+ステージ型のパイプライン
+各ステージのワーカー群を上限付きキューでつなぎ、取得・翻訳・要約などを記事ごとに重ねて実行する
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ステージ間のキューの既定の長さ（満杯なら前のステージが待つ）
+DEFAULT_QUEUE_SIZE = 4
+
+# ワーカーに終了を知らせる目印
+_DONE = object()
+
+
+class Stage:
+    """パイプラインの1ステージ"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        """
+        Args:
+            name (str): ステージ名（統計やログに使う）
+            func (Callable[[Any], Any]): 1件を処理する関数。Noneを返した項目は以降のステージに渡さない
+            workers (int): 並列に動かすワーカースレッド数
+            queue_size (int): このステージの入力キューの長さ
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+
+
+class StageStats:
+    """ステージごとの処理件数と処理時間"""
+
+    def __init__(self):
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class Pipeline:
+    """
+    ステージを上限付きキューでつないだパイプライン
+
+    入力は別スレッドから最初のステージに流し込み、各ステージのワーカーが処理した
+    項目を次のステージへ渡す。最後のステージの出力は呼び出し元のスレッドでsinkに渡すため、
+    保存処理（SQLiteの書き込みやStreamlitのセッション状態の更新）は1スレッドで順に行われる。
+    キューが満杯になると前のステージは空くまで待つので、遅いステージがあっても
+    処理中の項目数はキューの長さの合計で頭打ちになる。
+    """
+
+    def __init__(self, stages: List[Stage], output_queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            stages (List[Stage]): 実行順のステージ
+            output_queue_size (int): 最後のステージとsinkの間のキューの長さ
+        """
+        if not stages:
+            raise ValueError("ステージが1つもありません")
+        self.stages = stages
+        self.output_queue_size = output_queue_size
+        self.stats: Dict[str, StageStats] = {}
+
+    def _worker(self, index: int, inbox: queue.Queue, outbox: queue.Queue, remaining: List[int], lock: threading.Lock):
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        try:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+
+                started = time.perf_counter()
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    logger.error(f"{stage.name}ステージでエラーが発生しました: {e}")
+                    result = None
+                    failed = True
+                else:
+                    failed = False
+                elapsed = time.perf_counter() - started
+
+                with lock:
+                    stats.busy_seconds += elapsed
+                    if failed:
+                        stats.failed += 1
+                    elif result is None:
+                        stats.dropped += 1
+                    else:
+                        stats.processed += 1
+                if result is not None:
+                    outbox.put(result)
+        finally:
+            # 最後に終わったワーカーが次のステージに終了を伝える
+            with lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last:
+                next_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                for _ in range(next_workers):
+                    outbox.put(_DONE)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        sink: Callable[[Any], None],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> bool:
+        """
+        全項目を処理（すべてのステージが終わるまで戻らない）
+
+        should_stopがTrueを返すと新しい項目の投入をやめ、処理中の項目だけを最後まで流して終了する。
+
+        Args:
+            items (Iterable[Any]): 入力
+            sink (Callable[[Any], None]): 最後のステージの出力を受け取る関数（呼び出し元のスレッドで実行）
+            should_stop (Optional[Callable[[], bool]]): 中断するかどうか
+
+        Returns:
+            bool: 途中で中断した場合True
+        """
+        should_stop = should_stop or (lambda: False)
+        self.stats = {stage.name: StageStats() for stage in self.stages}
+        self.stats["sink"] = StageStats()
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues.append(queue.Queue(maxsize=self.output_queue_size))
+        remaining = [stage.workers for stage in self.stages]
+        lock = threading.Lock()
+        interrupted = threading.Event()
+
+        def feed():
+            try:
+                for item in items:
+                    if should_stop():
+                        interrupted.set()
+                        break
+                    queues[0].put(item)
+            except Exception as e:
+                logger.error(f"入力の読み込み中にエラーが発生しました: {e}")
+            finally:
+                for _ in range(self.stages[0].workers):
+                    queues[0].put(_DONE)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._worker,
+                    args=(index, queues[index], queues[index + 1], remaining, lock),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        # 最後のステージの出力を順に保存する
+        sink_stats = self.stats["sink"]
+        while True:
+            result = queues[-1].get()
+            if result is _DONE:
+                break
+            started = time.perf_counter()
+            try:
+                sink(result)
+                sink_stats.processed += 1
+            except Exception as e:
+                logger.error(f"保存中にエラーが発生しました: {e}")
+                sink_stats.failed += 1
+            sink_stats.busy_seconds += time.perf_counter() - started
+
+        for thread in threads:
+            thread.join()
+        return interrupted.is_set()
+
+    def stats_summary(self) -> Dict[str, Dict[str, float]]:
+        """直前のrunのステージごとの統計"""
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
@@ -0,0 +1,179 @@
+# rate_limiter.py
+
+"""
+翻訳APIのレート制限
+プロセス内で共有するトークンバケットと、AIMD方式の適応的な速度調整
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# プロセス全体で同時に送信する翻訳リクエストの上限
+MAX_CONCURRENT_REQUESTS = 4
+
+
+class AdaptiveRateLimiter:
+    """
+    適応型トークンバケット
+
+    成功が続くとリクエスト速度を少しずつ上げ（加算的増加）、
+    429などのスロットリングを受けると速度を大きく下げる（乗算的減少）。
+    スレッドセーフで、複数の翻訳器・スレッドから共有できる。
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        increase_step: float = 0.1,
+        throttle_factor: float = 0.5,
+        error_factor: float = 0.8,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            rate (float): 初期速度（リクエスト/秒）
+            burst (float): バケット容量（連続で送れる最大リクエスト数）
+            min_rate (float): 速度の下限
+            max_rate (float): 速度の上限
+            increase_step (float): 成功時に加算する速度
+            throttle_factor (float): スロットリング時に掛ける係数
+            error_factor (float): その他のエラー時に掛ける係数
+            clock (Callable[[], float]): 時刻取得関数（テスト用）
+            sleep (Callable[[float], None]): 待機関数（テスト用）
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.throttle_factor = throttle_factor
+        self.error_factor = error_factor
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._last_refill = clock()
+        self.requests = 0
+        self.throttle_events = 0
+        self.error_events = 0
+        self.total_wait = 0.0
+
+    def _refill(self) -> None:
+        """経過時間に応じてトークンを補充（ロック取得済みで呼ぶ）"""
+        now = self._clock()
+        elapsed = max(0.0, now - self._last_refill)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得（足りなければ補充されるまで待機）
+
+        Returns:
+            float: 待機した秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.requests += 1
+                    self.total_wait += waited
+                    return waited
+                wait = (1.0 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        """成功時: 速度を加算的に上げる"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self) -> None:
+        """スロットリング（429）時: 速度を乗算的に下げ、溜まったトークンも捨てる"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.throttle_factor)
+            self._tokens = 0.0
+            self.throttle_events += 1
+            rate = self.rate
+        logger.warning(f"翻訳APIのレート制限を検知しました。速度を {rate:.2f} req/s に下げます")
+
+    def on_error(self) -> None:
+        """その他のエラー時: 速度を控えめに下げる"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.error_factor)
+            self.error_events += 1
+
+    def state(self) -> Dict[str, float]:
+        """
+        現在の状態を取得
+
+        Returns:
+            Dict[str, float]: 速度・トークン数・スロットリング回数など
+        """
+        with self._lock:
+            self._refill()
+            return {
+                "rate": self.rate,
+                "tokens": self._tokens,
+                "requests": self.requests,
+                "throttle_events": self.throttle_events,
+                "error_events": self.error_events,
+                "total_wait": self.total_wait,
+            }
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    例外がスロットリング（429 Too Many Requests）によるものか判定
+
+    Args:
+        error (Exception): 発生した例外
+
+    Returns:
+        bool: スロットリングならTrue
+    """
+    if type(error).__name__ == "TooManyRequests":
+        return True
+    message = str(error).lower()
+    return "429" in message or "too many requests" in message
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+_shared_request_slots: Optional[threading.BoundedSemaphore] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter() -> AdaptiveRateLimiter:
+    """プロセス共有のレートリミッターを取得"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
+
+
+def get_request_slots() -> threading.BoundedSemaphore:
+    """
+    プロセス共有の同時リクエスト数制限を取得
+
+    複数の記事やチャンクを並列に翻訳しても、翻訳APIへの同時リクエスト数が
+    MAX_CONCURRENT_REQUESTS を超えないようにする
+    """
+    global _shared_request_slots
+    with _shared_limiter_lock:
+        if _shared_request_slots is None:
+            _shared_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+        return _shared_request_slots
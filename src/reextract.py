@@ -0,0 +1,156 @@
+# src/reextract.py
+
+"""
+保存済みのページからの本文の再抽出
+抽出ルールを変えたあと、ページを再取得せずにページキャッシュから記事の原文を作り直す
+"""
+
+import logging
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.repository import DB_PATH, get_connection
+from src.database import update_article_contents
+from src.extract import extract_article_text
+from src.page_cache import PageCache, get_page_cache, load_page, page_cache_dir
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 1回に読み出して保存する記事数
+DEFAULT_REEXTRACT_BATCH_SIZE = 200
+
+
+class ReextractResult(NamedTuple):
+    """1回の再抽出の結果"""
+    selected: int
+    # ページキャッシュにページがなかった記事数
+    missing: int
+    # ページから本文を抽出できなかった記事数（原文は変更しない）
+    failed: int
+    # 原文が変わった記事数
+    updated: int
+
+
+def extract_cached_page(path: str) -> Optional[str]:
+    """
+    保存済みのページから本文を抽出（ワーカープロセスで実行する）
+
+    Args:
+        path (str): ページキャッシュのファイルパス
+
+    Returns:
+        Optional[str]: 本文（読み込み・抽出できなければNone）
+    """
+    try:
+        return extract_article_text(load_page(path))
+    except (OSError, zlib.error) as e:
+        logger.warning(f"保存済みのページを読み込めませんでした: {path} ({e})")
+        return None
+
+
+def iter_article_links(
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    db_path: str = DB_PATH,
+    batch_size: int = DEFAULT_REEXTRACT_BATCH_SIZE
+) -> Iterator[List[Tuple[int, str]]]:
+    """
+    公開日時が範囲内の記事のIDとURLをID順に一定件数ずつ取得
+
+    Args:
+        since (Optional[int]): この時刻（UNIX時刻）以降の記事に絞り込む
+        until (Optional[int]): この時刻（UNIX時刻）より前の記事に絞り込む
+        db_path (str): データベースファイルパス
+        batch_size (int): 1バッチの行数
+
+    Yields:
+        List[Tuple[int, str]]: 記事IDとURL
+    """
+    if not os.path.exists(db_path):
+        return
+
+    query = "SELECT id, link FROM articles WHERE id > ? AND COALESCE(link, '') != ''"
+    params: List = []
+    if since is not None:
+        query += " AND published_at >= ?"
+        params.append(since)
+    if until is not None:
+        query += " AND published_at < ?"
+        params.append(until)
+    query += " ORDER BY id LIMIT ?"
+
+    conn = get_connection(db_path)
+    last_id = 0
+    while True:
+        rows = conn.execute(query, [last_id] + params + [batch_size]).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def reextract_articles(
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    db_path: str = DB_PATH,
+    cache: Optional[PageCache] = None,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_REEXTRACT_BATCH_SIZE
+) -> ReextractResult:
+    """
+    期間内の記事の原文を、ページキャッシュに保存済みのページから抽出し直す
+
+    ページの展開と抽出はCPUの処理なので、ワーカープロセスに分けて並列に行う。
+    DBへの書き込みはこのプロセスでバッチごとに1トランザクションで行う。
+    翻訳済みの本文・要約は変更しない。
+
+    Args:
+        since (Optional[int]): この時刻（UNIX時刻）以降の記事に絞り込む
+        until (Optional[int]): この時刻（UNIX時刻）より前の記事に絞り込む
+        db_path (str): データベースファイルパス
+        cache (Optional[PageCache]): ページキャッシュ（省略時はDBと同じディレクトリのプロセス共有のもの）
+        workers (Optional[int]): ワーカープロセス数（省略時はCPU数、1以下ならこのプロセスで抽出）
+        batch_size (int): 1回に読み出して保存する記事数
+
+    Returns:
+        ReextractResult: 再抽出の結果
+    """
+    cache = cache or get_page_cache(page_cache_dir(db_path))
+    workers = workers or os.cpu_count() or 1
+    selected = missing = failed = updated = 0
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for rows in iter_article_links(since, until, db_path, batch_size):
+            selected += len(rows)
+            targets = []
+            for article_id, link in rows:
+                path = cache.page_path(link)
+                if path is None:
+                    missing += 1
+                else:
+                    targets.append((article_id, path))
+
+            paths = [path for _, path in targets]
+            if executor is None:
+                texts = map(extract_cached_page, paths)
+            else:
+                texts = executor.map(extract_cached_page, paths, chunksize=max(1, len(paths) // (workers * 4)))
+
+            contents: Dict[int, str] = {}
+            for (article_id, _), text in zip(targets, texts):
+                if text:
+                    contents[article_id] = text
+                else:
+                    failed += 1
+            updated += update_article_contents(contents, db_path)
+            logger.info(f"再抽出: {selected}件を処理（更新 {updated}件 / キャッシュなし {missing}件）")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return ReextractResult(selected, missing, failed, updated)
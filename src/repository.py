@@ -0,0 +1,111 @@
+# src/repository.py
+
+"""
+データベース接続管理
+スレッドごとに接続を再利用し、WALモードと性能向けのPRAGMAを設定する
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 記事データベースのパス（環境変数 MEDUZA_DB_PATH で変更可能）
+DB_PATH = os.environ.get("MEDUZA_DB_PATH", "data/articles.db")
+
+
+def data_path(name: str, db_path: str = DB_PATH) -> str:
+    """DBと同じディレクトリに置くファイル（キャッシュ・エクスポートなど）のパス"""
+    return os.path.join(os.path.dirname(db_path) or ".", name)
+
+
+# 接続ごとに設定するPRAGMA
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",         # 読み込みが書き込みをブロックしない
+    "synchronous": "NORMAL",       # WALではコミットごとのfsyncを省いても整合性は保たれる
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,      # 負の値はKiB単位（64MiB）
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,          # ミリ秒
+}
+
+_local = threading.local()
+
+
+def _connections() -> Dict[str, sqlite3.Connection]:
+    """現在のスレッドの接続テーブルを取得"""
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+    return _local.connections
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """新しい接続を作成してPRAGMAを設定"""
+    if db_path != ":memory:":
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    # トランザクションはtransaction()で明示的に開始する
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for name, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    現在のスレッド用の接続を取得（初回のみ接続を作成し、以降は再利用）
+
+    Args:
+        db_path (Optional[str]): データベースファイルパス（省略時はDB_PATH）
+
+    Returns:
+        sqlite3.Connection: 自動コミットモードの接続
+    """
+    db_path = db_path or DB_PATH
+    connections = _connections()
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = _connect(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+@contextmanager
+def transaction(db_path: Optional[str] = None, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    1つのトランザクション内で処理を実行（例外時はロールバック）
+
+    Args:
+        db_path (Optional[str]): データベースファイルパス（省略時はDB_PATH）
+        immediate (bool): 開始時に書き込みロックを取得するかどうか
+
+    Yields:
+        sqlite3.Connection: 接続
+    """
+    conn = get_connection(db_path)
+    if conn.in_transaction:
+        # 入れ子の場合は外側のトランザクションに含める
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def close_connections() -> None:
+    """現在のスレッドの接続をすべて閉じる"""
+    connections = _connections()
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
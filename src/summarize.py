@@ -1,33 +1,86 @@
 # summarize.py
 
 """
-要約処理（将来実装予定）
-翻訳された記事を要約する機能
+要約処理
+LexRankで重要な文を抽出して記事を要約する（同じ本文の要約はメモして再利用する）
 """
 
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+from collections import OrderedDict
 import logging
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lex_rank import LexRankSummarizer
+import threading
+from src.lexrank import LexRank, DEFAULT_MAX_SENTENCES
+from src.utils import compute_content_hash
+from src.metrics import CACHE_HITS, CACHE_MISSES, STAGE_SECONDS
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 取り込み時に作る要約の長さ（文字数の目安、50文字1文として3文）
+DEFAULT_SUMMARY_LENGTH = 150
+
+# プロセス内に覚えておく要約の件数
+DEFAULT_MAX_CACHED_SUMMARIES = 1024
+
 
 class MeduzaSummarizer:
-    """記事要約クラス（将来実装予定）"""
+    """LexRankによる抽出型の記事要約クラス"""
     
-    def __init__(self):
-        # TODO: 要約モデルの初期化
-        # OpenAI API, Hugging Face Transformers等を使用予定
-        pass
+    def __init__(
+        self,
+        language: str = "japanese",
+        max_sentences: Optional[int] = DEFAULT_MAX_SENTENCES,
+        max_cached_summaries: int = DEFAULT_MAX_CACHED_SUMMARIES
+    ):
+        """
+        Args:
+            language (str): 要約するテキストの言語
+            max_sentences (Optional[int]): 要約の対象にする先頭からの文数（Noneなら全文）
+            max_cached_summaries (int): 覚えておく要約の件数（0なら覚えない）
+        """
+        # 分割器はプロセス内で共有されるため、インスタンスを作り直しても初期化は1回だけ
+        self.lexrank = LexRank(language, max_sentences=max_sentences)
+        self.max_cached_summaries = max_cached_summaries
+        # (本文のハッシュ, 文数) → 要約 のLRU
+        self._memo: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_memo(self, key: Tuple[str, int]) -> Optional[str]:
+        with self._lock:
+            summary = self._memo.get(key)
+            if summary is None:
+                self.misses += 1
+                CACHE_MISSES.inc(cache="summary")
+                return None
+            self._memo.move_to_end(key)
+            self.hits += 1
+            CACHE_HITS.inc(cache="summary")
+            return summary
+
+    def _put_memo(self, key: Tuple[str, int], summary: str) -> None:
+        if self.max_cached_summaries <= 0:
+            return
+        with self._lock:
+            self._memo[key] = summary
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_cached_summaries:
+                self._memo.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """要約の再利用状況"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memo)}
     
     def summarize_text(self, text: str, max_length: int = 200) -> Optional[str]:
         """
         テキストを要約（LexRankを使用）
 
+        同じ本文（前後の空白を除いたSHA-256が同じもの）と文数の要約は
+        一度だけ計算し、以降は覚えておいた結果を返す。
+
         Args:
             text (str): 要約対象のテキスト
             max_length (int): 最大出力文字数（目安）
@@ -42,11 +95,16 @@ class MeduzaSummarizer:
             # 文数の目安として max_length を使う（おおよそ50文字1文で割る）
             sentence_count = max(1, max_length // 50)
 
-            parser = PlaintextParser.from_string(text, Tokenizer("japanese"))
-            summarizer = LexRankSummarizer()
-            summary = summarizer(parser.document, sentence_count)
+            key = (compute_content_hash(text), sentence_count)
+            cached = self._get_memo(key)
+            if cached is not None:
+                return cached
+
+            with STAGE_SECONDS.time(stage="summarize"):
+                summary = self.lexrank.summarize(text, sentence_count)
 
-            result = "\n".join(str(sentence) for sentence in summary)
+            result = "\n".join(summary)
+            self._put_memo(key, result)
             logger.info(f"要約完了（{sentence_count}文）")
             return result
 
@@ -81,6 +139,28 @@ class MeduzaSummarizer:
             return article
 
 
+_summarizers: Dict[str, MeduzaSummarizer] = {}
+_summarizers_lock = threading.Lock()
+
+
+def get_summarizer(language: str = "japanese") -> MeduzaSummarizer:
+    """
+    言語ごとのプロセス共有の要約器を取得
+
+    Args:
+        language (str): 要約するテキストの言語（ダイジェストモードでは原文の"russian"）
+
+    Returns:
+        MeduzaSummarizer: 要約器
+    """
+    with _summarizers_lock:
+        summarizer = _summarizers.get(language)
+        if summarizer is None:
+            summarizer = MeduzaSummarizer(language)
+            _summarizers[language] = summarizer
+        return summarizer
+
+
 def summarize_article(text: str, sentences_count: int = 3) -> str:
     """
     テキストを要約する便利関数
@@ -92,8 +172,7 @@ def summarize_article(text: str, sentences_count: int = 3) -> str:
     Returns:
         str: 要約されたテキスト
     """
-    summarizer = MeduzaSummarizer()
-    summary = summarizer.summarize_text(text, max_length=sentences_count * 50)
+    summary = get_summarizer().summarize_text(text, max_length=sentences_count * 50)
     return summary or "要約作成に失敗しました"
 
 
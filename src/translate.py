@@ -5,11 +5,15 @@
 ロシア語記事を日本語に翻訳する
 """
 
-from deep_translator import GoogleTranslator
-from typing import Optional, Dict
-from src.summarize import MeduzaSummarizer
+from typing import Optional, Dict, List
+from src.summarize import get_summarizer, DEFAULT_SUMMARY_LENGTH
+from src.translation_cache import TranslationMemory, get_translation_memory
+from src.chunking import pack_chunks, join_chunks
+from src.translation_backends import BatchSplitError, TranslationBackend, GoogleTranslateBackend
+from src.rate_limiter import AdaptiveRateLimiter, get_shared_limiter, get_request_slots, is_throttle_error
+from src.metrics import ARTICLES, CACHE_HITS, CACHE_MISSES, HTTP_ERRORS, STAGE_SECONDS, TRANSLATED_CHARACTERS
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import time
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
@@ -17,18 +21,126 @@ logger = logging.getLogger(__name__)
 
 
 class MeduzaTranslator:
-    """Google Translateを使用した翻訳クラス"""
+    """翻訳バックエンド（既定はGoogle Translate）を使用した翻訳クラス"""
     
-    def __init__(self):
-        self.translator = GoogleTranslator(source='ru', target='ja')
+    def __init__(
+        self,
+        backend: Optional[TranslationBackend] = None,
+        cache: Optional[TranslationMemory] = None,
+        use_cache: bool = True,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        max_retries: int = 2,
+        max_workers: int = 4
+    ):
+        """
+        Args:
+            backend (Optional[TranslationBackend]): 翻訳バックエンド（省略時はGoogle翻訳）
+            cache (Optional[TranslationMemory]): 使用する翻訳メモリ（省略時はプロセス共有のもの）
+            use_cache (bool): 翻訳メモリを使うかどうか
+            rate_limiter (Optional[AdaptiveRateLimiter]): レートリミッター（省略時はプロセス共有のもの）
+            max_retries (int): スロットリング時の再試行回数
+            max_workers (int): 1記事内のチャンク・フィールドを並列翻訳するスレッド数（1なら逐次）
+        """
+        self.backend = backend if backend is not None else GoogleTranslateBackend(source='ru', target='ja')
+        self.source_lang = self.backend.source
+        self.target_lang = self.backend.target
+        if use_cache:
+            self.cache = cache if cache is not None else get_translation_memory()
+        else:
+            self.cache = None
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_shared_limiter()
+        self.max_retries = max_retries
+        self.max_workers = max(1, max_workers)
+        # 同時リクエスト数の上限はプロセス全体で共有する
+        self.request_slots = get_request_slots()
+    
+    def _get_cached(self, text: str) -> Optional[str]:
+        """翻訳メモリから翻訳結果を取得"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self.source_lang, self.target_lang, text)
+        (CACHE_MISSES if cached is None else CACHE_HITS).inc(cache="translation")
+        return cached
+    
+    def _store_cached(self, text: str, translated: Optional[str]) -> None:
+        """翻訳結果を翻訳メモリに保存"""
+        if self.cache is not None and translated:
+            self.cache.put(self.source_lang, self.target_lang, text, translated)
+    
+    def _call_backend(self, text: str) -> Optional[str]:
+        """
+        レートリミッターを通して翻訳APIを呼び出す
+        
+        Args:
+            text (str): 翻訳対象のテキスト
+            
+        Returns:
+            Optional[str]: 翻訳済みテキスト
+        """
+        return self._with_limits(self.backend.translate, text)
     
-    def translate_text(self, text: str, delay: float = 0.5) -> Optional[str]:
+    def _with_limits(self, request, payload):
+        """
+        レート制限・同時リクエスト数制限のもとでバックエンドへのリクエストを1回実行
+        
+        成功・失敗をリミッターに伝えて速度を調整し、スロットリング時は再試行する
+        
+        Args:
+            request: バックエンドのメソッド（translate / translate_batch）
+            payload: メソッドに渡す引数
+            
+        Returns:
+            メソッドの戻り値
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                with self.request_slots:
+                    translated = request(payload)
+            except BatchSplitError:
+                # リクエスト自体は成功しているので、リミッターには成功として伝える
+                self.rate_limiter.on_success()
+                TRANSLATED_CHARACTERS.inc(self.backend.batch_size(payload))
+                raise
+            except Exception as e:
+                HTTP_ERRORS.inc(target="translate")
+                if is_throttle_error(e):
+                    self.rate_limiter.on_throttle()
+                    if attempt < self.max_retries:
+                        attempt += 1
+                        continue
+                else:
+                    self.rate_limiter.on_error()
+                raise
+            self.rate_limiter.on_success()
+            TRANSLATED_CHARACTERS.inc(len(payload) if isinstance(payload, str) else self.backend.batch_size(payload))
+            return translated
+    
+    def _translate_chunk(self, chunk: str) -> Optional[str]:
+        """
+        1チャンクを翻訳（翻訳メモリにあればAPIを呼ばない）
+        
+        Args:
+            chunk (str): 翻訳対象のチャンク
+            
+        Returns:
+            Optional[str]: 翻訳済みチャンク
+        """
+        cached = self._get_cached(chunk)
+        if cached is not None:
+            return cached
+        
+        translated_chunk = self._call_backend(chunk)
+        self._store_cached(chunk, translated_chunk)
+        return translated_chunk
+    
+    def translate_text(self, text: str) -> Optional[str]:
         """
         テキストを翻訳
         
         Args:
             text (str): 翻訳対象のテキスト
-            delay (float): API制限対策の遅延時間（秒）
             
         Returns:
             Optional[str]: 翻訳済みテキスト
@@ -37,17 +149,21 @@ class MeduzaTranslator:
             return ""
         
         try:
-            logger.info(f"翻訳中... (文字数: {len(text)})")
+            # 翻訳メモリにあれば待機せずに返す
+            cached = self._get_cached(text)
+            if cached is not None:
+                logger.info(f"翻訳メモリから取得 (文字数: {len(text)})")
+                return cached
             
-            # レート制限対策
-            time.sleep(delay)
+            logger.info(f"翻訳中... (文字数: {len(text)})")
             
-            # 翻訳実行（文字数制限: 5000文字）
-            if len(text) > 5000:
+            # 翻訳実行（文字数制限はバックエンドごと）
+            if len(text) > self.backend.max_chars:
                 # 長いテキストは分割して翻訳
                 return self.translate_long_text(text)
             
-            translated_text = self.translator.translate(text)
+            translated_text = self._call_backend(text)
+            self._store_cached(text, translated_text)
             logger.info(f"翻訳完了 (文字数: {len(translated_text)})")
             
             return translated_text
@@ -56,12 +172,80 @@ class MeduzaTranslator:
             logger.error(f"翻訳エラー: {e}")
             return None
     
-    def translate_article(self, article: Dict) -> Optional[Dict]:
+    def translate_batch(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        複数のテキストをまとめて翻訳
+        
+        翻訳メモリにないテキストだけを、バックエンドの文字数上限まで詰めて
+        1リクエストで送る。上限を超えるテキストは分割翻訳する。
+        バッチの結果を分けられなかったグループは、1件ずつレート制限を通して翻訳し直す。
+        
+        Args:
+            texts (List[str]): 翻訳対象のテキスト
+            
+        Returns:
+            List[Optional[str]]: textsと同じ順序の翻訳結果（失敗した要素はNone）
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = ""
+                continue
+            cached = self._get_cached(text)
+            if cached is not None:
+                results[i] = cached
+            elif len(text) > self.backend.max_chars:
+                results[i] = self.translate_long_text(text)
+            else:
+                pending.setdefault(text, []).append(i)
+        
+        # 上限文字数まで詰めたグループに分ける
+        groups: List[List[str]] = []
+        for text in pending:
+            if groups and self.backend.batch_size(groups[-1] + [text]) <= self.backend.max_chars:
+                groups[-1].append(text)
+            else:
+                groups.append([text])
+        
+        for group in groups:
+            logger.info(f"バッチ翻訳中... ({len(group)}件, 文字数: {self.backend.batch_size(group)})")
+            try:
+                translations = self._with_limits(self.backend.translate_batch, group)
+            except BatchSplitError as e:
+                logger.warning(f"{e}。1件ずつ翻訳します")
+                translations = [self._translate_single(text) for text in group]
+            except Exception as e:
+                logger.error(f"バッチ翻訳エラー: {e}")
+                continue
+            for text, translated in zip(group, translations):
+                self._store_cached(text, translated)
+                for i in pending[text]:
+                    results[i] = translated
+        
+        return results
+    
+    def _translate_single(self, text: str) -> Optional[str]:
+        """バッチから外したテキストを1件翻訳（失敗した場合はNone）"""
+        try:
+            return self._call_backend(text)
+        except Exception as e:
+            logger.error(f"翻訳エラー: {e}")
+            return None
+    
+    def translate_article(
+        self,
+        article: Dict,
+        summarize: bool = True
+    ) -> Optional[Dict]:
         """
         記事全体を翻訳
         
         Args:
             article (Dict): 記事データ
+            summarize (bool): 翻訳した本文の自動要約（summary_auto）も作成するかどうか。
+                取り込みパイプラインのように呼び出し側で要約する場合はFalseにする
             
         Returns:
             Optional[Dict]: 翻訳済み記事データ
@@ -69,30 +253,33 @@ class MeduzaTranslator:
         try:
             translated_article = article.copy()
             
-            # タイトルを翻訳
-            if article.get('title'):
-                translated_title = self.translate_text(article['title'])
-                if translated_title:
-                    translated_article['translated_title'] = translated_title
+            # タイトル・要約（1リクエストにまとめる）とコンテンツ（長い場合は分割）を並列に翻訳
+            with STAGE_SECONDS.time(stage="translate"), \
+                    ThreadPoolExecutor(max_workers=min(2, self.max_workers)) as executor:
+                content_future = executor.submit(self.translate_long_text, article.get('content') or "")
+                fields_future = executor.submit(
+                    self.translate_batch, [article.get('title') or "", article.get('summary') or ""]
+                )
+                translated_title, translated_summary = fields_future.result()
+                translated_content = content_future.result()
+            
+            if translated_title:
+                translated_article['translated_title'] = translated_title
             
-            # 要約を翻訳
-            if article.get('summary'):
-                translated_summary = self.translate_text(article['summary'])
-                if translated_summary:
-                    translated_article['summary_ja'] = translated_summary
+            if translated_summary:
+                translated_article['summary_ja'] = translated_summary
             
-            # コンテンツを翻訳（長い場合は分割）
             if article.get('content'):
-                translated_content = self.translate_long_text(article['content'])
                 if translated_content:
                     translated_article['translated_content'] = translated_content
                     
                     # 翻訳されたコンテンツの自動要約を生成
-                    summarizer = MeduzaSummarizer()
-                    summary = summarizer.summarize_text(translated_content)
-                    if summary:
-                        translated_article["summary_auto"] = summary
+                    if summarize:
+                        summary = get_summarizer().summarize_text(translated_content, DEFAULT_SUMMARY_LENGTH)
+                        if summary:
+                            translated_article["summary_auto"] = summary
             
+            ARTICLES.inc(stage="translated")
             logger.info("記事翻訳完了")
             return translated_article
             
@@ -100,49 +287,80 @@ class MeduzaTranslator:
             logger.error(f"記事翻訳エラー: {e}")
             return None
     
-    def translate_long_text(self, text: str, chunk_size: int = 4000) -> Optional[str]:
+    def translate_digest(self, article: Dict, source_summary: str) -> Optional[Dict]:
+        """
+        タイトルと原文の要約だけを翻訳（ダイジェストモード）
+
+        本文は翻訳しない（translated_contentは空のまま）。タイトルと要約は
+        1リクエストにまとめて送る。
+
+        Args:
+            article (Dict): 記事データ
+            source_summary (str): 原文（ロシア語）の本文から抽出した要約
+
+        Returns:
+            Optional[Dict]: 翻訳済み記事データ（要約は "summary" と "summary_auto" に入る）
         """
-        長いテキストを分割して翻訳
+        try:
+            translated_article = article.copy()
+            with STAGE_SECONDS.time(stage="translate"):
+                translated_title, translated_summary = self.translate_batch(
+                    [article.get('title') or "", source_summary or ""]
+                )
+
+            if translated_title:
+                translated_article['translated_title'] = translated_title
+
+            if translated_summary:
+                translated_article['summary'] = translated_summary
+                translated_article['summary_auto'] = translated_summary
+
+            ARTICLES.inc(stage="translated")
+            logger.info(f"ダイジェスト翻訳完了 (文字数: {len(article.get('title') or '') + len(source_summary or '')})")
+            return translated_article
+
+        except Exception as e:
+            logger.error(f"ダイジェスト翻訳エラー: {e}")
+            return None
+
+    def translate_long_text(self, text: str, chunk_size: Optional[int] = None) -> Optional[str]:
+        """
+        長いテキストを段落・文の境界で分割して翻訳
         
         Args:
             text (str): 翻訳対象のテキスト
-            chunk_size (int): 分割サイズ
+            chunk_size (Optional[int]): 1リクエストの最大文字数（省略時はバックエンドの上限）
             
         Returns:
-            Optional[str]: 翻訳済みテキスト
+            Optional[str]: 翻訳済みテキスト（段落の順序を維持）
         """
+        chunk_size = chunk_size or self.backend.max_chars
         if len(text) <= chunk_size:
             return self.translate_text(text)
         
         try:
-            # テキストを分割
-            chunks = [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-            translated_chunks = []
+            # 段落・文の境界で分割し、上限まで詰める
+            chunks = pack_chunks(text, chunk_size)
             
-            for i, chunk in enumerate(chunks, 1):
-                logger.info(f"チャンク {i}/{len(chunks)} を翻訳中...")
-                translated_chunk = self.translator.translate(chunk)
-                if translated_chunk:
-                    translated_chunks.append(translated_chunk)
-                time.sleep(0.5)  # レート制限対策
+            def translate_one(numbered_chunk):
+                i, chunk = numbered_chunk
+                logger.info(f"チャンク {i}/{len(chunks)} を翻訳中... (文字数: {len(chunk.text)})")
+                translated_chunk = self._translate_chunk(chunk.text)
+                if not translated_chunk:
+                    logger.warning(f"チャンク {i} の翻訳に失敗")
+                    translated_chunk = chunk.text  # 原文をそのまま使用
+                return translated_chunk
             
-            return '\n'.join(translated_chunks)
-            
-        except Exception as e:
-            logger.error(f"長文翻訳エラー: {e}")
-            return None
-            
-            for i, chunk in enumerate(chunks):
-                logger.info(f"チャンク {i+1}/{len(chunks)} を翻訳中...")
-                translated_chunk = self.translate_text(chunk, delay=2.0)
-                
-                if translated_chunk:
-                    translated_chunks.append(translated_chunk)
-                else:
-                    logger.warning(f"チャンク {i+1} の翻訳に失敗")
-                    translated_chunks.append(chunk)  # 原文をそのまま使用
+            # チャンクを並列に翻訳し、元の順序で受け取る
+            numbered_chunks = list(enumerate(chunks, 1))
+            if self.max_workers > 1 and len(chunks) > 1:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                    translated_chunks = list(executor.map(translate_one, numbered_chunks))
+            else:
+                translated_chunks = [translate_one(c) for c in numbered_chunks]
             
-            return ' '.join(translated_chunks)
+            # 日本語は文の間に空白を入れない
+            return join_chunks(chunks, translated_chunks, sentence_separator="")
             
         except Exception as e:
             logger.error(f"長文翻訳エラー: {e}")
@@ -0,0 +1,188 @@
+# translation_backends.py
+
+"""
+翻訳バックエンド
+MeduzaTranslatorから使う翻訳APIの共通インターフェースと実装
+"""
+
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List
+
+from src.chunking import MAX_CHUNK_CHARS
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BatchSplitError(Exception):
+    """バッチ翻訳の結果を元のテキストごとに分けられない（呼び出し元で1件ずつ翻訳し直す）"""
+
+
+class TranslationBackend(ABC):
+    """翻訳バックエンドの基底クラス"""
+
+    name = "base"
+    # 1リクエストで送れる最大文字数
+    max_chars = MAX_CHUNK_CHARS
+    # translate_batchで複数テキストを1リクエストに詰めるときの区切り文字列
+    batch_separator = "\n"
+
+    def __init__(self, source: str = "ru", target: str = "ja"):
+        self.source = source
+        self.target = target
+
+    @abstractmethod
+    def translate(self, text: str) -> str:
+        """
+        テキストを1件翻訳
+
+        Args:
+            text (str): 翻訳対象のテキスト（max_chars以下）
+
+        Returns:
+            str: 翻訳済みテキスト
+        """
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        複数のテキストを翻訳（既定では1件ずつ翻訳する）
+
+        Args:
+            texts (List[str]): 翻訳対象のテキスト
+
+        Returns:
+            List[str]: textsと同じ順序の翻訳結果
+        """
+        return [self.translate(text) for text in texts]
+
+    def batch_size(self, texts: List[str]) -> int:
+        """textsを1リクエストに詰めたときの文字数"""
+        return sum(len(t) for t in texts) + len(self.batch_separator) * max(0, len(texts) - 1)
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """
+    deep-translator経由のGoogle翻訳
+
+    translate_batchは区切り文字列で連結して1リクエストで翻訳し、結果を分割する。
+    区切りが崩れて件数が合わない場合はBatchSplitErrorを送出し、1件ずつの翻訳し直しは
+    呼び出し元に任せる（1リクエストごとにレート制限を通すため）。
+    """
+
+    name = "google"
+    batch_separator = "\n∎∎∎\n"
+    _separator_pattern = re.compile(r'\s*∎\s*∎\s*∎\s*')
+
+    def __init__(self, source: str = "ru", target: str = "ja"):
+        super().__init__(source, target)
+        from deep_translator import GoogleTranslator
+        self.translator = GoogleTranslator(source=source, target=target)
+
+    def translate(self, text: str) -> str:
+        return self.translator.translate(text)
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [self.translate(texts[0])]
+
+        translated = self.translate(self.batch_separator.join(texts)) or ""
+        parts = self._separator_pattern.split(translated.strip())
+        if len(parts) != len(texts):
+            raise BatchSplitError(f"バッチ翻訳の区切りが一致しません（{len(parts)}/{len(texts)}）")
+        return [part.strip() for part in parts]
+
+
+class StubBackendError(Exception):
+    """スタブバックエンドが意図的に発生させるエラー"""
+
+
+class StubBackend(TranslationBackend):
+    """
+    オフライン計測用の決定的なスタブ
+
+    ネットワークを使わず、原文に言語タグを付けた文字列を返す。
+    遅延・エラー率・スロットリング率を設定でき、乱数はシードで固定する。
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        source: str = "ru",
+        target: str = "ja",
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            source (str): 翻訳元言語
+            target (str): 翻訳先言語
+            latency (float): 1リクエストあたりの遅延（秒）
+            error_rate (float): エラーを発生させる確率
+            throttle_rate (float): 429エラーを発生させる確率
+            seed (int): 乱数シード
+        """
+        super().__init__(source, target)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.characters = 0
+
+    def _request(self, size: int) -> None:
+        """1リクエスト分の遅延・エラーを再現"""
+        with self._lock:
+            self.requests += 1
+            self.characters += size
+            roll = self._random.random()
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.throttle_rate:
+            raise StubBackendError("429 Too Many Requests (stub)")
+        if roll < self.throttle_rate + self.error_rate:
+            raise StubBackendError("stub backend error")
+
+    def _render(self, text: str) -> str:
+        digest = hashlib.md5(text.encode("utf-8")).hexdigest()[:6]
+        return f"[{self.target}:{digest}] {text}"
+
+    def translate(self, text: str) -> str:
+        self._request(len(text))
+        return self._render(text)
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        self._request(self.batch_size(texts))
+        return [self._render(text) for text in texts]
+
+
+def get_backend(name: str = "google", **kwargs) -> TranslationBackend:
+    """
+    名前から翻訳バックエンドを作成
+
+    Args:
+        name (str): "google" または "stub"
+        **kwargs: バックエンドのコンストラクタ引数
+
+    Returns:
+        TranslationBackend: 翻訳バックエンド
+    """
+    backends = {
+        GoogleTranslateBackend.name: GoogleTranslateBackend,
+        StubBackend.name: StubBackend,
+    }
+    if name not in backends:
+        raise ValueError(f"未対応の翻訳バックエンドです: {name}")
+    return backends[name](**kwargs)
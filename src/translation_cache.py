@@ -0,0 +1,256 @@
+# translation_cache.py
+
+"""
+翻訳メモリ（翻訳結果キャッシュ）
+同じ文章を何度も翻訳APIに送らないよう、セグメント単位で翻訳結果を保存する
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.repository import DB_PATH, data_path
+
+# ログ設定
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+
+def translation_cache_path(db_path: str = DB_PATH) -> str:
+    """翻訳メモリのDBのパス（記事DBと同じディレクトリ）"""
+    return data_path("translation_cache.db", db_path)
+
+
+# 既定の翻訳メモリのパス（MEDUZA_DB_PATHに従う）
+TRANSLATION_CACHE_PATH = translation_cache_path()
+
+# 最終使用時刻の更新をまとめて書き込む件数（読み込みのたびにコミットしない）
+TOUCH_FLUSH_THRESHOLD = 256
+
+
+def normalize_segment(text: str) -> str:
+    """
+    キャッシュキー用にテキストを正規化
+
+    Unicode正規化（NFC）、行内の連続空白の圧縮、前後の空白除去を行う。
+    段落構造を保つため改行は残す。
+
+    Args:
+        text (str): 正規化対象のテキスト
+
+    Returns:
+        str: 正規化済みテキスト
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    lines = [re.sub(r'[ \t\u00a0]+', ' ', line).strip() for line in text.splitlines()]
+    return "\n".join(lines).strip()
+
+
+class TranslationMemory:
+    """
+    SQLiteに保存する翻訳メモリ
+
+    (翻訳元言語, 翻訳先言語, 正規化テキストのハッシュ) をキーとし、
+    プロセス内のLRUキャッシュを前段に置く。ディスク上の合計サイズが
+    上限を超えると、最後に使われた時刻が古いものから削除する。
+    最後に使われた時刻はLRUでのヒットも含めてメモリに溜め、保存・削除の前や
+    一定件数ごとにまとめて書き込む。
+    """
+
+    def __init__(
+        self,
+        db_path: str = TRANSLATION_CACHE_PATH,
+        max_memory_entries: int = 2048,
+        max_disk_bytes: int = 64 * 1024 * 1024
+    ):
+        """
+        Args:
+            db_path (str): キャッシュDBのパス（":memory:" も可）
+            max_memory_entries (int): プロセス内LRUの最大件数
+            max_disk_bytes (int): ディスクに保存する翻訳結果の合計サイズ上限（バイト）
+        """
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        # まだディスクに書き込んでいない最終使用時刻
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS translations (
+            key TEXT PRIMARY KEY,
+            source_lang TEXT,
+            target_lang TEXT,
+            translated TEXT,
+            size INTEGER,
+            last_used REAL
+        )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        self._conn.commit()
+        self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+
+    @staticmethod
+    def make_key(source_lang: str, target_lang: str, text: str) -> str:
+        """キャッシュキーを作成"""
+        digest = hashlib.sha256(normalize_segment(text).encode("utf-8")).hexdigest()
+        return f"{source_lang}:{target_lang}:{digest}"
+
+    def get(self, source_lang: str, target_lang: str, text: str) -> Optional[str]:
+        """
+        翻訳結果をキャッシュから取得
+
+        Args:
+            source_lang (str): 翻訳元言語
+            target_lang (str): 翻訳先言語
+            text (str): 原文
+
+        Returns:
+            Optional[str]: キャッシュ済みの翻訳（なければNone）
+        """
+        key = self.make_key(source_lang, target_lang, text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                self.hits += 1
+                return self._memory[key]
+
+            row = self._conn.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._touch(key)
+            self._remember(key, row[0])
+            self.hits += 1
+            return row[0]
+
+    def put(self, source_lang: str, target_lang: str, text: str, translated: str) -> None:
+        """
+        翻訳結果をキャッシュに保存
+
+        Args:
+            source_lang (str): 翻訳元言語
+            target_lang (str): 翻訳先言語
+            text (str): 原文
+            translated (str): 翻訳結果
+        """
+        if not translated:
+            return
+
+        key = self.make_key(source_lang, target_lang, text)
+        size = len(translated.encode("utf-8"))
+        with self._lock:
+            self._touched.pop(key, None)
+            self._flush_touched()
+            old = self._conn.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, source_lang, target_lang, translated, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source_lang, target_lang, translated, size, time.time())
+            )
+            self._disk_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+            self._remember(key, translated)
+
+    def _touch(self, key: str) -> None:
+        """最終使用時刻の更新を溜め、一定件数に達したら書き込む（ロック取得済みで呼ぶ）"""
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_FLUSH_THRESHOLD:
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """溜めた最終使用時刻をまとめて書き込む（コミットは呼び出し元で行う。ロック取得済みで呼ぶ）"""
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE translations SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def _remember(self, key: str, translated: str) -> None:
+        """プロセス内LRUに追加（ロック取得済みで呼ぶ）"""
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """ディスク上の合計サイズが上限を超えたら古いものから削除（ロック取得済みで呼ぶ）"""
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+
+        # 最近使われたものを残すため、溜めた最終使用時刻を先に書き込む
+        self._flush_touched()
+        # 上限の9割まで減らして、削除が頻発しないようにする
+        target = int(self.max_disk_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM translations ORDER BY last_used").fetchall()
+        removed = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            removed.append((key,))
+            self._disk_bytes -= size
+            self._memory.pop(key, None)
+
+        self._conn.executemany("DELETE FROM translations WHERE key = ?", removed)
+        self.evictions += len(removed)
+        logger.info(f"翻訳キャッシュを整理しました（削除: {len(removed)}件）")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            Dict[str, int]: ヒット数・ミス数・件数・サイズなど
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def close(self) -> None:
+        """溜めた最終使用時刻を書き込んでDB接続を閉じる"""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+_default_memories: Dict[str, TranslationMemory] = {}
+_default_memories_lock = threading.Lock()
+
+
+def get_translation_memory(db_path: str = TRANSLATION_CACHE_PATH) -> TranslationMemory:
+    """プロセス共有の翻訳メモリを取得"""
+    with _default_memories_lock:
+        memory = _default_memories.get(db_path)
+        if memory is None:
+            memory = _default_memories[db_path] = TranslationMemory(db_path)
+        return memory
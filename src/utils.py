@@ -5,8 +5,10 @@
 
 import os
 import json
+import hashlib
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Any
 import re
 
@@ -134,6 +136,54 @@ def format_timestamp(timestamp: str = None) -> str:
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
 
+def parse_published_timestamp(published: Optional[str]) -> Optional[int]:
+    """
+    RSSの公開日時をUTCのUNIX時刻（秒）に変換
+    
+    RFC 822形式（例: "Sat, 19 Jul 2025 16:00:00 +0300"）とISO 8601形式に対応。
+    タイムゾーンがない場合はUTCとみなす。
+    
+    Args:
+        published (Optional[str]): 公開日時の文字列
+        
+    Returns:
+        Optional[int]: UNIX時刻（解析できない場合はNone）
+    """
+    if not published or not isinstance(published, str):
+        return None
+    
+    value = published.strip()
+    dt = None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt is None:
+        return None
+    
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def compute_content_hash(text: Optional[str]) -> Optional[str]:
+    """
+    本文のハッシュ値を計算（前後の空白は無視）
+    
+    Args:
+        text (Optional[str]): 本文
+        
+    Returns:
+        Optional[str]: SHA-256の16進文字列（本文が空の場合はNone）
+    """
+    if not text or not text.strip():
+        return None
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+
 def create_safe_filename(text: str, max_length: int = 100) -> str:
     """
     安全なファイル名を作成
@@ -0,0 +1,65 @@
+"""
+chunking.py の単体テスト
+"""
+
+import unittest
+
+from src.chunking import split_sentences, pack_chunks, join_chunks
+
+
+class TestSplitSentences(unittest.TestCase):
+    """文分割のテスト"""
+
+    def test_basic_russian_sentences(self):
+        """終止符・感嘆符・疑問符で分割する"""
+        text = "Путин провел встречу. Что обсуждали? Пока неизвестно! «Мы договорились», — сказал он."
+        self.assertEqual(split_sentences(text), [
+            "Путин провел встречу.",
+            "Что обсуждали?",
+            "Пока неизвестно!",
+            "«Мы договорились», — сказал он.",
+        ])
+
+    def test_initials_and_abbreviations(self):
+        """イニシャルや略語では分割しない"""
+        text = "Об этом сообщил В. Путин в 2024 г. Москва ответила. Цена — 5 тыс. Рублей нет."
+        self.assertEqual(split_sentences(text), [
+            "Об этом сообщил В. Путин в 2024 г. Москва ответила.",
+            "Цена — 5 тыс. Рублей нет.",
+        ])
+
+
+class TestPackChunks(unittest.TestCase):
+    """チャンク詰め込みのテスト"""
+
+    def test_short_paragraphs_are_packed_together(self):
+        """上限内の段落は1チャンクにまとめる"""
+        text = "Первый абзац.\nВторой абзац.\n\nТретий абзац."
+        chunks = pack_chunks(text, max_chars=100)
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].text, "Первый абзац.\nВторой абзац.\nТретий абзац.")
+
+    def test_chunks_respect_limit_and_boundaries(self):
+        """上限を守り、単語の途中で切らない"""
+        paragraph = " ".join(f"Предложение номер {i} заканчивается здесь." for i in range(40))
+        text = f"{paragraph}\nКороткий абзац."
+        chunks = pack_chunks(text, max_chars=300)
+
+        self.assertTrue(all(len(c.text) <= 300 for c in chunks))
+        self.assertTrue(all(c.text.endswith(".") for c in chunks))
+        self.assertTrue(chunks[0].starts_paragraph)
+        self.assertFalse(chunks[1].starts_paragraph)
+
+        # 連結すると元のテキストに戻る
+        self.assertEqual(join_chunks(chunks, [c.text for c in chunks]), text)
+
+    def test_oversized_sentence_is_split_on_words(self):
+        """上限を超える1文は単語境界で分割する"""
+        sentence = " ".join(["слово"] * 100)
+        chunks = pack_chunks(sentence, max_chars=50)
+        self.assertTrue(all(len(c.text) <= 50 for c in chunks))
+        self.assertEqual(join_chunks(chunks, [c.text for c in chunks]), sentence)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,324 @@
+"""
+database.py の単体テスト
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import os
+from unittest.mock import patch
+
+from src.database import (
+    init_db, save_article_to_db, get_existing_article_keys,
+    rebuild_fts_index, build_fts_query
+)
+from src.utils import parse_published_timestamp
+from src.repository import get_connection
+from src.database import save_articles_bulk, get_db_generation, list_translated_articles, get_article_contents
+from src.database import get_untranslated_content, save_translated_content
+
+
+class TestArticleKeys(unittest.TestCase):
+    """記事キーによる重複防止のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def _count(self):
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_duplicate_key_is_ignored(self):
+        """同じ記事キーの記事は1件しか保存されない"""
+        article = {'title': 'Новости', 'article_key': 'https://meduza.io/news/1'}
+        save_article_to_db(article, db_path=self.db_path)
+        save_article_to_db(article, db_path=self.db_path)
+        self.assertEqual(self._count(), 1)
+
+    def test_get_existing_article_keys(self):
+        """保存済みのキーだけが返される"""
+        save_article_to_db({'title': 'A', 'article_key': 'key-a'}, db_path=self.db_path)
+        result = get_existing_article_keys(['key-a', 'key-b', ''], db_path=self.db_path)
+        self.assertEqual(result, {'key-a'})
+
+    def test_init_db_upgrades_existing_table(self):
+        """article_keyカラムがない既存DBにもカラムが追加される"""
+        legacy_path = os.path.join(self.tmpdir.name, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, "
+                     "translated_title TEXT, translated_content TEXT, summary TEXT, published TEXT)")
+        conn.commit()
+        conn.close()
+
+        init_db(legacy_path)
+        save_article_to_db({'title': 'A', 'article_key': 'key-a'}, db_path=legacy_path)
+        self.assertEqual(get_existing_article_keys(['key-a'], db_path=legacy_path), {'key-a'})
+
+
+
+class TestRepository(unittest.TestCase):
+    """接続管理と一括保存のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def test_connection_is_reused_with_wal(self):
+        """同じスレッドでは接続を再利用し、WALモードになっている"""
+        conn = get_connection(self.db_path)
+        self.assertIs(conn, get_connection(self.db_path))
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_save_articles_bulk(self):
+        """一括保存は重複キーを除いた件数を返す"""
+        save_article_to_db({'title': 'A', 'article_key': 'a'}, db_path=self.db_path)
+        articles = [{'title': t, 'article_key': t.lower()} for t in ('A', 'B', 'C')]
+
+        self.assertEqual(save_articles_bulk(articles, db_path=self.db_path), 2)
+        count = get_connection(self.db_path).execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        self.assertEqual(count, 3)
+
+    def test_generation_advances_only_on_new_articles(self):
+        """世代番号は新しい記事が保存されたときだけ進む"""
+        generation = get_db_generation(self.db_path)
+        save_articles_bulk([{'title': 'A', 'article_key': 'a'}], db_path=self.db_path)
+        self.assertEqual(get_db_generation(self.db_path), generation + 1)
+
+        # 重複のみなら変わらない
+        save_articles_bulk([{'title': 'A', 'article_key': 'a'}], db_path=self.db_path)
+        save_article_to_db({'title': 'A', 'article_key': 'a'}, db_path=self.db_path)
+        self.assertEqual(get_db_generation(self.db_path), generation + 1)
+
+        self.assertEqual(get_db_generation(os.path.join(self.tmpdir.name, "missing.db")), 0)
+
+
+class TestPublishedTimestamp(unittest.TestCase):
+    """公開日時の正規化のテスト"""
+
+    def test_parse_published_timestamp(self):
+        """RFC 822とISO 8601をUTCのUNIX時刻に変換する"""
+        expected = 1752930000  # 2025-07-19 13:00:00 UTC
+        self.assertEqual(parse_published_timestamp("Sat, 19 Jul 2025 16:00:00 +0300"), expected)
+        self.assertEqual(parse_published_timestamp("2025-07-19T16:00:00+03:00"), expected)
+        self.assertEqual(parse_published_timestamp("2025-07-19T13:00:00Z"), expected)
+        self.assertIsNone(parse_published_timestamp("昨日"))
+        self.assertIsNone(parse_published_timestamp(""))
+
+    def test_init_db_backfills_existing_rows(self):
+        """既存記事のpublished_atが埋められ、新しい順に並ぶ"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "articles.db")
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, "
+                         "translated_title TEXT, translated_content TEXT, summary TEXT, published TEXT)")
+            conn.executemany("INSERT INTO articles (title, published) VALUES (?, ?)", [
+                ("old", "Fri, 18 Jul 2025 23:00:00 +0300"),
+                ("new", "Sat, 19 Jul 2025 09:00:00 +0300"),
+                ("broken", "unknown"),
+            ])
+            conn.commit()
+            conn.close()
+
+            init_db(db_path)
+
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute(
+                "SELECT title FROM articles WHERE published_at IS NOT NULL ORDER BY published_at DESC, id DESC"
+            ).fetchall()
+            conn.close()
+            self.assertEqual([r[0] for r in rows], ["new", "old"])
+
+
+class TestFullTextSearch(unittest.TestCase):
+    """FTS5全文検索のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def _search(self, query):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT a.article_key FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+            "WHERE articles_fts MATCH ? ORDER BY bm25(articles_fts)",
+            (build_fts_query(query),)
+        ).fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+    def test_build_fts_query(self):
+        """各語をフレーズとして引用し、短い語はLIKEに回す"""
+        self.assertEqual(build_fts_query('ウクライナ "停戦"'), '"ウクライナ" AND """停戦"""')
+        self.assertIsNone(build_fts_query("ロシ ア"))
+
+    def test_triggers_keep_index_in_sync(self):
+        """挿入・更新・削除がインデックスに反映される"""
+        save_article_to_db({
+            'article_key': 'a', 'title': 'Переговоры в Стамбуле',
+            'translated_title': 'イスタンブールでの交渉', 'translated_content': '停戦について話し合った。'
+        }, db_path=self.db_path)
+
+        self.assertEqual(self._search("イスタンブール"), ['a'])
+        self.assertEqual(self._search("Стамбул"), ['a'])
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE articles SET translated_title = 'モスクワでの会談' WHERE article_key = 'a'")
+        conn.commit()
+        self.assertEqual(self._search("イスタンブール"), [])
+        self.assertEqual(self._search("モスクワ"), ['a'])
+
+        conn.execute("DELETE FROM articles")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self._search("モスクワ"), [])
+
+    def test_lazy_content_translation(self):
+        """ダイジェストモードの記事は後から本文の翻訳を保存でき、検索にも反映される"""
+        save_article_to_db({
+            'article_key': 'd', 'title': 'Сводка', 'translated_title': '概要',
+            'content': 'Полный текст'
+        }, db_path=self.db_path)
+        self.assertEqual(get_untranslated_content(1, self.db_path), 'Полный текст')
+
+        generation = get_db_generation(self.db_path)
+        self.assertTrue(save_translated_content(1, '全文の翻訳テキスト', self.db_path))
+        self.assertGreater(get_db_generation(self.db_path), generation)
+        self.assertEqual(self._search("全文の翻訳"), ['d'])
+
+        # 翻訳済みの本文は上書きしない
+        self.assertIsNone(get_untranslated_content(1, self.db_path))
+        self.assertFalse(save_translated_content(1, '別の翻訳', self.db_path))
+
+    def test_rebuild_backfills_existing_rows(self):
+        """インデックス作成前の記事を再構築で登録できる"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE articles_fts")
+        conn.execute("DROP TRIGGER articles_fts_insert")
+        conn.execute("INSERT INTO articles (article_key, translated_title) VALUES ('old', '古い記事の見出し')")
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(rebuild_fts_index(self.db_path), 1)
+        self.assertEqual(self._search("古い記事"), ['old'])
+
+
+class TestUpgradedDatabase(unittest.TestCase):
+    """全文検索インデックスより前に作られたDBを最新化したときのテスト"""
+
+    def setUp(self):
+        """テスト前の準備（記事が入った旧スキーマのDBを最新化する）"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, "
+                     "translated_title TEXT, translated_content TEXT, summary TEXT, published TEXT)")
+        conn.execute("INSERT INTO articles (title, content, translated_title) "
+                     "VALUES ('Переговоры в Стамбуле', 'Полный текст', 'イスタンブールでの交渉')")
+        conn.commit()
+        conn.close()
+        init_db(self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def _search(self, query):
+        rows = get_connection(self.db_path).execute(
+            "SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?", (build_fts_query(query),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def test_existing_rows_are_indexed(self):
+        """既存の記事も検索でき、更新してもインデックスが壊れない"""
+        self.assertEqual(self._search("イスタンブール"), [1])
+
+        conn = get_connection(self.db_path)
+        conn.execute("UPDATE articles SET translated_title = 'モスクワでの会談' WHERE id = 1")
+        conn.commit()
+        self.assertEqual(self._search("イスタンブール"), [])
+        self.assertEqual(self._search("モスクワ"), [1])
+
+    def test_save_translated_content(self):
+        """旧スキーマから最新化したDBでも後から翻訳した本文を保存し、検索できる"""
+        self.assertEqual(get_untranslated_content(1, self.db_path), 'Полный текст')
+        self.assertTrue(save_translated_content(1, '交渉の全文の翻訳', self.db_path))
+        self.assertEqual(self._search("全文の翻訳"), [1])
+        self.assertEqual(self._search("イスタンブール"), [1])
+
+    def test_backfills_run_once(self):
+        """バックフィルの完了後はinit_dbのたびに記事を走査しない"""
+        with patch("src.database.run_backfills") as run_backfills:
+            init_db(self.db_path)
+        run_backfills.assert_not_called()
+
+
+class TestPagination(unittest.TestCase):
+    """記事一覧のページングのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+        # 同じ公開日時の記事と公開日時のない記事を含める
+        published = ["2025-07-19T10:00:00+00:00"] * 3 + ["2025-07-18T10:00:00+00:00"] * 2 + [None] * 2
+        save_articles_bulk([
+            {'article_key': f'k{i}', 'translated_title': f'記事{i}', 'translated_content': f'今日の本文{i}', 'published': p}
+            for i, p in enumerate(published)
+        ], db_path=self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def _all_pages(self, limit, **kwargs):
+        titles, cursor = [], None
+        while True:
+            rows, cursor = list_translated_articles(limit=limit, cursor=cursor, db_path=self.db_path, **kwargs)
+            titles.extend(row[1] for row in rows)
+            if cursor is None:
+                return titles
+
+    def test_keyset_pages_cover_all_articles_in_order(self):
+        """どのページサイズでも全記事を新しい順に重複なく取得できる"""
+        expected = ['記事2', '記事1', '記事0', '記事4', '記事3', '記事6', '記事5']
+        for limit in (1, 2, 3, 7, 10):
+            self.assertEqual(self._all_pages(limit), expected)
+
+    def test_list_excludes_content(self):
+        """一覧には本文を含めず、本文は必要な記事の分だけ取得する"""
+        rows, _ = list_translated_articles(limit=2, db_path=self.db_path)
+        self.assertNotIn('今日の本文2', rows[0])
+        self.assertEqual(get_article_contents([rows[0][0]], db_path=self.db_path), {rows[0][0]: '今日の本文2'})
+
+    def test_search_pages(self):
+        """検索結果（全文検索・LIKE検索）もページングできる"""
+        expected = sorted(f'記事{i}' for i in range(7))
+        self.assertEqual(sorted(self._all_pages(2, search_query="今日の本文")), expected)
+        self.assertEqual(sorted(self._all_pages(2, search_query="記事")), expected)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
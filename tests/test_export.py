@@ -0,0 +1,137 @@
+"""
+export.py の単体テスト
+"""
+
+import unittest
+import csv
+import json
+import tempfile
+import os
+import time
+
+from src.database import init_db, save_articles_bulk
+from src.export import (
+    EXPORT_COLUMNS, EXPORT_TMP_SUFFIX, export_articles, export_dir, export_filename, iter_article_batches,
+    iter_dict_batches, prune_exports, write_export
+)
+
+
+class TestExport(unittest.TestCase):
+    """エクスポートのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+        save_articles_bulk([
+            {
+                'article_key': f'k{i}',
+                'title': f'Статья {i}',
+                'translated_title': f'記事{i}',
+                'translated_content': '停戦交渉について' if i % 3 == 0 else '天気',
+                'published': f'2025-07-{10 + i:02d}T10:00:00+00:00'
+            }
+            for i in range(7)
+        ], db_path=self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_batches_cover_archive(self):
+        """バッチサイズに関係なく全記事をID順に1回ずつ読み出す"""
+        batches = list(iter_article_batches(db_path=self.db_path, batch_size=3))
+        self.assertEqual([len(b) for b in batches], [3, 3, 1])
+        self.assertEqual([row[0] for b in batches for row in b], list(range(1, 8)))
+
+    def test_filters(self):
+        """検索キーワードと日付で絞り込める"""
+        rows = [r for b in iter_article_batches("停戦交渉", db_path=self.db_path, batch_size=2) for r in b]
+        self.assertEqual([r[EXPORT_COLUMNS.index('article_key')] for r in rows], ['k0', 'k3', 'k6'])
+
+        since = rows[1][EXPORT_COLUMNS.index('published_at')]
+        rows = [r for b in iter_article_batches(since=since, db_path=self.db_path) for r in b]
+        self.assertEqual(len(rows), 4)
+
+    def test_csv_and_jsonl(self):
+        """CSVとJSON Linesに全カラムを書き出す"""
+        self.assertEqual(export_articles(self._path("a.csv"), "csv", db_path=self.db_path, batch_size=2), 7)
+        with open(self._path("a.csv"), encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0]['translated_title'], '記事0')
+
+        self.assertEqual(export_articles(self._path("a.jsonl"), "jsonl", db_path=self.db_path), 7)
+        with open(self._path("a.jsonl"), encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[6]['title'], 'Статья 6')
+        self.assertIsInstance(records[6]['published_at'], int)
+
+    def test_parquet(self):
+        """Parquetはバッチごとに行グループとして書き出す"""
+        import pyarrow.parquet as pq
+
+        self.assertEqual(export_articles(self._path("a.parquet"), "parquet", db_path=self.db_path, batch_size=3), 7)
+        parquet_file = pq.ParquetFile(self._path("a.parquet"))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        table = parquet_file.read()
+        self.assertEqual(table.column_names, list(EXPORT_COLUMNS))
+        self.assertEqual(table.column('translated_title').to_pylist()[0], '記事0')
+
+    def test_dict_articles(self):
+        """セッション上の記事（辞書）も同じ形式で書き出せる"""
+        articles = [{'title': 'A', 'translated_title': 'エー'}, {'title': 'B'}]
+        self.assertEqual(write_export(iter_dict_batches(articles, batch_size=1), self._path("s.jsonl"), "jsonl"), 2)
+
+    def test_prune_keeps_latest_exports(self):
+        """新しいエクスポートだけを残し、エクスポート以外のファイルは削除しない"""
+        directory = self._path("exports")
+        now = time.time()
+        names = []
+        for i in range(4):
+            names.append(export_filename("csv", f"2025071{i}")[0])
+            path = os.path.join(directory, names[-1])
+            export_articles(path, "csv", db_path=self.db_path)
+            os.utime(path, (now + i, now + i))
+        write_export(iter_dict_batches([]), os.path.join(directory, "notes.csv"), "csv")
+        # 書き込み中の一時ファイルは削除しない
+        in_progress = names[0] + ".1-1" + EXPORT_TMP_SUFFIX
+        open(os.path.join(directory, in_progress), "w").close()
+
+        self.assertEqual(prune_exports(directory, keep=2), 2)
+        self.assertEqual(sorted(os.listdir(directory)), sorted([names[2], names[3], in_progress, "notes.csv"]))
+        self.assertEqual(prune_exports(self._path("missing")), 0)
+
+    def test_export_filenames_are_unique(self):
+        """同じ時刻のエクスポートでもファイル名が重ならない"""
+        names = {export_filename("csv", "20250719_160000")[0] for _ in range(3)}
+        self.assertEqual(len(names), 3)
+
+    def test_failed_export_leaves_no_file(self):
+        """書き込みに失敗したら出力ファイルも一時ファイルも残さない"""
+        def batches():
+            yield [(1,) * len(EXPORT_COLUMNS)]
+            raise RuntimeError("読み出しエラー")
+
+        directory = self._path("exports")
+        with self.assertRaises(RuntimeError):
+            write_export(batches(), os.path.join(directory, "a.csv"), "csv")
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_export_dir_follows_db_path(self):
+        """エクスポートはDBと同じディレクトリに保存する"""
+        self.assertEqual(export_dir(os.path.join("var", "meduza", "articles.db")),
+                         os.path.join("var", "meduza", "exports"))
+
+    def test_unknown_format(self):
+        """未対応の形式はエラー"""
+        with self.assertRaises(ValueError):
+            export_articles(self._path("a.xml"), "xml", db_path=self.db_path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+"""
+extract.py の単体テスト
+"""
+
+import unittest
+import glob
+import os
+
+from src.extract import extract_article_text, extract_blocks, parse_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "meduza")
+
+
+def load_fixture(name):
+    """保存済みの記事ページ（HTML）と期待する本文を読み込む"""
+    with open(os.path.join(FIXTURES_DIR, name + ".html"), "rb") as f:
+        page = f.read()
+    with open(os.path.join(FIXTURES_DIR, name + ".txt"), encoding="utf-8") as f:
+        expected = f.read().rstrip("\n")
+    return page, expected
+
+
+class TestExtract(unittest.TestCase):
+    """本文抽出のテスト"""
+
+    def test_fixture_corpus(self):
+        """保存済みの記事ページから期待どおりの本文を抽出する"""
+        names = sorted(os.path.basename(p)[:-5] for p in glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+        self.assertTrue(names)
+        for name in names:
+            with self.subTest(page=name):
+                page, expected = load_fixture(name)
+                self.assertEqual(extract_article_text(page), expected)
+
+    def test_nested_elements_are_not_repeated(self):
+        """入れ子のdiv・spanの中の文章は1回だけ出力する"""
+        page, _ = load_fixture("longread")
+        text = extract_article_text(page)
+        self.assertEqual(text.count("Военные расходы выросли"), 1)
+        # リードの再掲は1つにまとめる
+        self.assertEqual(text.count("Российская экономика третий год"), 1)
+
+    def test_skips_scripts_and_buttons(self):
+        """スクリプト・ボタンなど本文ではない要素を除き、その後ろのテキストは残す"""
+        document = parse_html(
+            "<div><p>Текст<script>var a = 1;</script> дальше</p>"
+            "<!-- banner -->Хвост<button>Поделиться</button> после</div>"
+        )
+        self.assertEqual(extract_blocks(document.find(".//div")), ["Текст дальше", "Хвост после"])
+
+    def test_encoding_from_meta(self):
+        """バイト列はmetaタグの文字コードで解釈する"""
+        page, _ = load_fixture("fallback_cp1251")
+        self.assertIn("Последний абзац статьи.", extract_article_text(page))
+
+    def test_empty_page(self):
+        """空のページや本文のないページはNone"""
+        self.assertIsNone(extract_article_text(b""))
+        self.assertIsNone(extract_article_text("<html><body><div>меню</div></body></html>"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
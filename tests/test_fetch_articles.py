@@ -6,11 +6,15 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import tempfile
 
 # srcディレクトリをパスに追加
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from fetch_articles import MeduzaFetcher
+from fetch_articles import (
+    MeduzaFetcher, fetch_meduza_articles, feed_state_path, make_article_key, clean_feed_content,
+    is_complete_feed_content
+)
 
 
 class TestMeduzaFetcher(unittest.TestCase):
@@ -61,11 +65,168 @@ class TestMeduzaFetcher(unittest.TestCase):
         # 検証
         self.assertIsNone(result)
     
+    @patch('fetch_articles.feedparser.parse')
+    def test_fetch_rss_feed_not_modified(self, mock_parse):
+        """304応答時はパースせず空リストを返し、保存済みバリデータを送るテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_path = os.path.join(tmpdir, "feed_state.json")
+            fetcher = MeduzaFetcher(state_path=state_path)
+
+            # 初回: 200応答でバリデータを保存
+            first_feed = MagicMock()
+            first_feed.status = 200
+            first_feed.entries = []
+            first_feed.get.side_effect = {'etag': '"abc"', 'modified': 'Sat, 19 Jul 2025 13:00:00 GMT'}.get
+            mock_parse.return_value = first_feed
+            self.assertEqual(fetcher.fetch_rss_feed(), [])
+            fetcher.save_feed_state()
+
+            # 2回目: 304応答
+            second_feed = MagicMock()
+            second_feed.status = 304
+            mock_parse.return_value = second_feed
+            result = fetcher.fetch_rss_feed()
+
+            self.assertEqual(result, [])
+            _, kwargs = mock_parse.call_args
+            self.assertEqual(kwargs['etag'], '"abc"')
+            self.assertEqual(kwargs['modified'], 'Sat, 19 Jul 2025 13:00:00 GMT')
+
+    @patch('fetch_articles.feedparser.parse')
+    def test_validators_are_saved_after_batch(self, mock_parse):
+        """バリデータは記事を処理し終えてから保存し、打ち切った場合は次回フィード全体を取得する"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_path = os.path.join(tmpdir, "feed_state.json")
+            fetcher = MeduzaFetcher(state_path=state_path)
+            feed = MagicMock()
+            feed.status = 200
+            feed.entries = []
+            for i in range(3):
+                entry = MagicMock()
+                entry.get.side_effect = {'id': f'guid-{i}'}.get
+                entry.link = f'https://meduza.io/news/{i}'
+                entry.title = f'T{i}'
+                feed.entries.append(entry)
+            feed.get.side_effect = {'etag': '"abc"'}.get
+            mock_parse.return_value = feed
+
+            # 取得しただけでは保存しない
+            fetcher.fetch_rss_feed()
+            self.assertFalse(os.path.exists(state_path))
+            fetcher.save_feed_state()
+            self.assertEqual(fetcher._load_validators(), {'etag': '"abc"'})
+
+            # 件数で打ち切った場合は保存済みのバリデータも消す
+            self.assertEqual(len(fetcher.fetch_new_entries(limit=2)), 2)
+            fetcher.save_feed_state()
+            self.assertEqual(fetcher._load_validators(), {})
+
+            # 処理に失敗した記事がある場合も同じ
+            fetcher.fetch_new_entries(limit=5)
+            fetcher.save_feed_state()
+            fetcher.fetch_new_entries(limit=5)
+            fetcher.save_feed_state(complete=False)
+            self.assertEqual(fetcher._load_validators(), {})
+            _, kwargs = mock_parse.call_args
+            self.assertEqual(kwargs['etag'], '"abc"')
+
+    def test_feed_state_path_follows_db_path(self):
+        """バリデータはDBと同じディレクトリに保存する"""
+        self.assertEqual(feed_state_path(os.path.join("var", "meduza", "articles.db")),
+                         os.path.join("var", "meduza", "feed_state.json"))
+
     def test_fetch_article_content_not_implemented(self):
         """記事コンテンツ取得（未実装）テスト"""
         result = self.fetcher.fetch_article_content("https://meduza.io/test")
         self.assertIsNone(result)
 
+    def test_shared_session_per_fetcher(self):
+        """フェッチャーごとに共有セッションを持つテスト"""
+        self.assertIsNotNone(self.fetcher.session)
+        slot_a = self.fetcher._host_slot("https://meduza.io/a")
+        slot_b = self.fetcher._host_slot("https://meduza.io/b")
+        self.assertIs(slot_a, slot_b)
+
+
+class TestIncrementalFetch(unittest.TestCase):
+    """処理済み記事の除外テスト"""
+
+    def test_make_article_key(self):
+        """GUIDを優先し、なければ正規化したURLを使う"""
+        self.assertEqual(make_article_key("guid-1", "https://meduza.io/a"), "guid-1")
+        self.assertEqual(make_article_key(None, "https://Meduza.io/news/1/?utm_source=rss#top"),
+                         "https://meduza.io/news/1")
+
+    @patch('fetch_articles.MeduzaFetcher.fetch_article_content', return_value="本文")
+    @patch('fetch_articles.MeduzaFetcher.fetch_rss_feed')
+    def test_known_articles_are_not_fetched(self, mock_rss, mock_content):
+        """処理済みの記事は本文を取得しない"""
+        mock_rss.return_value = [
+            {'article_key': f'key-{i}', 'title': f'T{i}', 'link': f'https://meduza.io/{i}'}
+            for i in range(4)
+        ]
+        lookup = MagicMock(return_value={'key-0', 'key-2'})
+
+        result = fetch_meduza_articles(limit=5, max_workers=1, known_keys_lookup=lookup)
+
+        lookup.assert_called_once()
+        self.assertEqual([a['article_key'] for a in result], ['key-1', 'key-3'])
+        self.assertEqual(mock_content.call_count, 2)
+
+
+class TestContentSource(unittest.TestCase):
+    """RSSの本文の利用テスト"""
+
+    FEED_HTML = (
+        "<p>Полиция задержала не менее двенадцати человек на&nbsp;Пушкинской площади, "
+        "сообщает &laquo;ОВД-Инфо&raquo;.</p>"
+        "<p>Участники акции вышли с пустыми плакатами. По словам очевидцев, задержания начались "
+        "через несколько минут после начала пикета.<br/>В МВД заявили, что акция не была согласована.</p>"
+    )
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.fetcher = MeduzaFetcher(state_path=None)
+
+    def _article(self, content, link="https://meduza.io/news/2025/07/19/a"):
+        return {'link': link, 'summary': 'Полиция задержала участников акции', 'content': content}
+
+    def test_clean_feed_content(self):
+        """タグと実体参照を除き、段落は改行で区切る"""
+        content = clean_feed_content(self.FEED_HTML)
+        lines = content.split("\n")
+        self.assertEqual(len(lines), 3)
+        self.assertIn("на Пушкинской площади, сообщает «ОВД-Инфо».", lines[0])
+        self.assertEqual(lines[2], "В МВД заявили, что акция не была согласована.")
+
+    def test_completeness_heuristic(self):
+        """短い・途中で切れた・長文セクションの本文は不完全とみなす"""
+        content = clean_feed_content(self.FEED_HTML)
+        self.assertTrue(is_complete_feed_content(content, "https://meduza.io/news/2025/07/19/a"))
+        self.assertFalse(is_complete_feed_content(content[:150] + ".", "https://meduza.io/news/x"))
+        self.assertFalse(is_complete_feed_content(content + "\nЧитать далее…", "https://meduza.io/news/x"))
+        self.assertFalse(is_complete_feed_content(content[:-1] + ",", "https://meduza.io/news/x"))
+        self.assertFalse(is_complete_feed_content(content, "https://meduza.io/feature/2025/07/19/a"))
+        self.assertFalse(is_complete_feed_content(content, "https://meduza.io/news/x", summary=self.FEED_HTML))
+
+    def test_complete_feed_content_skips_page_fetch(self):
+        """RSSの本文が完全ならページを取得せず、件数を数える"""
+        with patch.object(self.fetcher, 'fetch_article_content', return_value="本文") as mock_fetch:
+            content = self.fetcher.resolve_article_content(self._article(self.FEED_HTML))
+            self.assertTrue(content.startswith("Полиция задержала"))
+            self.assertEqual(self.fetcher.resolve_article_content(self._article("<p>Начало статьи…</p>")), "本文")
+        mock_fetch.assert_called_once_with("https://meduza.io/news/2025/07/19/a")
+        self.assertEqual(self.fetcher.content_source_stats(), {"feed": 1, "page": 1})
+
+    def test_page_policy_always_fetches(self):
+        """取得元をpageにすると常にページを取得する"""
+        fetcher = MeduzaFetcher(state_path=None, content_source="page")
+        with patch.object(fetcher, 'fetch_article_content', return_value="本文"):
+            self.assertEqual(fetcher.resolve_article_content(self._article(self.FEED_HTML)), "本文")
+        self.assertEqual(fetcher.content_source_stats(), {"feed": 0, "page": 1})
+        with self.assertRaises(ValueError):
+            MeduzaFetcher(content_source="cache")
+
 
 class TestIntegration(unittest.TestCase):
     """統合テスト"""
@@ -0,0 +1,167 @@
+"""
+jobs.py・ingest_service.py の単体テスト
+"""
+
+import unittest
+import tempfile
+import threading
+import time
+import os
+from unittest.mock import patch
+
+from src.database import init_db
+from src.jobs import (
+    enqueue_job, claim_next_job, get_job, update_job_progress, finish_job, requeue_running_jobs,
+    write_heartbeat, get_service_status, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+)
+from src.ingest_service import IngestService, IngestResult
+from src.metrics import fetch_metrics_snapshot
+
+
+class TestJobQueue(unittest.TestCase):
+    """ジョブキューのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def test_job_lifecycle(self):
+        """登録→取得→進捗→完了"""
+        job_id = enqueue_job(3, "ui", self.db_path)
+        # 未処理のジョブがある間は同じジョブを返す（処理モードが異なるジョブは別に登録する）
+        self.assertEqual(enqueue_job(5, "poll", self.db_path), job_id)
+        digest_job_id = enqueue_job(3, "ui", self.db_path, mode="digest")
+        self.assertNotEqual(digest_job_id, job_id)
+
+        job = claim_next_job(self.db_path)
+        self.assertEqual((job["id"], job["status"], job["article_limit"]), (job_id, JOB_RUNNING, 3))
+        self.assertEqual(job["mode"], "full")
+        self.assertFalse(job["resumed"])
+        self.assertEqual(claim_next_job(self.db_path)["id"], digest_job_id)
+        self.assertIsNone(claim_next_job(self.db_path))
+
+        update_job_progress(job_id, 1, 3, "翻訳中", self.db_path)
+        self.assertEqual(get_job(job_id, self.db_path)["progress"], 1)
+
+        finish_job(job_id, 2, self.db_path)
+        job = get_job(job_id, self.db_path)
+        self.assertEqual((job["status"], job["saved"]), (JOB_DONE, 2))
+        self.assertNotEqual(enqueue_job(3, "ui", self.db_path), job_id)
+
+    def test_unknown_mode(self):
+        """未対応の処理モードは登録できない"""
+        with self.assertRaises(ValueError):
+            enqueue_job(3, "ui", self.db_path, mode="fast")
+
+    def test_requeue_running_jobs(self):
+        """異常終了で実行中のまま残ったジョブは再登録される"""
+        job_id = enqueue_job(3, "ui", self.db_path)
+        claim_next_job(self.db_path)
+        self.assertEqual(requeue_running_jobs(self.db_path), 1)
+        self.assertEqual(get_job(job_id, self.db_path)["status"], JOB_QUEUED)
+        self.assertTrue(claim_next_job(self.db_path)["resumed"])
+
+    def test_heartbeat(self):
+        """ハートビートが新しければ稼働中とみなす"""
+        self.assertIsNone(get_service_status(self.db_path))
+        write_heartbeat("idle", db_path=self.db_path)
+        self.assertTrue(get_service_status(self.db_path)["alive"])
+        write_heartbeat("stopped", db_path=self.db_path)
+        self.assertFalse(get_service_status(self.db_path)["alive"])
+
+
+class TestIngestService(unittest.TestCase):
+    """取り込みサービスのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        init_db(self.db_path)
+        self.service = IngestService(poll_interval=0, db_path=self.db_path, translator=object())
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def test_poll_delay_has_jitter(self):
+        """確認間隔は指定した割合の範囲で揺らぐ"""
+        service = IngestService(poll_interval=100, jitter=0.2, seed=1)
+        delays = [service.next_poll_delay() for _ in range(50)]
+        self.assertTrue(all(80 <= d <= 120 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    @patch('src.ingest_service.ingest_articles')
+    def test_process_job(self, mock_ingest):
+        """ジョブの結果に応じて完了・失敗・再登録にする"""
+        def ingest(limit, db_path, translator, on_progress, should_stop, **kwargs):
+            on_progress(1, 2, "翻訳中")
+            return IngestResult(2, 2, 2, False)
+        mock_ingest.side_effect = ingest
+        job_id = enqueue_job(2, "ui", self.db_path, mode="digest")
+        self.service.process_job(claim_next_job(self.db_path))
+        self.assertEqual(get_job(job_id, self.db_path)["status"], JOB_DONE)
+        # ジョブごとの処理モードで取り込む
+        self.assertEqual(mock_ingest.call_args.kwargs["mode"], "digest")
+
+        mock_ingest.side_effect = RuntimeError("feed down")
+        job_id = enqueue_job(2, "ui", self.db_path)
+        self.service.process_job(claim_next_job(self.db_path))
+        job = get_job(job_id, self.db_path)
+        self.assertEqual((job["status"], job["error"]), (JOB_FAILED, "feed down"))
+
+        mock_ingest.side_effect = None
+        mock_ingest.return_value = IngestResult(3, 1, 1, True)
+        job_id = enqueue_job(3, "ui", self.db_path)
+        self.service.process_job(claim_next_job(self.db_path))
+        self.assertEqual(get_job(job_id, self.db_path)["status"], JOB_QUEUED)
+        self.assertTrue(mock_ingest.call_args.kwargs["use_validators"])
+
+        # 再開したジョブは条件付きGETを使わずにフィード全体を取得する
+        mock_ingest.return_value = IngestResult(2, 2, 2, False)
+        self.service.process_job(claim_next_job(self.db_path))
+        self.assertEqual(get_job(job_id, self.db_path)["status"], JOB_DONE)
+        self.assertFalse(mock_ingest.call_args.kwargs["use_validators"])
+
+    @patch('src.ingest_service.ingest_articles', return_value=IngestResult(1, 1, 1, False))
+    def test_run_processes_queue_and_stops(self, mock_ingest):
+        """キューのジョブを処理し、停止要求で稼働状況を停止にして終了する"""
+        job_id = enqueue_job(1, "ui", self.db_path)
+        thread = threading.Thread(target=self.service.run)
+        thread.start()
+        deadline = time.time() + 5
+        while get_job(job_id, self.db_path)["status"] != JOB_DONE and time.time() < deadline:
+            time.sleep(0.05)
+        self.service.stop()
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(get_job(job_id, self.db_path)["status"], JOB_DONE)
+        self.assertEqual(get_service_status(self.db_path)["state"], "stopped")
+
+    def test_run_publishes_metrics(self):
+        """指標を公開しているポートをハートビートに記録し、停止したら消す"""
+        service = IngestService(poll_interval=0, db_path=self.db_path, translator=object(), metrics_port=0)
+        thread = threading.Thread(target=service.run)
+        thread.start()
+        deadline = time.time() + 5
+        status = get_service_status(self.db_path)
+        while not (status and status["metrics_port"]) and time.time() < deadline:
+            time.sleep(0.05)
+            status = get_service_status(self.db_path)
+        snapshot = fetch_metrics_snapshot(status["metrics_port"])
+        service.stop()
+        thread.join(timeout=5)
+
+        self.assertIn("meduza_articles_total", snapshot["counters"])
+        self.assertIsNone(get_service_status(self.db_path)["metrics_port"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,122 @@
+"""
+lexrank.py の単体テスト
+"""
+
+import unittest
+import random
+
+from sumy.parsers.plaintext import PlaintextParser
+from sumy.nlp.tokenizers import Tokenizer
+from sumy.summarizers.lex_rank import LexRankSummarizer
+
+from src.lexrank import LexRank, get_tokenizer
+from src.summarize import MeduzaSummarizer, get_summarizer
+
+WORDS = (
+    "政府 大統領 ロシア ウクライナ 停戦 交渉 モスクワ 会談 経済 制裁 軍 攻撃 ドローン "
+    "市民 選挙 野党 裁判所 記者 報道 石油 価格 銀行 ルーブル 国境 難民"
+).split()
+PARTICLES = "は が を に で と の も".split()
+ENDINGS = ("した。", "している。", "と述べた。", "？", "！")
+
+
+def make_article(seed: int, sentence_count: int) -> str:
+    """乱数で記事風のテキストを作成（重複文と段落を含む）"""
+    r = random.Random(seed)
+    sentences = [
+        "".join(r.choice(WORDS) + r.choice(PARTICLES) for _ in range(r.randint(2, 8))) + r.choice(ENDINGS)
+        for _ in range(sentence_count)
+    ]
+    if sentence_count > 3:
+        sentences[1] = sentences[-1]
+    text = "".join(sentences)
+    if seed % 3 == 0:
+        text = text.replace("。", "。\n\n", 3)
+    return text
+
+
+def sumy_summary(text: str, count: int):
+    """置き換え前のsumyによる要約"""
+    parser = PlaintextParser.from_string(text, Tokenizer("japanese"))
+    return tuple(str(sentence) for sentence in LexRankSummarizer()(parser.document, count))
+
+
+class TestLexRank(unittest.TestCase):
+    """LexRank要約のテスト"""
+
+    def test_matches_sumy(self):
+        """参照コーパスでsumyのLexRankSummarizerと同じ文を選ぶ"""
+        lexrank = LexRank(max_sentences=None)
+        for seed, sentence_count in enumerate([1, 2, 3, 5, 10, 30, 80] * 3):
+            text = make_article(seed, sentence_count)
+            for count in (1, 3, 5):
+                with self.subTest(seed=seed, sentences=sentence_count, count=count):
+                    self.assertEqual(lexrank.summarize(text, count), sumy_summary(text, count))
+
+    def test_hand_written_article(self):
+        """段落見出しや単語のない文を含む記事でもsumyと一致する"""
+        text = (
+            "速報\n\n"
+            "ロシア政府は新たな制裁に対抗措置を取ると発表した。大統領は会談で停戦に言及した。"
+            "123。大統領は会談で停戦に言及した。\n\n"
+            "モスクワでは市民が集会を開いた！野党は選挙の延期に反対している。"
+            "記者は報道の自由が失われたと述べた。石油価格の下落でルーブルが下がった？"
+        )
+        for count in (1, 2, 4, 10):
+            with self.subTest(count=count):
+                self.assertEqual(LexRank(max_sentences=None).summarize(text, count), sumy_summary(text, count))
+
+    def test_sentence_cap(self):
+        """上限を超える文は要約の対象にしない"""
+        text = make_article(7, 40)
+        lexrank = LexRank(max_sentences=10)
+        self.assertEqual(len(lexrank.split_sentences(text)), 10)
+        first_ten = "".join(str(s) for s in LexRank(max_sentences=None).split_sentences(text)[:10])
+        for sentence in lexrank.summarize(text, 3):
+            self.assertIn(sentence, first_ten)
+
+    def test_russian_text(self):
+        """ロシア語の原文も要約できる（punktデータがなくても文に分割できる）"""
+        text = (
+            "В. Путин провёл переговоры в Москве. Переговоры о перемирии продолжатся.\n"
+            "Погода в Москве была хорошей! Переговоры о перемирии завершились в Москве."
+        )
+        lexrank = LexRank("russian")
+        sentences = [str(s) for s in lexrank.split_sentences(text)]
+        self.assertEqual(sentences[0], "В. Путин провёл переговоры в Москве.")
+        self.assertEqual(len(sentences), 4)
+        summary = lexrank.summarize(text, 2)
+        self.assertEqual(len(summary), 2)
+        self.assertEqual(list(summary), [s for s in sentences if s in summary])
+
+    def test_empty_text(self):
+        """文がなければ空の要約"""
+        self.assertEqual(LexRank().summarize("", 3), ())
+
+    def test_tokenizer_is_shared(self):
+        """分割器はプロセス内で使い回す"""
+        self.assertIs(get_tokenizer("japanese"), get_tokenizer("japanese"))
+        self.assertIs(LexRank().tokenizer, LexRank().tokenizer)
+
+    def test_meduza_summarizer(self):
+        """MeduzaSummarizerはsumyと同じ文を改行でつないで返す"""
+        text = make_article(3, 30)
+        summary = MeduzaSummarizer().summarize_text(text, max_length=150)
+        self.assertEqual(summary, "\n".join(sumy_summary(text, 3)))
+
+    def test_summaries_are_memoized_by_content(self):
+        """同じ本文と文数の要約は1回だけ計算する"""
+        summarizer = MeduzaSummarizer(max_cached_summaries=2)
+        text = make_article(5, 20)
+        first = summarizer.summarize_text(text, max_length=150)
+        self.assertEqual(summarizer.summarize_text("  " + text + "\n", max_length=150), first)
+        self.assertEqual(summarizer.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+        summarizer.summarize_text(text, max_length=100)
+        summarizer.summarize_text(make_article(6, 20), max_length=150)
+        self.assertEqual(summarizer.stats()["entries"], 2)
+        self.assertIs(get_summarizer(), get_summarizer())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
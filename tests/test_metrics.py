@@ -0,0 +1,151 @@
+"""
+metrics.py の単体テスト
+"""
+
+import unittest
+import os
+import tempfile
+import urllib.request
+from unittest.mock import patch
+
+from src.metrics import (
+    MetricsRegistry, MetricsServer, ARTICLES, CACHE_HITS, STAGE_SECONDS, TRANSLATED_CHARACTERS,
+    fetch_metrics_snapshot, histogram_quantile, stage_summary
+)
+from src.database import init_db, save_article_to_db
+from src.fetch_articles import CONTENT_SOURCE_PAGE, MeduzaFetcher
+from src.rate_limiter import AdaptiveRateLimiter
+from src.summarize import MeduzaSummarizer
+from src.translate import MeduzaTranslator
+from src.translation_backends import StubBackend
+
+
+def stage_count(stage):
+    """プロセス共有の登録先にあるステージの処理時間の件数"""
+    return stage_summary({"histograms": {STAGE_SECONDS.name: STAGE_SECONDS.samples()}}).get(stage, {}).get("count", 0)
+
+
+class TestRegistry(unittest.TestCase):
+    """指標の登録先のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.registry = MetricsRegistry()
+        self.counter = self.registry.counter("test_articles_total", "記事数", ("stage",))
+        self.histogram = self.registry.histogram("test_seconds", "処理時間", ("stage",), buckets=(0.1, 1.0))
+
+    def test_render_prometheus_text(self):
+        """Prometheusのテキスト形式で出力する"""
+        self.counter.inc(stage="saved")
+        self.counter.inc(2, stage="saved")
+        for value in (0.05, 0.5, 3.0):
+            self.histogram.observe(value, stage="fetch")
+
+        text = self.registry.render()
+        self.assertIn("# TYPE test_articles_total counter", text)
+        self.assertIn('test_articles_total{stage="saved"} 3', text)
+        self.assertIn('test_seconds_bucket{stage="fetch",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{stage="fetch",le="1"} 2', text)
+        self.assertIn('test_seconds_bucket{stage="fetch",le="+Inf"} 3', text)
+        self.assertIn('test_seconds_sum{stage="fetch"} 3.55', text)
+        self.assertIn('test_seconds_count{stage="fetch"} 3', text)
+
+    def test_labels_and_registration(self):
+        """ラベルの過不足はエラーにし、同じ名前の指標は同じものを返す"""
+        with self.assertRaises(ValueError):
+            self.counter.inc(target="page")
+        with self.assertRaises(ValueError):
+            self.counter.inc(-1, stage="saved")
+        self.assertIs(self.registry.counter("test_articles_total", "記事数", ("stage",)), self.counter)
+        with self.assertRaises(ValueError):
+            self.registry.histogram("test_articles_total", "記事数")
+
+    def test_quantile_from_buckets(self):
+        """区切りの件数から分位点を線形補間で推定する"""
+        for _ in range(10):
+            self.histogram.observe(0.5, stage="translate")
+        summary = stage_summary({"histograms": {"meduza_stage_duration_seconds": [
+            dict(sample, labels={"stage": "translate"}) for sample in self.histogram.samples()
+        ]}})
+        self.assertEqual(summary["translate"]["count"], 10)
+        self.assertAlmostEqual(summary["translate"]["mean"], 0.5)
+        self.assertAlmostEqual(summary["translate"]["p95"], 0.1 + 0.9 * 0.95)
+        self.assertIsNone(histogram_quantile(0.5, [[0.1, 0], [None, 0]]))
+        self.assertEqual(histogram_quantile(0.99, [[0.1, 1], [None, 5]]), 0.1)
+
+    def test_server(self):
+        """/metricsはテキスト形式、/metrics.jsonはスナップショットを返す"""
+        self.counter.inc(stage="fetched")
+        server = MetricsServer(0, registry=self.registry).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                self.assertIn("text/plain", response.headers["Content-Type"])
+                self.assertIn('test_articles_total{stage="fetched"} 1', response.read().decode("utf-8"))
+
+            snapshot = fetch_metrics_snapshot(server.port)
+            self.assertEqual(snapshot["counters"]["test_articles_total"][0]["value"], 1)
+        finally:
+            server.stop()
+        self.assertIsNone(fetch_metrics_snapshot(server.port, timeout=0.5))
+
+
+class TestInstrumentation(unittest.TestCase):
+    """翻訳・要約・DB書き込みの計測のテスト"""
+
+    def test_translator_counts_characters(self):
+        """翻訳APIに送った文字数と翻訳の処理時間を記録する"""
+        limiter = AdaptiveRateLimiter(rate=1000.0, burst=1000.0, max_rate=1000.0)
+        translator = MeduzaTranslator(backend=StubBackend(), use_cache=False, rate_limiter=limiter)
+        characters = TRANSLATED_CHARACTERS.value()
+        translated = ARTICLES.value(stage="translated")
+        timings = stage_count("translate")
+
+        translator.translate_article({'title': 'Заголовок', 'content': 'Текст статьи.'}, summarize=False)
+
+        self.assertEqual(TRANSLATED_CHARACTERS.value() - characters, translator.backend.characters)
+        self.assertEqual(ARTICLES.value(stage="translated") - translated, 1)
+        self.assertEqual(stage_count("translate") - timings, 1)
+
+    def test_fetch_counts_only_articles_with_content(self):
+        """本文を取得できた記事だけをfetchedに数え、失敗はfetch_failedに数える"""
+        fetcher = MeduzaFetcher(state_path=None, content_source=CONTENT_SOURCE_PAGE, page_cache_dir=None)
+        fetched = ARTICLES.value(stage="fetched")
+        failed = ARTICLES.value(stage="fetch_failed")
+
+        with patch.object(fetcher, "fetch_article_content", side_effect=["Текст статьи", None]):
+            fetcher.resolve_article_content({'link': 'https://meduza.io/news/1'})
+            fetcher.resolve_article_content({'link': 'https://meduza.io/news/2'})
+        fetcher.close()
+
+        self.assertEqual(ARTICLES.value(stage="fetched") - fetched, 1)
+        self.assertEqual(ARTICLES.value(stage="fetch_failed") - failed, 1)
+
+    def test_summary_memo_hits(self):
+        """要約のメモのヒットを数え、計算したときだけ処理時間を記録する"""
+        summarizer = MeduzaSummarizer()
+        hits = CACHE_HITS.value(cache="summary")
+        timings = stage_count("summarize")
+
+        summarizer.summarize_text("最初の文。次の文。最後の文。", 100)
+        summarizer.summarize_text("最初の文。次の文。最後の文。", 100)
+
+        self.assertEqual(CACHE_HITS.value(cache="summary") - hits, 1)
+        self.assertEqual(stage_count("summarize") - timings, 1)
+
+    def test_db_write(self):
+        """保存した記事数とDB書き込みの処理時間を記録する"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "articles.db")
+            init_db(db_path)
+            saved = ARTICLES.value(stage="saved")
+            timings = stage_count("db_write")
+
+            save_article_to_db({'article_key': 'a', 'title': 'A'}, db_path)
+            save_article_to_db({'article_key': 'a', 'title': 'A'}, db_path)
+
+            self.assertEqual(ARTICLES.value(stage="saved") - saved, 1)
+            self.assertEqual(stage_count("db_write") - timings, 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+"""
+migrations.py の単体テスト
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import os
+
+from src.migrations import (LATEST_VERSION, get_schema_version, migrate, run_backfill, run_fts_backfill,
+                            run_backfills, backfills_pending)
+from src.repository import get_connection
+from src.utils import compute_content_hash
+
+
+class TestMigrations(unittest.TestCase):
+    """マイグレーションのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def _columns(self):
+        return {row[1] for row in get_connection(self.db_path).execute("PRAGMA table_info(articles)")}
+
+    def test_fresh_database(self):
+        """新規DBは最新バージョンまで適用される"""
+        self.assertEqual(migrate(self.db_path), LATEST_VERSION)
+        self.assertEqual(get_schema_version(self.db_path), LATEST_VERSION)
+        self.assertTrue({"article_key", "published_at", "link", "content_hash",
+                         "summary_ja", "summary_auto"} <= self._columns())
+
+        # 2回目は何もしない
+        self.assertEqual(migrate(self.db_path), LATEST_VERSION)
+
+    def test_upgrade_legacy_database_in_place(self):
+        """user_versionのない既存DBもデータを残したまま最新化される"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, "
+                     "translated_title TEXT, translated_content TEXT, summary TEXT, published TEXT)")
+        conn.execute("INSERT INTO articles (title, content) VALUES ('A', 'Текст статьи')")
+        conn.commit()
+        conn.close()
+
+        migrate(self.db_path)
+
+        row = get_connection(self.db_path).execute("SELECT title, content_hash FROM articles").fetchone()
+        self.assertEqual(row, ("A", None))
+        self.assertEqual(get_schema_version(self.db_path), LATEST_VERSION)
+
+    def test_fts_backfill_after_upgrade(self):
+        """アップグレード前の記事はバッチに分けて登録され、途中の更新でインデックスが壊れない"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, "
+                     "translated_title TEXT, translated_content TEXT, summary TEXT, published TEXT)")
+        conn.executemany("INSERT INTO articles (title, content) VALUES (?, ?)",
+                         [(f"A{i}", f"Текст статьи {i}") for i in range(5)])
+        conn.commit()
+        conn.close()
+
+        migrate(self.db_path)
+        conn = get_connection(self.db_path)
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone():
+            self.skipTest("FTS5が使えません")
+        # 未登録の記事の更新・削除や新しい記事の追加はトリガーで安全に扱われる
+        conn.execute("UPDATE articles SET content = 'Новый текст' WHERE id = 1")
+        conn.execute("DELETE FROM articles WHERE id = 2")
+        conn.execute("INSERT INTO articles (title, content) VALUES ('B', 'Текст статьи новой')")
+        conn.commit()
+
+        self.assertEqual(run_fts_backfill(self.db_path, batch_size=2), 4)
+        self.assertEqual(run_fts_backfill(self.db_path, batch_size=2), 0)
+
+        rows = conn.execute("SELECT rowid FROM articles_fts WHERE articles_fts MATCH '\"Текст\"' ORDER BY rowid").fetchall()
+        self.assertEqual(rows, [(1,), (3,), (4,), (5,), (6,)])
+        conn.execute("UPDATE articles SET content = 'Другой текст' WHERE id = 3")
+        conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('integrity-check')")
+        conn.commit()
+
+    def test_backfill_in_batches(self):
+        """バックフィルはバッチに分けて全行を処理する"""
+        migrate(self.db_path)
+        conn = get_connection(self.db_path)
+        conn.executemany(
+            "INSERT INTO articles (content, published) VALUES (?, ?)",
+            [(f"Текст {i}", "Sat, 19 Jul 2025 16:00:00 +0300" if i % 2 else "unknown") for i in range(25)]
+        )
+
+        self.assertEqual(run_backfill("content_hash", self.db_path, batch_size=10), 25)
+        self.assertEqual(run_backfill("published_at", self.db_path, batch_size=10), 12)
+
+        content_hash = conn.execute("SELECT content_hash FROM articles WHERE content = 'Текст 3'").fetchone()[0]
+        self.assertEqual(content_hash, compute_content_hash("Текст 3"))
+        self.assertEqual(run_backfill("content_hash", self.db_path, batch_size=10), 0)
+
+    def test_backfill_completion_is_recorded(self):
+        """バックフィルの完了はスキーマバージョンごとに記録される"""
+        migrate(self.db_path)
+        self.assertTrue(backfills_pending(self.db_path))
+        run_backfills(self.db_path)
+        self.assertFalse(backfills_pending(self.db_path))
+
+        # マイグレーションでスキーマが変わったら再実行が必要になる
+        get_connection(self.db_path).execute(f"PRAGMA user_version = {LATEST_VERSION + 1}")
+        self.assertTrue(backfills_pending(self.db_path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,194 @@
+"""
+page_cache.py・reextract.py の単体テスト
+"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+from src.page_cache import PageCache, page_cache_dir
+from src.reextract import reextract_articles
+from src.database import init_db, save_article_to_db
+from src.repository import get_connection
+from src.fetch_articles import MeduzaFetcher
+from src.utils import compute_content_hash, parse_published_timestamp
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "meduza")
+
+
+def load_fixture_page(name):
+    """保存済みの記事ページ（HTML）を読み込む"""
+    with open(os.path.join(FIXTURES_DIR, name + ".html"), "rb") as f:
+        return f.read()
+
+
+class TestPageCache(unittest.TestCase):
+    """ページキャッシュのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = PageCache(os.path.join(self.tmpdir.name, "cache"))
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_put_and_get(self):
+        """保存したページは圧縮して保存され、URLの最新のものが返る"""
+        page = load_fixture_page("news")
+        self.cache.put("https://meduza.io/news/1", page, etag='"v1"')
+        self.assertEqual(self.cache.get("https://meduza.io/news/1"), page)
+        self.assertIsNone(self.cache.get("https://meduza.io/news/2"))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertLess(stats["disk_bytes"], stats["raw_bytes"])
+
+        # バリデータが変わったら新しい内容を最新として扱う
+        self.cache.put("https://meduza.io/news/1", b"<html>updated</html>", etag='"v2"')
+        self.assertEqual(self.cache.get("https://meduza.io/news/1"), b"<html>updated</html>")
+        self.assertEqual(self.cache.stats()["responses"], 2)
+
+    def test_same_content_is_stored_once(self):
+        """同じ内容のページは1つだけ保存する"""
+        page = load_fixture_page("news")
+        self.cache.put("https://meduza.io/news/1", page)
+        self.cache.put("https://meduza.io/news/1?utm_source=rss", page)
+        stats = self.cache.stats()
+        self.assertEqual((stats["responses"], stats["pages"]), (2, 1))
+
+    def test_size_eviction(self):
+        """合計サイズの上限を超えたら最近使われていないページから削除する"""
+        self.cache.max_bytes = 2500
+        pages = [os.urandom(1000) for _ in range(3)]
+        self.cache.put("https://meduza.io/a", pages[0])
+        self.cache.put("https://meduza.io/b", pages[1])
+        self.cache.get("https://meduza.io/a")
+        self.cache.put("https://meduza.io/c", pages[2])
+
+        self.assertEqual(self.cache.get("https://meduza.io/a"), pages[0])
+        self.assertIsNone(self.cache.get("https://meduza.io/b"))
+        self.assertLessEqual(self.cache.stats()["disk_bytes"], 2500)
+
+    def test_age_eviction(self):
+        """保持期間を過ぎたページは削除する"""
+        self.cache.put("https://meduza.io/old", b"<html>old</html>")
+        self.cache.max_age = 60
+        with patch("src.page_cache.time.time", return_value=time.time() + 120):
+            self.cache.evict()
+        self.assertIsNone(self.cache.get("https://meduza.io/old"))
+        self.assertEqual(self.cache.stats()["pages"], 0)
+
+    def test_page_cache_dir_follows_db_path(self):
+        """ページキャッシュはDBと同じディレクトリに保存する"""
+        self.assertEqual(page_cache_dir(os.path.join("var", "meduza", "articles.db")),
+                         os.path.join("var", "meduza", "page_cache"))
+
+    def test_fetcher_stores_pages(self):
+        """ページを取得したらバリデータとともにキャッシュに保存する"""
+        fetcher = MeduzaFetcher(state_path=None, page_cache_dir=self.cache.cache_dir)
+        response = MagicMock(content=load_fixture_page("news"), headers={"ETag": '"abc"'})
+        with patch.object(fetcher.session, "get", return_value=response), \
+                patch("src.fetch_articles.get_page_cache", return_value=self.cache):
+            content = fetcher.fetch_article_content("https://meduza.io/news/1")
+        fetcher.close()
+
+        self.assertTrue(content)
+        self.assertEqual(self.cache.get("https://meduza.io/news/1"), response.content)
+
+
+class TestReextract(unittest.TestCase):
+    """保存済みのページからの再抽出のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        self.cache = PageCache(os.path.join(self.tmpdir.name, "cache"))
+        init_db(self.db_path)
+
+        for i, (name, published) in enumerate([
+            ("news", "2025-07-10"), ("longread", "2025-07-15"), ("fallback_cp1251", "2025-07-20")
+        ]):
+            link = f"https://meduza.io/news/{i}"
+            save_article_to_db({
+                "article_key": link, "link": link, "title": name, "published": published,
+                "content": "記事本文の抽出に失敗しました", "translated_content": "翻訳"
+            }, db_path=self.db_path)
+            self.cache.put(link, load_fixture_page(name))
+        save_article_to_db({
+            "article_key": "uncached", "link": "https://meduza.io/news/uncached",
+            "published": "2025-07-12", "content": "古い本文"
+        }, db_path=self.db_path)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def _contents(self):
+        rows = get_connection(self.db_path).execute(
+            "SELECT title, content, content_hash, translated_content FROM articles ORDER BY id"
+        ).fetchall()
+        return rows
+
+    def test_reextract_date_range(self):
+        """期間内の記事だけを保存済みのページから抽出し直す"""
+        result = reextract_articles(
+            since=parse_published_timestamp("2025-07-01"),
+            until=parse_published_timestamp("2025-07-18"),
+            db_path=self.db_path, cache=self.cache, workers=1
+        )
+        self.assertEqual((result.selected, result.missing, result.failed, result.updated), (3, 1, 0, 2))
+
+        rows = self._contents()
+        with open(os.path.join(FIXTURES_DIR, "news.txt"), encoding="utf-8") as f:
+            self.assertEqual(rows[0][1], f.read().rstrip("\n"))
+        self.assertEqual(rows[0][2], compute_content_hash(rows[0][1]))
+        self.assertEqual(rows[0][3], "翻訳")
+        # 期間外・キャッシュにない記事は変更しない
+        self.assertEqual(rows[2][1], "記事本文の抽出に失敗しました")
+        self.assertEqual(rows[3][1], "古い本文")
+
+    def test_reextract_in_worker_processes(self):
+        """ワーカープロセスで抽出しても同じ結果になり、2回目は何も変わらない"""
+        result = reextract_articles(db_path=self.db_path, cache=self.cache, workers=2, batch_size=2)
+        self.assertEqual((result.selected, result.missing, result.updated), (4, 1, 3))
+        self.assertIn("Последний абзац статьи.", self._contents()[2][1])
+
+        result = reextract_articles(db_path=self.db_path, cache=self.cache, workers=2)
+        self.assertEqual(result.updated, 0)
+
+    def test_reextract_upgraded_database(self):
+        """旧スキーマから最新化したDBの記事も抽出し直せ、全文検索インデックスが壊れない"""
+        db_path = os.path.join(self.tmpdir.name, "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, "
+                     "translated_title TEXT, translated_content TEXT, summary TEXT, published TEXT)")
+        conn.execute("INSERT INTO articles (title, content, published) VALUES ('news', '古い本文', '2025-07-10')")
+        conn.commit()
+        conn.close()
+        init_db(db_path)
+        # 旧スキーマにはURLがないため、最新化した後に設定する
+        conn = get_connection(db_path)
+        conn.execute("UPDATE articles SET link = 'https://meduza.io/news/0' WHERE id = 1")
+        conn.commit()
+
+        result = reextract_articles(db_path=db_path, cache=self.cache, workers=1)
+        self.assertEqual((result.selected, result.updated), (1, 1))
+
+        content = conn.execute("SELECT content FROM articles WHERE id = 1").fetchone()[0]
+        self.assertNotEqual(content, "古い本文")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone():
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('integrity-check')")
+            rows = conn.execute("SELECT rowid FROM articles_fts WHERE articles_fts MATCH '\"古い本文\"'").fetchall()
+            self.assertEqual(rows, [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,253 @@
+"""
+pipeline.py の単体テスト
+"""
+
+import unittest
+import tempfile
+import threading
+import time
+import os
+from unittest.mock import patch
+
+from src.pipeline import Pipeline, Stage
+from src.ingest_service import ingest_articles
+from src.summarize import MeduzaSummarizer
+from src.repository import get_connection
+from src.database import get_existing_article_keys
+
+
+class TestPipeline(unittest.TestCase):
+    """パイプラインのテスト"""
+
+    def test_all_items_reach_sink_in_caller_thread(self):
+        """全項目が各ステージを通ってsinkに届き、sinkは呼び出し元のスレッドで実行される"""
+        results, threads = [], set()
+
+        def sink(item):
+            results.append(item)
+            threads.add(threading.current_thread())
+
+        pipeline = Pipeline([Stage("double", lambda x: x * 2, workers=3), Stage("inc", lambda x: x + 1, workers=2)])
+        self.assertFalse(pipeline.run(range(20), sink))
+        self.assertEqual(sorted(results), [x * 2 + 1 for x in range(20)])
+        self.assertEqual(threads, {threading.current_thread()})
+        self.assertEqual(pipeline.stats_summary()["double"]["processed"], 20)
+
+    def test_stages_overlap(self):
+        """ステージが重なって動くため、合計時間は逐次処理より短い"""
+        def slow(x):
+            time.sleep(0.02)
+            return x
+
+        pipeline = Pipeline([Stage("a", slow, workers=2), Stage("b", slow, workers=2)])
+        started = time.perf_counter()
+        pipeline.run(range(10), lambda item: None)
+        # 逐次なら 10件 × 2ステージ × 0.02秒 = 0.4秒
+        self.assertLess(time.perf_counter() - started, 0.3)
+
+    def test_bounded_queues_apply_backpressure(self):
+        """後ろのステージが遅いと、先行して処理される項目数はキューの長さで頭打ちになる"""
+        lock = threading.Lock()
+        counts = {"started": 0, "finished": 0, "max_ahead": 0}
+
+        def fast(x):
+            with lock:
+                counts["started"] += 1
+                counts["max_ahead"] = max(counts["max_ahead"], counts["started"] - counts["finished"])
+            return x
+
+        def slow(x):
+            time.sleep(0.005)
+            with lock:
+                counts["finished"] += 1
+            return x
+
+        pipeline = Pipeline([Stage("fast", fast, queue_size=2), Stage("slow", slow, queue_size=2)], output_queue_size=2)
+        pipeline.run(range(50), lambda item: None)
+        self.assertEqual(counts["finished"], 50)
+        # 入力キュー2 + 実行中2 + 出力キュー2 程度に収まる
+        self.assertLessEqual(counts["max_ahead"], 6)
+
+    def test_errors_and_drops(self):
+        """例外やNoneを返した項目は以降のステージに渡さない"""
+        def check(x):
+            if x == 3:
+                raise ValueError("bad item")
+            return None if x % 2 else x
+
+        results = []
+        pipeline = Pipeline([Stage("check", check)])
+        pipeline.run(range(6), results.append)
+        self.assertEqual(sorted(results), [0, 2, 4])
+        stats = pipeline.stats_summary()["check"]
+        self.assertEqual((stats["processed"], stats["dropped"], stats["failed"]), (3, 2, 1))
+
+    def test_stop(self):
+        """中断すると新しい項目は投入せず、処理中の項目だけを流し切る"""
+        results = []
+        stop = threading.Event()
+
+        def sink(item):
+            results.append(item)
+            stop.set()
+
+        pipeline = Pipeline([Stage("slow", lambda x: time.sleep(0.01) or x, queue_size=1)], output_queue_size=1)
+        self.assertTrue(pipeline.run(range(100), sink, should_stop=stop.is_set))
+        self.assertLess(len(results), 10)
+
+
+class FakeFetcher:
+    """本文取得を記録するフェッチャー"""
+
+    # save_feed_stateに渡されたcompleteの記録
+    feed_states = []
+    # 本文の取得に失敗させるURL
+    failing_links = set()
+    # 最後に作られたフェッチャーのバリデータの保存先
+    state_path = None
+
+    def __init__(self, *args, **kwargs):
+        FakeFetcher.state_path = kwargs.get('state_path')
+
+    def fetch_new_entries(self, limit, known_keys_lookup=None, use_validators=True):
+        entries = [{'article_key': f'k{i}', 'title': f'Статья {i}', 'link': f'https://meduza.io/{i}'} for i in range(5)]
+        known = known_keys_lookup([e['article_key'] for e in entries]) if known_keys_lookup else set()
+        return [e for e in entries if e['article_key'] not in known][:limit]
+
+    def fetch_article_content(self, url):
+        if url in self.failing_links:
+            return None
+        return f"Текст статьи {url}"
+
+    def resolve_article_content(self, article):
+        return self.fetch_article_content(article['link'])
+
+    def content_source_stats(self):
+        return {"feed": 0, "page": 0}
+
+    def save_feed_state(self, complete=True):
+        self.feed_states.append(complete)
+
+    def close(self):
+        pass
+
+
+class FakeTranslator:
+    """原文に印を付けるだけの翻訳器"""
+
+    def __init__(self):
+        self.summarize_flags = []
+
+    def translate_article(self, article, summarize=True):
+        self.summarize_flags.append(summarize)
+        article = dict(article)
+        article['translated_title'] = f"訳 {article['title']}"
+        article['translated_content'] = f"訳 {article['content']}。"
+        return article
+
+    def translate_digest(self, article, source_summary):
+        article = dict(article)
+        article['translated_title'] = f"訳 {article['title']}"
+        article['summary'] = f"訳 {source_summary}"
+        return article
+
+
+@patch('src.ingest_service.MeduzaFetcher', FakeFetcher)
+class TestIngestPipeline(unittest.TestCase):
+    """取り込みパイプラインのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "articles.db")
+        FakeFetcher.feed_states = []
+        FakeFetcher.failing_links = set()
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.tmpdir.cleanup()
+
+    def test_articles_are_saved_in_batches(self):
+        """処理が終わった記事はまとめてDBに保存され、進捗は保存した後に通知される"""
+        progress = []
+
+        def on_progress(done, total, message):
+            if done:
+                count = get_connection(self.db_path).execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+                progress.append((done, count))
+
+        result = ingest_articles(4, self.db_path, FakeTranslator(), on_progress, save_batch_size=3)
+        self.assertEqual((result.fetched, result.processed, result.saved), (4, 4, 4))
+        # 進捗が通知された時点で、その件数が既に保存されている（残りの1件はバッチの最後に保存）
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3), (4, 4)])
+
+        # 保存済みの記事は次回の取得で除外される
+        result = ingest_articles(4, self.db_path, FakeTranslator())
+        self.assertEqual((result.fetched, result.saved), (1, 1))
+
+    def test_articles_are_summarized_once(self):
+        """要約は要約ステージで1回だけ行い、summaryとsummary_autoに同じ結果を使う"""
+        translator = FakeTranslator()
+        summarizer = MeduzaSummarizer()
+        with patch('src.ingest_service.get_summarizer', return_value=summarizer):
+            ingest_articles(3, self.db_path, translator)
+        self.assertEqual(translator.summarize_flags, [False] * 3)
+        self.assertEqual(summarizer.stats()["misses"], 3)
+
+        rows = get_connection(self.db_path).execute("SELECT summary, summary_auto FROM articles").fetchall()
+        self.assertEqual(len(rows), 3)
+        for summary, summary_auto in rows:
+            self.assertTrue(summary.startswith("訳 Текст статьи"))
+            self.assertEqual(summary, summary_auto)
+
+    def test_digest_mode_translates_title_and_summary_only(self):
+        """ダイジェストモードでは原文を要約し、本文は翻訳しない"""
+        result = ingest_articles(2, self.db_path, FakeTranslator(), mode="digest")
+        self.assertEqual(result.saved, 2)
+
+        rows = get_connection(self.db_path).execute(
+            "SELECT translated_title, summary, translated_content FROM articles ORDER BY id"
+        ).fetchall()
+        self.assertEqual(rows[0][0], "訳 Статья 0")
+        self.assertTrue(rows[0][1].startswith("訳 Текст статьи"))
+        self.assertIsNone(rows[0][2])
+
+    def test_feed_state_is_saved_after_batch(self):
+        """フィードのバリデータは全件を保存できたときだけ保存し、中断したら破棄する"""
+        ingest_articles(2, self.db_path, FakeTranslator())
+        result = ingest_articles(2, self.db_path, FakeTranslator(), should_stop=lambda: True)
+        self.assertTrue(result.interrupted)
+        self.assertEqual(FakeFetcher.feed_states, [True, False])
+
+    def test_custom_store_does_not_share_feed_state(self):
+        """保存先を指定した取り込み（セッションごとの保存）ではバリデータを読み書きしない"""
+        ingest_articles(2, self.db_path, FakeTranslator())
+        self.assertEqual(FakeFetcher.state_path, os.path.join(self.tmpdir.name, "feed_state.json"))
+
+        ingest_articles(2, self.db_path, FakeTranslator(), store=lambda article: True,
+                        known_keys_lookup=lambda keys: set())
+        self.assertIsNone(FakeFetcher.state_path)
+
+    def test_failed_fetch_is_retried(self):
+        """本文を取得できなかった記事は保存せず、次回の取り込みで取得し直す"""
+        FakeFetcher.failing_links = {'https://meduza.io/1'}
+        result = ingest_articles(5, self.db_path, FakeTranslator())
+        self.assertEqual((result.fetched, result.saved), (5, 4))
+        keys = get_existing_article_keys([f'k{i}' for i in range(5)], self.db_path)
+        self.assertNotIn('k1', keys)
+        # 未完了なのでフィードのバリデータは保存しない
+        self.assertEqual(FakeFetcher.feed_states, [False])
+
+        FakeFetcher.failing_links = set()
+        result = ingest_articles(5, self.db_path, FakeTranslator())
+        self.assertEqual((result.fetched, result.saved), (1, 1))
+        self.assertIn('k1', get_existing_article_keys(['k1'], self.db_path))
+
+    def test_unknown_mode(self):
+        """未対応の処理モードはエラー"""
+        with self.assertRaises(ValueError):
+            ingest_articles(2, self.db_path, FakeTranslator(), mode="fast")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,80 @@
+"""
+rate_limiter.py の単体テスト
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from src.rate_limiter import AdaptiveRateLimiter, is_throttle_error
+from src.translate import MeduzaTranslator
+
+
+class FakeClock:
+    """テスト用の時計（sleepで時刻が進む）"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """AdaptiveRateLimiterクラスのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(
+            rate=2.0, burst=1.0, min_rate=0.5, max_rate=4.0,
+            clock=self.clock.time, sleep=self.clock.sleep
+        )
+
+    def test_acquire_waits_for_tokens(self):
+        """トークンがなければ速度に応じて待機する"""
+        self.assertEqual(self.limiter.acquire(), 0.0)
+        waited = self.limiter.acquire()
+        self.assertAlmostEqual(waited, 0.5)
+        self.assertEqual(self.limiter.state()["requests"], 2)
+
+    def test_aimd(self):
+        """成功で加算的に増え、スロットリングで乗算的に減る"""
+        self.limiter.on_success()
+        self.assertAlmostEqual(self.limiter.rate, 2.1)
+        self.limiter.on_throttle()
+        self.assertAlmostEqual(self.limiter.rate, 1.05)
+        for _ in range(5):
+            self.limiter.on_throttle()
+        self.assertEqual(self.limiter.rate, 0.5)
+
+        state = self.limiter.state()
+        self.assertEqual(state["throttle_events"], 6)
+        self.assertEqual(state["tokens"], 0.0)
+
+    def test_is_throttle_error(self):
+        """429系の例外を判定する"""
+        self.assertTrue(is_throttle_error(Exception("Server Error: 429 Too Many Requests")))
+        self.assertFalse(is_throttle_error(ValueError("invalid input")))
+
+
+class TestTranslatorRateLimit(unittest.TestCase):
+    """MeduzaTranslatorとレートリミッターの連携テスト"""
+
+    def test_throttled_request_is_retried(self):
+        """スロットリング時は速度を下げて再試行する"""
+        backend = MagicMock(source="ru", target="ja", max_chars=4999)
+        backend.translate.side_effect = [Exception("429 Too Many Requests"), "こんにちは"]
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(clock=clock.time, sleep=clock.sleep)
+        translator = MeduzaTranslator(backend=backend, use_cache=False, rate_limiter=limiter)
+
+        self.assertEqual(translator.translate_text("Привет"), "こんにちは")
+        self.assertEqual(limiter.state()["throttle_events"], 1)
+        self.assertEqual(limiter.state()["requests"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
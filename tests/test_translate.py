@@ -0,0 +1,137 @@
+"""
+translate.py の単体テスト
+"""
+
+import random
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.rate_limiter import AdaptiveRateLimiter
+from src.translate import MeduzaTranslator
+from src.translation_backends import BatchSplitError, GoogleTranslateBackend, TranslationBackend, StubBackend
+
+
+class FakeBackend(TranslationBackend):
+    """遅延をランダムに入れ、同時実行数を記録するバックエンド"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def translate(self, text):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(random.uniform(0, 0.01))
+        with self.lock:
+            self.in_flight -= 1
+        return f"[{text}]"
+
+
+class TestParallelTranslation(unittest.TestCase):
+    """並列翻訳のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        limiter = AdaptiveRateLimiter(rate=1000.0, burst=1000.0, max_rate=1000.0)
+        self.backend = FakeBackend()
+        self.translator = MeduzaTranslator(
+            backend=self.backend, use_cache=False, rate_limiter=limiter, max_workers=4
+        )
+
+    def test_long_text_keeps_paragraph_order(self):
+        """並列に翻訳しても段落の順序を維持する"""
+        paragraphs = [f"Абзац номер {i}." for i in range(30)]
+        text = "\n".join(paragraphs)
+
+        result = self.translator.translate_long_text(text, chunk_size=40)
+
+        self.assertEqual(result.replace("[", "").replace("]", ""), text)
+        self.assertLessEqual(self.backend.max_in_flight, 4)
+
+    def test_translate_article_fields(self):
+        """タイトル・要約・本文をそれぞれ翻訳する"""
+        article = {'title': 'Заголовок', 'summary': 'Кратко', 'content': ''}
+        result = self.translator.translate_article(article)
+
+        self.assertEqual(result['translated_title'], '[Заголовок]')
+        self.assertEqual(result['summary_ja'], '[Кратко]')
+        self.assertNotIn('translated_content', result)
+
+    def test_translate_article_summarize_switch(self):
+        """summarize=Falseなら本文を翻訳しても自動要約を作らない"""
+        article = {'title': 'Заголовок', 'content': '最初の文。次の文。'}
+        self.assertIn('summary_auto', self.translator.translate_article(article))
+        self.assertNotIn('summary_auto', self.translator.translate_article(article, summarize=False))
+
+
+class TestBatchTranslation(unittest.TestCase):
+    """バッチ翻訳のテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.backend = StubBackend()
+        limiter = AdaptiveRateLimiter(rate=1000.0, burst=1000.0, max_rate=1000.0)
+        self.translator = MeduzaTranslator(backend=self.backend, use_cache=False, rate_limiter=limiter)
+
+    def test_translate_batch_uses_one_request(self):
+        """上限内のテキストは1リクエストで翻訳し、順序を維持する"""
+        texts = ["Первый", "", "Второй", "Первый"]
+        result = self.translator.translate_batch(texts)
+
+        self.assertEqual(self.backend.requests, 1)
+        self.assertEqual(result[1], "")
+        self.assertTrue(result[0].endswith("Первый"))
+        self.assertTrue(result[2].endswith("Второй"))
+        self.assertEqual(result[0], result[3])
+
+    def test_split_failure_retries_each_text_with_limits(self):
+        """バッチの結果を分けられない場合は1件ずつレート制限を通して翻訳し直す"""
+        self.backend.translate_batch = MagicMock(side_effect=BatchSplitError("区切りが一致しません"))
+        limiter = MagicMock()
+        self.translator.rate_limiter = limiter
+
+        result = self.translator.translate_batch(["Первый", "Второй", "Третий"])
+
+        self.assertTrue(result[2].endswith("Третий"))
+        self.assertEqual(self.backend.requests, 3)
+        # バッチのリクエスト1回と、1件ずつのリクエスト3回
+        self.assertEqual(limiter.acquire.call_count, 4)
+        limiter.on_error.assert_not_called()
+
+    def test_google_backend_raises_on_split_mismatch(self):
+        """Google翻訳のバッチは区切りが崩れたら1件ずつ翻訳せずにエラーにする"""
+        backend = GoogleTranslateBackend()
+        backend.translator = MagicMock()
+        backend.translator.translate.return_value = "первый второй"
+        with self.assertRaises(BatchSplitError):
+            backend.translate_batch(["первый", "второй"])
+        self.assertEqual(backend.translator.translate.call_count, 1)
+
+        backend.translator.translate.return_value = "一\n∎ ∎∎\n二"
+        self.assertEqual(backend.translate_batch(["первый", "второй"]), ["一", "二"])
+
+    def test_translate_digest_sends_title_and_summary_only(self):
+        """ダイジェスト翻訳はタイトルと要約だけを1リクエストで送り、本文は翻訳しない"""
+        content = "Длинный текст статьи о переговорах. " * 100
+        article = {'title': 'Заголовок', 'content': content}
+        result = self.translator.translate_digest(article, "Главное предложение.")
+
+        self.assertEqual(self.backend.requests, 1)
+        self.assertLess(self.backend.characters, len(content) / 10)
+        self.assertTrue(result['translated_title'].endswith('Заголовок'))
+        self.assertTrue(result['summary'].endswith('Главное предложение.'))
+        self.assertEqual(result['summary'], result['summary_auto'])
+        self.assertNotIn('translated_content', result)
+
+    def test_stub_is_deterministic(self):
+        """スタブは同じ入力に同じ出力を返す"""
+        self.assertEqual(StubBackend().translate("Текст"), StubBackend().translate("Текст"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
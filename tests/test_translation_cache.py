@@ -0,0 +1,105 @@
+"""
+translation_cache.py / translate.py の翻訳メモリのテスト
+"""
+
+import itertools
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.translation_cache import TranslationMemory, normalize_segment, translation_cache_path
+from src.translate import MeduzaTranslator
+from src.translation_backends import StubBackend
+
+
+class TestTranslationMemory(unittest.TestCase):
+    """TranslationMemoryクラスのテスト"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.memory = TranslationMemory(db_path=":memory:", max_memory_entries=2)
+
+    def tearDown(self):
+        """テスト後の後片付け"""
+        self.memory.close()
+
+    def test_normalize_segment(self):
+        """空白の違いは同じキーになる"""
+        self.assertEqual(normalize_segment("  Привет,   мир! \n Пока "), "Привет, мир!\nПока")
+        self.assertEqual(
+            TranslationMemory.make_key("ru", "ja", "Привет  мир"),
+            TranslationMemory.make_key("ru", "ja", " Привет мир ")
+        )
+
+    def test_translation_cache_path_follows_db_path(self):
+        """翻訳メモリは記事DBと同じディレクトリに保存する"""
+        self.assertEqual(translation_cache_path(os.path.join("var", "meduza", "articles.db")),
+                         os.path.join("var", "meduza", "translation_cache.db"))
+
+    def test_hit_and_miss_counters(self):
+        """ヒット・ミスが計数される"""
+        self.assertIsNone(self.memory.get("ru", "ja", "Привет"))
+        self.memory.put("ru", "ja", "Привет", "こんにちは")
+        self.assertEqual(self.memory.get("ru", "ja", "Привет"), "こんにちは")
+
+        stats = self.memory.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_falls_back_to_disk(self):
+        """LRUから追い出されてもディスクから取得できる"""
+        for i in range(4):
+            self.memory.put("ru", "ja", f"текст {i}", f"テキスト {i}")
+        self.assertEqual(self.memory.stats()["memory_entries"], 2)
+        self.assertEqual(self.memory.get("ru", "ja", "текст 0"), "テキスト 0")
+
+    def test_size_based_eviction(self):
+        """合計サイズが上限を超えると古いものから削除される"""
+        memory = TranslationMemory(db_path=":memory:", max_disk_bytes=100)
+        for i in range(10):
+            memory.put("ru", "ja", f"текст {i}", "あ" * 10)  # 30バイト
+        stats = memory.stats()
+        self.assertLessEqual(stats["disk_bytes"], 100)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNotNone(memory.get("ru", "ja", "текст 9"))
+        memory.close()
+
+    @patch('src.translation_cache.time.time', side_effect=itertools.count(1))
+    def test_recently_used_entries_survive_eviction(self, mock_time):
+        """LRUでのヒットも最終使用時刻に反映され、読み込みのたびには書き込まない"""
+        memory = TranslationMemory(db_path=":memory:", max_disk_bytes=80)
+        memory.put("ru", "ja", "старый", "あ" * 10)  # 30バイト
+        memory.put("ru", "ja", "новый", "い" * 10)
+
+        changes = memory._conn.total_changes
+        self.assertEqual(memory.get("ru", "ja", "старый"), "あ" * 10)
+        self.assertEqual(memory._conn.total_changes, changes)
+
+        # 上限を超えたら、最後に使われた時刻が古い「новый」が削除される
+        memory.put("ru", "ja", "третий", "う" * 10)
+        memory._memory.clear()
+        self.assertIsNotNone(memory.get("ru", "ja", "старый"))
+        self.assertIsNone(memory.get("ru", "ja", "новый"))
+        memory.close()
+
+
+class TestTranslatorCache(unittest.TestCase):
+    """MeduzaTranslatorの翻訳メモリ利用テスト"""
+
+    def test_cache_hit_skips_api_and_rate_limit(self):
+        """キャッシュヒット時はAPIもレート制限の待機も行わない"""
+        backend = StubBackend()
+        memory = TranslationMemory(db_path=":memory:")
+        limiter = MagicMock()
+        translator = MeduzaTranslator(backend=backend, cache=memory, rate_limiter=limiter)
+
+        first = translator.translate_text("Привет")
+        self.assertEqual(translator.translate_text("Привет"), first)
+
+        self.assertEqual(backend.requests, 1)
+        self.assertEqual(limiter.acquire.call_count, 1)
+        memory.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)